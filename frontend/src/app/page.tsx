@@ -1,18 +1,21 @@
 import Wrapper from "@/wrapper";
 import { axiosInstance } from "@/utils/session";
 import LogEntries from "@/components/logEntries";
-import { User, Vehicle } from "@/utils";
+import { LogEntry, User, Vehicle } from "@/utils";
+import fetchLogs from "@/hooks/getLogs";
 import Driver from "@/components/Driver";
 import { redirect } from "next/navigation";
 import { isAxiosError } from "axios";
 
 export default async function Home() {
-  let logEntries = [];
+  let logEntries: LogEntry[] = [];
+  let nextCursor: string | null = null;
   let currentUser: User | null = null;
 
   try {
-    const res = await axiosInstance.get("/api/logs/");
-    logEntries = res.data;
+    const page = await fetchLogs();
+    logEntries = page.results;
+    nextCursor = page.next;
   } catch (error) {
     console.error("Error fetching logs:", error);
   }
@@ -43,7 +46,7 @@ export default async function Home() {
       {admin ? (
         <>
           {logEntries.length > 0 ? (
-            <LogEntries logEntries={logEntries} />
+            <LogEntries logEntries={logEntries} nextCursor={nextCursor} />
           ) : (
             <p className="text-red-500" style={{ margin: "6rem auto" }}>
               No log entries available.
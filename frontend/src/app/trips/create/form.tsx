@@ -22,10 +22,7 @@ type LogEntryFormProps = {
 export default function LogEntryForm({ drivers, vehicles }: LogEntryFormProps) {
   const [formData, setFormData] = useState<LogEntryFormData>({
     date: "",
-    driver: {
-      id: "",
-      user: { first_name: "", last_name: "" },
-    },
+    driver: { id: "", name: "" },
     vehicle: { id: "", truck_number: "", trailer_number: "" },
     start_odometer: "",
     end_odometer: "",
@@ -167,7 +164,7 @@ export default function LogEntryForm({ drivers, vehicles }: LogEntryFormProps) {
       if (response?.id) {
         setFormData({
           date: "",
-          driver: { id: "", user: { first_name: "", last_name: "" } },
+          driver: { id: "", name: "" },
           vehicle: { id: "", truck_number: "", trailer_number: "" },
           start_odometer: "",
           end_odometer: "",
@@ -213,7 +210,7 @@ export default function LogEntryForm({ drivers, vehicles }: LogEntryFormProps) {
                 <option value="">-- Select Driver --</option>
                 {drivers.map((driver) => (
                   <option key={driver.id} value={driver.id}>
-                    {driver.user?.first_name} {driver.user?.last_name}
+                    {driver.name}
                   </option>
                 ))}
               </select>
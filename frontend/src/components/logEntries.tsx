@@ -13,9 +13,11 @@ import {
 import Wrapper from "@/wrapper";
 import { useRouter } from "next/navigation";
 import { LogEntry } from "@/utils";
+import fetchLogs from "@/hooks/getLogs";
 
 type Props = {
   logEntries: LogEntry[];
+  nextCursor: string | null;
 };
 
 const Spinner = () => (
@@ -24,9 +26,16 @@ const Spinner = () => (
   </div>
 );
 
-export default function LogEntries({ logEntries }: Props) {
+export default function LogEntries({
+  logEntries: initialEntries,
+  nextCursor: initialCursor,
+}: Props) {
   const router = useRouter();
 
+  const [logEntries, setLogEntries] = useState(initialEntries);
+  const [nextCursor, setNextCursor] = useState(initialCursor);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
   const [navigatingId, setNavigatingId] = useState<number | null>(null);
   const [isCreating, setIsCreating] = useState(false);
 
@@ -50,6 +59,20 @@ export default function LogEntries({ logEntries }: Props) {
     }
   };
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const nextPage = await fetchLogs(nextCursor);
+      setLogEntries((prev) => [...prev, ...nextPage.results]);
+      setNextCursor(nextPage.next);
+    } catch (error) {
+      console.error("Error loading more logs:", error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handlePrevious = () => {
     if (page > 1) {
       setPage((prev) => prev - 1);
@@ -121,12 +144,9 @@ export default function LogEntries({ logEntries }: Props) {
                     }}
                   >
                     <Table.RowHeaderCell>{entry.id}</Table.RowHeaderCell>
-                    <Table.Cell>
-                      {entry.driver?.user?.first_name}{" "}
-                      {entry.driver?.user?.last_name}
-                    </Table.Cell>
+                    <Table.Cell>{entry.driver_name}</Table.Cell>
                     <Table.Cell>{entry.start_odometer}</Table.Cell>
-                    <Table.Cell>{entry.vehicle.truck_number}</Table.Cell>
+                    <Table.Cell>{entry.truck_number}</Table.Cell>
                     <Table.Cell>{entry.end_odometer}</Table.Cell>
                     <Table.Cell>{entry.total_miles}</Table.Cell>
                     <Table.Cell>{entry.remarks || "N/A"}</Table.Cell>
@@ -157,6 +177,22 @@ export default function LogEntries({ logEntries }: Props) {
               >
                 Next
               </Button>
+              {nextCursor && (
+                <Button
+                  onClick={handleLoadMore}
+                  disabled={isLoadingMore}
+                  variant="outline"
+                >
+                  {isLoadingMore ? (
+                    <Flex align="center" gap="2">
+                      <Spinner />
+                      Loading...
+                    </Flex>
+                  ) : (
+                    "Load more"
+                  )}
+                </Button>
+              )}
             </Flex>
           </Box>
         </Card>
@@ -1,41 +1,27 @@
 "use server";
 
 import axios from "axios";
+import { LogEntry } from "@/utils";
 import { axiosInstance } from "@/utils/session";
 
-interface DutyStatus {
-  status: string;
-  start_time: string;
-  end_time: string;
-  location: {
-    lat: number;
-    lon: number;
-    name: string;
-  };
+export interface LogEntryPage {
+  next: string | null;
+  previous: string | null;
+  results: LogEntry[];
 }
 
-interface LogEntry {
-  id: number;
-  date: string;
-  vehicle: string;
-  start_odometer: number;
-  end_odometer: number;
-  total_miles: number;
-  remarks: string;
-  signature: string;
-  duty_statuses: DutyStatus[];
-}
-
-export default async function fetchLogs(): Promise<{ data: LogEntry[] } | undefined> {
+// Pass the previous page's `next` URL to fetch the page after it.
+export default async function fetchLogs(
+  cursorUrl?: string | null
+): Promise<LogEntryPage> {
   try {
-    const res = await axiosInstance.get<LogEntry[]>("/api/logs/");
-    console.log(res);
+    const res = await axiosInstance.get<LogEntryPage>(cursorUrl ?? "/api/logs/");
 
-    return res;
+    return res.data;
   } catch (error) {
     if (axios.isAxiosError(error)) {
       throw new Error(error.message);
-      return undefined;
     }
+    throw error;
   }
 }
@@ -6,7 +6,7 @@ import axios from "axios";
 
 export default async function fetchTrip(): Promise<Trip[] | null> {
   try {
-    const res = await axiosInstance.get<Trip[]>("/api/trips/");
+    const res = await axiosInstance.get<Trip[]>("/api/trips/?expand=stops");
     console.log("Trips fetched successfully:", res.data);
 
     return res.data;
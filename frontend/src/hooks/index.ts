@@ -5,7 +5,7 @@ import { axiosInstance } from "@/utils/session";
 import axios from "axios";
 
 export const fetchTrip = async (): Promise<Trip[]> => {
-  const response = await axiosInstance.get(`/api/trips/`);
+  const response = await axiosInstance.get(`/api/trips/?expand=stops`);
   return response.data;
 };
 
@@ -34,6 +34,7 @@ export interface User {
 
 export interface Driver {
   id?: string
+  name?: string;
   user?: {
     first_name: string;
     last_name: string;
@@ -60,7 +61,9 @@ export interface LogEntry {
   signature: string;
   duty_statuses: DutyStatus[];
   driver: Driver;
+  driver_name?: string;
   vehicle: Vehicle;
+  truck_number?: string;
   total_miles: string;
   adverse_conditions: string;
 }
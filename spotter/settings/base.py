@@ -99,11 +99,14 @@ STORAGES = {
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "trucker.authentication.DriverContextJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_THROTTLE_RATES": {
+        "user": "30/minute",
+    },
 }
 
 SIMPLE_JWT = {
@@ -113,7 +116,8 @@ SIMPLE_JWT = {
     "SIGNING_KEY": SECRET_KEY,
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
-    "TOKEN_OBTAIN_SERIALIZER": "settings.serializers.CustomTokenObtainPairSerializer",
+    "TOKEN_OBTAIN_SERIALIZER": "spotter.settings.serializers.CustomTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "spotter.settings.serializers.CustomTokenRefreshSerializer",
 }
 
 CORS_ALLOWED_ORIGINS = ["http://localhost:3000"]
@@ -137,3 +141,62 @@ LOGGING = {
 
 
 MAPS_API_KEY = os.environ.get("MAPS_API_KEY")
+
+MAPS_CLIENT = {
+    "TRANSPORT": os.environ.get(
+        "MAPS_TRANSPORT", "trucker.services.maps_client.SessionTransport"
+    ),
+    "FIXTURES_DIR": os.environ.get(
+        "MAPS_FIXTURES_DIR", os.path.join(BASE_DIR, "fixtures", "maps")
+    ),
+    "POOL_SIZE": 20,
+    "TIMEOUT": (3.05, 10),
+    "RETRIES": 3,
+    "BACKOFF_FACTOR": 0.5,
+}
+
+MAPS_RATE_LIMITS = {
+    "default": {"RATE": 50, "BURST": 50},
+    "directions": {"RATE": 50, "BURST": 50},
+    "distancematrix": {"RATE": 10, "BURST": 10},
+    "place/nearbysearch": {"RATE": 10, "BURST": 20},
+    "MAX_WAIT": 60,
+    "PENALTY_SECONDS": 1.0,
+}
+
+ASYNC_MAPS_CLIENT = {
+    "MAX_CONCURRENCY": 50,
+    "PER_HOST_CONCURRENCY": 10,
+    "TIMEOUT": 10.0,
+    "RETRIES": 3,
+    "BACKOFF_FACTOR": 0.5,
+}
+
+ROUTE_CACHE = {
+    "TTL": timedelta(days=7),
+    "MEMORY_MAX_ENTRIES": 1024,
+    "DB_MAX_ENTRIES": 50000,
+    "EVICT_EVERY": 500,
+}
+
+PLACES_CACHE = {
+    "PRECISION": 5,
+    "TTL": timedelta(days=30),
+}
+
+# Driver context invalidation and the API throttles live in the default cache.
+# LocMemCache is per process, so anything running more than one worker must
+# point this at a shared backend (production uses the database cache).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+DRIVER_CONTEXT = {
+    "TTL": timedelta(minutes=5),
+}
+
+TRIP_PLANNING_ASYNC = os.environ.get("TRIP_PLANNING_ASYNC", "True") == "True"
+TRIP_PLANNING_MAX_ATTEMPTS = 3
+TRIP_PLANNING_VISIBILITY_TIMEOUT = timedelta(minutes=10)
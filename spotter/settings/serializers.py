@@ -1,9 +1,42 @@
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from trucker.services.driver_context import load_driver_context
+
+
+def set_driver_claims(token, user):
+    token["role"] = "admin" if user.is_staff else "driver"
+    for claim, value in load_driver_context(user).as_claims().items():
+        token[claim] = value
+    return token
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
-        token = super().get_token(user)
-        token["role"] = "admin" if user.is_staff else "driver"
-        return token
+        return set_driver_claims(super().get_token(user), user)
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    simplejwt copies custom claims from the refresh token, which can be days
+    old; reload them so a refreshed access token never carries a stale driver
+    or carrier.
+    """
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = (
+            get_user_model()
+            .objects.filter(pk=access[api_settings.USER_ID_CLAIM])
+            .first()
+        )
+        if user is not None:
+            data["access"] = str(set_driver_claims(access, user))
+        return data
@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from trucker.models import Carrier, Driver, Vehicle
+from trucker.services.maps_client import RecordedResponse, set_transport
+from trucker.services.route_cache import route_cache
+
+
+class StubTransport:
+    """Answers Maps calls from canned payloads keyed by endpoint name."""
+
+    def __init__(self):
+        self.payloads = {}
+        self.calls = []
+
+    def add(self, endpoint, *payloads):
+        self.payloads.setdefault(endpoint, []).extend(payloads)
+
+    def get(self, url, params=None, timeout=None):
+        endpoint = url.rstrip("/").split("/")[-2]
+        self.calls.append((endpoint, params))
+        queue = self.payloads[endpoint]
+        payload = queue.pop(0) if len(queue) > 1 else queue[0]
+        return RecordedResponse(payload)
+
+    def count(self, endpoint):
+        return sum(1 for name, _ in self.calls if name == endpoint)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def maps_transport():
+    transport = StubTransport()
+    set_transport(transport)
+    yield transport
+    set_transport(None)
+
+
+@pytest.fixture(autouse=True)
+def clear_route_cache():
+    route_cache.clear()
+    yield
+    route_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="testdriver",
+        password="testpass123",
+        first_name="John",
+        last_name="Doe",
+    )
+
+
+@pytest.fixture
+def carrier(db):
+    return Carrier.objects.create(
+        name="Test Carrier",
+        mc_number="MC123456",
+        hos_cycle_choice="70",
+    )
+
+
+@pytest.fixture
+def driver(db, user, carrier):
+    return Driver.objects.create(user=user, license_number="DL123456", carrier=carrier)
+
+
+@pytest.fixture
+def vehicle(db, carrier):
+    return Vehicle.objects.create(
+        carrier=carrier, truck_number="TRUCK123", trailer_number="TRAILER456"
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
@@ -0,0 +1,257 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from trucker import renderers
+
+from trucker.models import Driver, DutyStatus, LogEntry, Stop, Trip
+
+
+def add_logs(carrier, vehicle, count, offset=0):
+    for index in range(offset, offset + count):
+        driver = Driver.objects.create(
+            user=User.objects.create_user(username=f"driver{index}", password="pw"),
+            license_number=f"DL{index}",
+            carrier=carrier,
+        )
+        log_entry = LogEntry.objects.create(
+            driver=driver,
+            vehicle=vehicle,
+            date=timezone.localdate() - timedelta(days=index),
+            start_odometer=0,
+            end_odometer=100,
+            signature="Driver",
+        )
+        start = timezone.now() - timedelta(days=index, hours=6)
+        DutyStatus.objects.bulk_create(
+            [
+                DutyStatus(
+                    log_entry=log_entry,
+                    driver=driver,
+                    status=status,
+                    start_time=start + timedelta(hours=hour),
+                    end_time=start + timedelta(hours=hour + 1),
+                    location_name="Yard",
+                )
+                for hour, status in enumerate(["ON", "D", "OFF"])
+            ]
+        )
+
+
+def test_log_list_query_count_is_constant(
+    api_client, carrier, vehicle, django_assert_num_queries
+):
+    add_logs(carrier, vehicle, 3)
+    with django_assert_num_queries(2) as small:
+        response = api_client.get("/api/logs/")
+    assert len(response.data["results"]) == 3
+
+    add_logs(carrier, vehicle, 30, offset=3)
+    with django_assert_num_queries(len(small.captured_queries)):
+        response = api_client.get("/api/logs/")
+    assert len(response.data["results"]) == 33
+    assert len(response.data["results"][0]["duty_statuses"]) == 3
+
+
+def test_log_list_is_cursor_paginated_newest_first(api_client, carrier, vehicle):
+    add_logs(carrier, vehicle, 5)
+
+    first = api_client.get("/api/logs/", {"page_size": 2})
+    dates = [entry["date"] for entry in first.data["results"]]
+    second = api_client.get(first.data["next"])
+
+    assert dates == sorted(dates, reverse=True)
+    assert first.data["previous"] is None
+    assert [entry["date"] for entry in second.data["results"]] < dates
+    assert len(second.data["results"]) == 2
+
+
+def test_log_list_is_compact_and_expandable(
+    api_client, carrier, vehicle, django_assert_num_queries
+):
+    add_logs(carrier, vehicle, 2)
+
+    compact = api_client.get("/api/logs/").data["results"][0]
+    assert isinstance(compact["driver"], int)
+    assert compact["driver_name"] == ""
+    assert compact["truck_number"] == vehicle.truck_number
+    assert all(isinstance(pk, int) for pk in compact["duty_statuses"])
+
+    sparse = api_client.get("/api/logs/", {"fields": "id,date"}).data["results"][0]
+    assert set(sparse) == {"id", "date"}
+
+    with django_assert_num_queries(2):
+        expanded = api_client.get(
+            "/api/logs/", {"expand": "driver.user,vehicle,duty_statuses"}
+        ).data["results"][0]
+    assert expanded["driver"]["user"]["username"].startswith("driver")
+    assert isinstance(expanded["driver"]["carrier"], int)
+    assert expanded["vehicle"]["truck_number"] == vehicle.truck_number
+    assert expanded["duty_statuses"][0]["status"] == "ON"
+
+
+def test_detail_nests_everything_without_auth_secrets(api_client, carrier, vehicle):
+    add_logs(carrier, vehicle, 1)
+    log_entry = LogEntry.objects.get()
+
+    detail = api_client.get(f"/api/logs/{log_entry.pk}/").data
+
+    user = detail["driver"]["user"]
+    assert detail["driver"]["carrier"]["name"] == carrier.name
+    assert detail["duty_statuses"][1]["status"] == "D"
+    assert not {"password", "groups", "user_permissions"} & set(user)
+
+
+def test_trip_list_expands_stops_on_request(api_client, driver, vehicle):
+    trip = Trip.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        pickup_location="Chicago, IL",
+        dropoff_location="Denver, CO",
+        current_location="Chicago, IL",
+        distance=1000,
+        estimated_duration=timedelta(hours=15),
+    )
+    stop = Stop.objects.create(
+        trip=trip,
+        stop_type="FUEL",
+        location_name="Fuel stop",
+        location_lat=41.0,
+        location_lon=-95.0,
+        scheduled_time=timezone.now(),
+        duration=timedelta(minutes=30),
+    )
+
+    compact = api_client.get("/api/trips/").data[0]
+    expanded = api_client.get("/api/trips/", {"expand": "stops"}).data[0]
+
+    assert compact["stops"] == [stop.pk]
+    assert compact["driver"] == driver.pk
+    assert expanded["stops"][0]["location_name"] == "Fuel stop"
+
+
+def test_timeline_is_columnar(api_client, driver, vehicle, monkeypatch):
+    log_entry = LogEntry.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        start_odometer=0,
+        end_odometer=100,
+        signature="John Doe",
+    )
+    start = timezone.now().replace(microsecond=0) - timedelta(hours=10)
+    DutyStatus.objects.bulk_create(
+        [
+            DutyStatus(
+                log_entry=log_entry,
+                driver=driver,
+                status=status,
+                start_time=start + timedelta(hours=hour),
+                end_time=start + timedelta(hours=hour + 1),
+                location_lat=41.0 + hour,
+                location_lon=-87.0,
+                location_name="Yard",
+            )
+            for hour, status in enumerate(["ON", "D", "OFF"])
+        ]
+    )
+
+    response = api_client.get(f"/api/drivers/{driver.pk}/timeline/")
+    data = json.loads(response.content)
+
+    assert response.status_code == 200
+    assert data["status"] == ["ON", "D", "OFF"]
+    assert data["lat"] == [41.0, 42.0, 43.0]
+    assert data["status_labels"]["SB"] == "Sleeper Berth"
+    assert parse_datetime(data["start_time"][1]) == start + timedelta(hours=1)
+
+    monkeypatch.setattr(renderers, "orjson", None)
+    fallback = api_client.get(
+        f"/api/drivers/{driver.pk}/timeline/",
+        {"start": (start + timedelta(hours=1, minutes=30)).isoformat()},
+    )
+    assert json.loads(fallback.content)["status"] == ["D", "OFF"]
+
+
+def add_trip(driver, vehicle, **kwargs):
+    return Trip.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        pickup_location="Chicago, IL",
+        dropoff_location="Denver, CO",
+        current_location="Chicago, IL",
+        distance=1000,
+        estimated_duration=timedelta(hours=15),
+        **kwargs,
+    )
+
+
+def test_trip_generate_logs_is_routed_and_cached(api_client, driver, vehicle):
+    trip = add_trip(driver, vehicle, start_time=timezone.now())
+
+    first = api_client.get(f"/api/trips/{trip.pk}/generate_logs/")
+    second = api_client.get(f"/api/trips/{trip.pk}/generate_logs/")
+
+    assert first.status_code == 200
+    assert first.data
+    assert second.data == json.loads(json.dumps(first.data, default=str))
+    assert Trip.objects.get(pk=trip.pk).plan.logs
+
+
+def test_trip_status_lists_stops(api_client, driver, vehicle):
+    trip = add_trip(driver, vehicle, start_time=timezone.now())
+    Stop.objects.create(
+        trip=trip,
+        stop_type="FUEL",
+        location_name="Fuel stop",
+        location_lat=41.0,
+        location_lon=-95.0,
+        scheduled_time=timezone.now(),
+        duration=timedelta(minutes=30),
+    )
+
+    response = api_client.get(f"/api/trips/{trip.pk}/status/")
+
+    assert response.status_code == 200
+    assert response.data["status"] == "in_progress"
+    assert [stop["location_name"] for stop in response.data["stops"]] == ["Fuel stop"]
+
+
+def test_generate_logs_defaults_to_60_hour_cycle_without_carrier(
+    api_client, driver, vehicle
+):
+    driver.carrier = None
+    driver.save()
+    trip = add_trip(driver, vehicle, start_time=timezone.now())
+
+    response = api_client.get(f"/api/trips/{trip.pk}/generate_logs/")
+
+    assert response.status_code == 200
+    assert response.data
+
+
+def test_active_trip_looks_up_driver_once(
+    api_client, driver, vehicle, django_assert_num_queries
+):
+    add_trip(driver, vehicle, completed=True, start_time=timezone.now())
+    trip = add_trip(driver, vehicle, start_time=timezone.now() - timedelta(hours=1))
+
+    with django_assert_num_queries(3):
+        response = api_client.get("/api/trips/active/")
+
+    assert response.data["id"] == trip.pk
+
+
+def test_trips_are_scoped_to_the_requesting_driver(api_client, carrier, vehicle):
+    other = Driver.objects.create(
+        user=User.objects.create_user(username="other", password="pw"),
+        license_number="DL-OTHER",
+        carrier=carrier,
+    )
+    trip = add_trip(other, vehicle, start_time=timezone.now())
+
+    assert api_client.get("/api/trips/").data == []
+    assert api_client.get("/api/trips/active/").status_code == 404
+    assert api_client.get(f"/api/trips/{trip.pk}/generate_logs/").status_code == 404
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import Client
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from trucker.models import Trip
+from trucker.services.async_stop_services import (
+    AsyncMapsClient,
+    plan_trip_stops_async,
+    set_async_transport,
+)
+
+
+def make_step(miles, hours, lat, lng):
+    return {
+        "distance": {"value": miles * 1609.34},
+        "duration": {"value": hours * 3600},
+        "end_location": {"lat": lat, "lng": lng},
+    }
+
+
+DIRECTIONS = {
+    "status": "OK",
+    "routes": [
+        {
+            "legs": [
+                {
+                    "distance": {"value": 2400 * 1609.34},
+                    "duration": {"value": 40 * 3600},
+                    "steps": [
+                        make_step(600, 10, 35.0 + index, -100.0 - index)
+                        for index in range(4)
+                    ],
+                }
+            ]
+        }
+    ],
+}
+
+PLACES = {
+    "status": "OK",
+    "results": [
+        {
+            "name": "Corridor Travel Center",
+            "geometry": {"location": {"lat": 36.0, "lng": -101.0}},
+        }
+    ],
+}
+
+
+class MapsHandler:
+    def __init__(self, fail_first=0):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self.fail_first = fail_first
+
+    async def __call__(self, request):
+        endpoint = request.url.path.rstrip("/").split("/")[-2]
+        self.calls.append(endpoint)
+        if self.fail_first:
+            self.fail_first -= 1
+            return httpx.Response(503)
+
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return httpx.Response(
+            200, json=DIRECTIONS if endpoint == "directions" else PLACES
+        )
+
+
+@pytest.fixture
+def maps_handler(settings):
+    settings.ASYNC_MAPS_CLIENT = {"BACKOFF_FACTOR": 0}
+    handler = MapsHandler()
+    set_async_transport(httpx.MockTransport(handler))
+    yield handler
+    set_async_transport(None)
+
+
+def test_plan_trip_stops_async_bounds_per_host_concurrency(db, maps_handler):
+    async def plan():
+        client = AsyncMapsClient(
+            transport=httpx.MockTransport(maps_handler), per_host=2
+        )
+        try:
+            return await plan_trip_stops_async(
+                "Los Angeles, CA", "New York, NY", 500, 500, client=client
+            )
+        finally:
+            await client.aclose()
+
+    stops = async_to_sync(plan)()
+
+    assert maps_handler.calls.count("directions") == 1
+    assert maps_handler.calls.count("nearbysearch") == 8
+    assert maps_handler.peak == 2
+    assert sorted(stop["stop_type"] for stop in stops) == ["FUEL"] * 4 + ["REST"] * 4
+    assert {stop["duration"] for stop in stops} == {
+        timedelta(minutes=30),
+        timedelta(minutes=45),
+    }
+
+
+def test_async_client_retries_server_errors(maps_handler):
+    maps_handler.fail_first = 2
+
+    async def fetch():
+        client = AsyncMapsClient(transport=httpx.MockTransport(maps_handler))
+        try:
+            return await client.get("directions", {"origin": "A"})
+        finally:
+            await client.aclose()
+
+    response = async_to_sync(fetch)()
+
+    assert response.status_code == 200
+    assert len(maps_handler.calls) == 3
+
+
+def test_async_stops_endpoint_replaces_trip_stops(
+    db, user, driver, vehicle, maps_handler, settings
+):
+    settings.TRIP_PLANNING_ASYNC = True
+    trip = Trip.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        pickup_location="Los Angeles, CA",
+        dropoff_location="New York, NY",
+        current_location="Los Angeles, CA",
+    )
+    client = Client(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+
+    response = client.post(f"/api/trips/{trip.pk}/stops/async/")
+
+    assert response.status_code == 200
+    assert len(response.json()["stops"]) == 4
+    assert trip.stops.count() == 4
+
+
+def test_async_stops_endpoint_requires_authentication(db):
+    response = Client().post("/api/trips/1/stops/async/")
+
+    assert response.status_code == 401
+
+
+def test_async_stops_endpoint_ignores_session_auth(user, driver):
+    trip = Trip.objects.create(
+        driver=driver,
+        pickup_location="Los Angeles, CA",
+        dropoff_location="New York, NY",
+        current_location="Los Angeles, CA",
+        completed=True,
+    )
+    client = Client()
+    client.force_login(user)
+
+    response = client.post(f"/api/trips/{trip.pk}/stops/async/")
+
+    assert response.status_code == 401
+
+
+def test_async_stops_endpoint_is_throttled(user, driver, monkeypatch):
+    monkeypatch.setattr(UserRateThrottle, "THROTTLE_RATES", {"user": "1/minute"})
+    trip = Trip.objects.create(
+        driver=driver,
+        pickup_location="Los Angeles, CA",
+        dropoff_location="New York, NY",
+        current_location="Los Angeles, CA",
+        completed=True,
+    )
+    client = Client(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+
+    first = client.post(f"/api/trips/{trip.pk}/stops/async/")
+    second = client.post(f"/api/trips/{trip.pk}/stops/async/")
+
+    assert first.status_code == 400
+    assert second.status_code == 429
+    assert int(second["Retry-After"]) > 0
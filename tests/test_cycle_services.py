@@ -0,0 +1,269 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+
+from trucker.models import (
+    CycleCalculation,
+    DailyDutyTotal,
+    Driver,
+    DutyStatus,
+    LogEntry,
+)
+from trucker.services.cycle_services import cycle_hours_used, last_restart_gap
+
+
+@pytest.fixture
+def log_entry(driver, vehicle):
+    return LogEntry.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        date=timezone.localdate(),
+        start_odometer=0,
+        end_odometer=300,
+        signature="John Doe",
+    )
+
+
+@pytest.fixture
+def day_start():
+    return timezone.localtime().replace(hour=1, minute=0, second=0, microsecond=0)
+
+
+def add_status(log_entry, start, hours, status="D"):
+    return DutyStatus.objects.create(
+        log_entry=log_entry,
+        status=status,
+        start_time=start,
+        end_time=start + timedelta(hours=hours),
+        location_name="En route",
+    )
+
+
+def totals(driver):
+    return dict(
+        DailyDutyTotal.objects.filter(driver=driver).values_list("date", "hours")
+    )
+
+
+def test_status_writes_apply_deltas(driver, log_entry, day_start):
+    today = day_start.date()
+    status = add_status(log_entry, day_start, 2)
+    add_status(log_entry, day_start + timedelta(hours=3), 1, status="ON")
+    add_status(log_entry, day_start + timedelta(hours=4), 1, status="OFF")
+
+    assert totals(driver) == {today: 3.0}
+    driver.refresh_from_db()
+    assert driver.current_cycle_used == 3.0
+
+    status.end_time = status.start_time + timedelta(hours=2.5)
+    status.save()
+    assert totals(driver) == {today: 3.5}
+
+    status.start_time -= timedelta(days=1)
+    status.end_time -= timedelta(days=1)
+    status.save()
+    assert totals(driver) == {today: 1.0, today - timedelta(days=1): 2.5}
+
+    status.status = "OFF"
+    status.save()
+    status.delete()
+    assert totals(driver) == {today: 1.0, today - timedelta(days=1): 0.0}
+    driver.refresh_from_db()
+    assert driver.current_cycle_used == 1.0
+
+
+def test_status_across_midnight_is_split_between_days(driver, log_entry, day_start):
+    today = day_start.date()
+    status = add_status(log_entry, day_start - timedelta(hours=3), 6)
+
+    assert totals(driver) == {today - timedelta(days=1): 2.0, today: 4.0}
+
+    DailyDutyTotal.objects.all().delete()
+    call_command("backfill_cycle_rollup", stdout=StringIO())
+    assert totals(driver) == {today - timedelta(days=1): 2.0, today: 4.0}
+
+    status.delete()
+    assert totals(driver) == {today - timedelta(days=1): 0.0, today: 0.0}
+
+
+def test_daily_total_migration_splits_at_midnight(driver, log_entry, day_start):
+    migration = import_module("trucker.migrations.0017_dailydutytotal")
+    today = day_start.date()
+    add_status(log_entry, day_start - timedelta(hours=3), 6)
+    DailyDutyTotal.objects.all().delete()
+
+    migration.backfill_daily_totals(apps, None)
+
+    assert totals(driver) == {today - timedelta(days=1): 2.0, today: 4.0}
+
+
+def test_moving_status_between_drivers(driver, carrier, vehicle, log_entry, day_start):
+    other = Driver.objects.create(
+        user=User.objects.create_user(username="other", password="testpass123"),
+        license_number="DL999",
+        carrier=carrier,
+    )
+    other_log = LogEntry.objects.create(
+        driver=other,
+        vehicle=vehicle,
+        start_odometer=0,
+        end_odometer=10,
+        signature="Other",
+    )
+    status = add_status(log_entry, day_start, 4)
+
+    status.log_entry = other_log
+    status.save()
+
+    assert totals(driver) == {day_start.date(): 0.0}
+    assert totals(other) == {day_start.date(): 4.0}
+    driver.refresh_from_db()
+    other.refresh_from_db()
+    assert (driver.current_cycle_used, other.current_cycle_used) == (0.0, 4.0)
+
+
+def test_cycle_sums_only_window_and_post_restart_days(driver, log_entry, day_start):
+    for days_ago in range(10):
+        add_status(log_entry, day_start - timedelta(days=days_ago), 5)
+
+    assert cycle_hours_used(driver) == 40.0
+
+    driver.last_34hr_restart = day_start - timedelta(days=2, hours=-2)
+    assert cycle_hours_used(driver) == 15.0
+
+
+def test_status_write_cost_is_constant(
+    driver, log_entry, day_start, django_assert_max_num_queries
+):
+    for days_ago in range(1, 8):
+        for hour in range(0, 10, 2):
+            add_status(log_entry, day_start - timedelta(days=days_ago, hours=-hour), 1)
+
+    with django_assert_max_num_queries(8):
+        add_status(log_entry, day_start, 1)
+
+
+def test_status_writes_maintain_cycle_rollup(driver, log_entry, day_start):
+    today = day_start.date()
+    add_status(log_entry, day_start - timedelta(days=2), 6)
+    status = add_status(log_entry, day_start, 4)
+
+    rollup = dict(
+        CycleCalculation.objects.filter(driver=driver).values_list(
+            "calculation_date", "total_hours"
+        )
+    )
+    assert rollup[today - timedelta(days=2)] == 6.0
+    assert rollup[today] == 10.0
+    assert rollup[today + timedelta(days=5)] == 10.0
+    assert rollup[today + timedelta(days=6)] == 4.0
+    assert len(rollup) == 10
+
+    status.delete()
+    assert CycleCalculation.objects.get(
+        driver=driver, calculation_date=today
+    ).total_hours == pytest.approx(6.0)
+
+
+def test_backfill_rebuilds_rollup_in_bulk(driver, log_entry, day_start):
+    for days_ago in range(3):
+        add_status(log_entry, day_start - timedelta(days=days_ago), 5)
+    DailyDutyTotal.objects.all().delete()
+    CycleCalculation.objects.all().delete()
+
+    call_command("backfill_cycle_rollup", stdout=StringIO())
+
+    assert totals(driver) == {
+        day_start.date() - timedelta(days=days_ago): 5.0 for days_ago in range(3)
+    }
+    assert CycleCalculation.objects.get(
+        driver=driver, calculation_date=day_start.date()
+    ).total_hours == pytest.approx(15.0)
+    assert CycleCalculation.objects.filter(driver=driver).count() == 10
+
+
+def test_recap_endpoint_reads_rollup(
+    api_client, driver, log_entry, day_start, django_assert_max_num_queries
+):
+    today = day_start.date()
+    for days_ago in range(8):
+        add_status(log_entry, day_start - timedelta(days=days_ago), 8)
+
+    with django_assert_max_num_queries(5):
+        response = api_client.get(f"/api/drivers/{driver.pk}/recap/")
+
+    assert response.status_code == 200
+    assert [day["date"] for day in response.data["days"]] == [
+        today - timedelta(days=7 - offset) for offset in range(8)
+    ]
+    assert response.data["days"][-1] == {
+        "date": today,
+        "hours": 8.0,
+        "cycle_total": 64.0,
+    }
+    assert response.data["cycle_used"] == 64.0
+    assert response.data["available_tomorrow"] == 14.0
+
+
+def test_deleting_driver_cascades_cleanly(driver, log_entry, day_start):
+    add_status(log_entry, day_start, 4)
+
+    driver.delete()
+
+    assert not DailyDutyTotal.objects.exists()
+    assert not CycleCalculation.objects.exists()
+
+
+def test_status_driver_follows_its_log_entry(
+    driver, carrier, vehicle, log_entry, day_start
+):
+    status = add_status(log_entry, day_start, 2)
+    assert status.driver_id == driver.pk
+
+    other = Driver.objects.create(
+        user=User.objects.create_user(username="other", password="testpass123"),
+        license_number="DL999",
+        carrier=carrier,
+    )
+    log_entry.driver = other
+    log_entry.save()
+
+    status.refresh_from_db()
+    assert status.driver_id == other.pk
+    driver.refresh_from_db()
+    other.refresh_from_db()
+    today = day_start.date()
+    assert totals(driver) == {today: 0.0}
+    assert totals(other) == {today: 2.0}
+    assert driver.current_cycle_used == 0.0
+    assert other.current_cycle_used == 2.0
+    assert CycleCalculation.objects.get(
+        driver=driver, calculation_date=today
+    ).total_hours == pytest.approx(0.0)
+    assert CycleCalculation.objects.get(
+        driver=other, calculation_date=today
+    ).total_hours == pytest.approx(2.0)
+
+
+def test_restart_found_from_on_duty_gaps(
+    driver, log_entry, day_start, django_assert_num_queries
+):
+    first = add_status(log_entry, day_start - timedelta(days=4), 4)
+    add_status(log_entry, day_start - timedelta(days=2), 4)
+    middle = add_status(log_entry, day_start - timedelta(days=1), 4)
+    last = add_status(log_entry, day_start, 2)
+
+    with django_assert_num_queries(1):
+        restart = last_restart_gap(driver)
+    assert restart == day_start - timedelta(days=2)
+    assert last_restart_gap(driver, as_of=first.end_time) is None
+
+    middle.delete()
+    driver.refresh_from_db()
+    assert driver.last_34hr_restart == last.start_time
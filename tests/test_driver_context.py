@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from trucker.services.driver_context import DriverContext, driver_context
+
+
+def obtain_token(client, kind="access"):
+    response = client.post(
+        "/api/token/", {"username": "testdriver", "password": "testpass123"}
+    )
+    return response.data[kind]
+
+
+def test_token_carries_driver_claims(driver, carrier):
+    token = AccessToken(obtain_token(APIClient()))
+
+    assert token["role"] == "driver"
+    assert token["driver_id"] == driver.pk
+    assert token["carrier_id"] == carrier.pk
+    assert token["hos_cycle"] == "70"
+
+
+def test_jwt_requests_skip_the_driver_lookup(driver):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {obtain_token(client)}")
+    # Creating the driver invalidated its context; let that marker lapse.
+    cache.clear()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/trips/")
+        single = client.get("/api/single-driver/")
+
+    assert response.status_code == 200
+    assert single.data == {"error": "No log entry found for this driver"}
+    assert response.wsgi_request.driver_context == DriverContext(
+        driver.pk, driver.carrier_id, "70"
+    )
+    assert not any('FROM "trucker_driver"' in q["sql"] for q in queries)
+
+
+def test_claims_older_than_an_invalidation_are_ignored(driver, carrier):
+    token = AccessToken(obtain_token(APIClient()))
+    cache.clear()
+    carrier.hos_cycle_choice = "60"
+    carrier.save()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert driver_context(driver.user, token).hos_cycle == "60"
+        assert driver_context(driver.user, token).hos_cycle == "60"
+
+    assert len(queries) == 1
+
+
+def test_refreshed_tokens_reload_driver_claims(driver, carrier):
+    client = APIClient()
+    refresh = obtain_token(client, "refresh")
+    carrier.hos_cycle_choice = "60"
+    carrier.save()
+    cache.clear()
+
+    response = client.post("/api/token/refresh/", {"refresh": refresh})
+    token = AccessToken(response.data["access"])
+
+    assert token["hos_cycle"] == "60"
+    assert token["driver_id"] == driver.pk
+    assert driver_context(driver.user, token).hos_cycle == "60"
+
+
+def test_user_without_driver_has_empty_context(user, api_client):
+    assert driver_context(user) == DriverContext()
+    assert api_client.get("/api/trips/").data == []
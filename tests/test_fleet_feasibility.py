@@ -0,0 +1,185 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+import pytest
+from django.contrib.auth.models import User
+
+from trucker.models import Driver, DutyStatus, LogEntry
+from trucker.services import fleet_feasibility
+from trucker.services.fleet_feasibility import (
+    duty_state,
+    plan_feasibility,
+    resets_only_eta,
+)
+from trucker.services.hos_planner import _resets_only, plan_hos
+
+START = datetime(2025, 3, 10, 6, 0, tzinfo=dt_timezone.utc)
+
+
+def add_driving(driver, vehicle, start, hours):
+    log_entry = LogEntry.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        date=start.date(),
+        start_odometer=0,
+        end_odometer=500,
+        signature="JD",
+    )
+    DutyStatus.objects.create(
+        log_entry=log_entry,
+        status="D",
+        start_time=start,
+        end_time=start + timedelta(hours=hours),
+        location_name="En route",
+    )
+
+
+def make_driver(carrier, username):
+    user = User.objects.create_user(username=username, password="testpass123")
+    return Driver.objects.create(user=user, license_number=username, carrier=carrier)
+
+
+@pytest.mark.parametrize("hours", [0.5, 8, 8.5, 11, 11.5, 22, 30, 69.5])
+def test_feasibility_matches_planner_for_rested_drivers(hours):
+    rested = [np.array([value]) for value in (np.inf, 0.0, 0.0, 0.0, 0.0)]
+
+    _, _, eta, _ = plan_feasibility(hours, *rested, np.array([70.0]))
+
+    assert eta[0] == pytest.approx(plan_hos(hours).total_hours)
+
+
+def random_fleet(count, seed=0):
+    rng = np.random.default_rng(seed)
+    cycle_hours = np.where(rng.random(count) < 0.5, 60.0, 70.0)
+    shift_driving = rng.uniform(0, 11, count)
+    window_used = np.minimum(shift_driving + rng.uniform(0, 3, count), 14.0)
+    since_break = np.minimum(shift_driving, rng.uniform(0, 8, count))
+    off_so_far = rng.uniform(0, 40, count)
+    cycle_used = rng.uniform(0, 1, count) * cycle_hours
+    return (
+        off_so_far,
+        shift_driving,
+        window_used,
+        since_break,
+        cycle_used,
+        cycle_hours,
+    )
+
+
+def test_vectorized_layout_matches_resets_only_planner():
+    off_so_far, shift, window, since, used, cycle_hours = random_fleet(50)
+    off_duty = np.minimum(off_so_far, 34.0)
+
+    eta, restarted = resets_only_eta(
+        30, shift, window, since, cycle_hours - used, cycle_hours, off_duty=off_duty
+    )
+
+    for index in range(50):
+        segments = _resets_only(
+            30,
+            used[index],
+            cycle_hours[index],
+            shift[index],
+            window[index],
+            since[index],
+            off_duty[index],
+        )
+        assert eta[index] == pytest.approx(segments[-1][2])
+        assert restarted[index] == any(kind == 2 for *_, kind in segments)
+
+
+def test_fleet_estimate_bounds_planner_calls(monkeypatch):
+    calls = []
+    planner = fleet_feasibility.plan_hos
+    monkeypatch.setattr(
+        fleet_feasibility,
+        "plan_hos",
+        lambda *args, **kwargs: calls.append(args) or planner(*args, **kwargs),
+    )
+    fleet = random_fleet(2000)
+
+    started = time.perf_counter()
+    feasible, needs_restart, eta, available = plan_feasibility(45, *fleet)
+    elapsed = time.perf_counter() - started
+
+    assert len(calls) <= fleet_feasibility.PLANNED_DRIVERS
+    assert elapsed < 2.0
+    assert eta.shape == (2000,) and (eta >= 45).all()
+
+
+def test_feasible_means_starting_now_without_a_restart():
+    state = [
+        np.array(values)
+        for values in (
+            [np.inf, 0.0, 0.0],
+            [0.0, 11.0, 0.0],
+            [0.0, 11.0, 0.0],
+            [0.0, 0.0, 0.0],
+            [0.0, 0.0, 70.0],
+        )
+    ]
+
+    feasible, needs_restart, eta, _ = plan_feasibility(
+        8, *state, np.array([70.0, 70.0, 70.0])
+    )
+
+    assert feasible.tolist() == [True, False, False]
+    assert needs_restart.tolist() == [False, False, True]
+    assert eta.tolist() == [8.0, 18.0, 42.0]
+
+
+def test_partial_shift_credits_time_already_off_toward_the_reset():
+    state = duty_state(
+        owner=np.array([0]),
+        driving=np.array([True]),
+        starts=np.array([-7.0]),
+        ends=np.array([-1.0]),
+        count=2,
+        cycle_hours=np.array([70.0, 70.0]),
+        restarts=np.array([-np.inf, -np.inf]),
+    )
+    off_so_far, shift_driving, window_used, since_break, cycle_used = state
+
+    assert shift_driving.tolist() == [6.0, 0.0]
+    assert window_used.tolist() == [7.0, 0.0]
+    assert cycle_used.tolist() == [6.0, 0.0]
+
+    feasible, needs_restart, eta, available = plan_feasibility(
+        10, *state, np.array([70.0, 70.0])
+    )
+    assert available.tolist() == [5.0, 11.0]
+    # Resting 9 more hours now beats driving 5, resetting 10 and driving 5.
+    assert eta.tolist() == [19.5, 10.5]
+    assert feasible.all() and not needs_restart.any()
+
+
+def test_feasibility_endpoint_ranks_carrier_drivers(
+    api_client, driver, carrier, vehicle
+):
+    partial = make_driver(carrier, "partial")
+    add_driving(partial, vehicle, START - timedelta(hours=9.5), 9)
+    cycled_out = make_driver(carrier, "cycled")
+    for day in range(1, 8):
+        add_driving(cycled_out, vehicle, START - timedelta(hours=24 * day - 3), 9)
+
+    response = api_client.post(
+        "/api/drivers/feasibility/",
+        {"duration_hours": 8, "earliest_start": START.isoformat()},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    ranked = {row["driver"]: row for row in response.data}
+    assert [row["driver"] for row in response.data] == [
+        driver.pk,
+        partial.pk,
+        cycled_out.pk,
+    ]
+    assert ranked[driver.pk]["eta_hours"] == 8.0
+    assert ranked[partial.pk]["eta_hours"] == 17.5
+    assert ranked[cycled_out.pk]["requires_restart"] is True
+    assert ranked[cycled_out.pk]["feasible"] is False
+    assert ranked[cycled_out.pk]["earliest_arrival"] == START + timedelta(hours=30)
+    assert ranked[cycled_out.pk]["cycle_remaining"] == 7.0
+    assert ranked[cycled_out.pk]["eta_hours"] == 30.0
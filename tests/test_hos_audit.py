@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from trucker.models import DutyStatus, LogEntry
+from trucker.services.hos_audit import (
+    BREAK,
+    CYCLE,
+    DRIVING_LIMIT,
+    DUTY_WINDOW,
+    audit_history,
+    local_window_starts,
+    run_audit,
+)
+
+START = datetime(2025, 3, 3, 6, 0, tzinfo=dt_timezone.utc)
+
+
+def history(*segments):
+    """Arrays from ``(status, hours)`` pairs laid end to end; OFF leaves a gap."""
+    driving, starts, ends, clock = [], [], [], 0.0
+    for status, hours in segments:
+        if status != "OFF":
+            driving.append(status == "D")
+            starts.append(clock)
+            ends.append(clock + hours)
+        clock += hours
+    return np.array(driving), np.array(starts), np.array(ends)
+
+
+def rules(results):
+    return {rule: list(rows) for rule, (rows, _, _) in results.items()}
+
+
+def test_legal_history_has_no_violations():
+    days = [("ON", 1), ("D", 7), ("OFF", 0.5), ("D", 3), ("OFF", 12.5)] * 5
+
+    assert audit_history(*history(*days), cycle_hours=70.0) == {}
+
+
+def test_shift_rules():
+    results = audit_history(
+        *history(("ON", 4), ("D", 6), ("OFF", 1), ("D", 6), ("OFF", 10), ("D", 9)),
+        cycle_hours=70.0,
+    )
+
+    assert rules(results) == {DRIVING_LIMIT: [2], DUTY_WINDOW: [2], BREAK: [3]}
+    rows, measured, limit = results[DRIVING_LIMIT]
+    assert measured[0] == pytest.approx(12.0)
+    assert limit == 11.0
+
+
+def test_cycle_counts_7_days_and_resets_after_restart():
+    days = [("ON", 3), ("D", 7), ("OFF", 0.5), ("D", 1), ("OFF", 12.5)] * 5
+    over = audit_history(*history(*days, ("D", 6)), cycle_hours=60.0)
+    restarted = audit_history(*history(*days, ("OFF", 34), ("D", 6)), cycle_hours=60.0)
+    seventy = audit_history(*history(*days, ("D", 6)), cycle_hours=70.0)
+
+    assert rules(over) == {CYCLE: [15]}
+    assert over[CYCLE][1][0] == pytest.approx(61.0)
+    assert restarted == {}
+    assert seventy == {}
+
+
+def test_hos_audit_command_streams_violations(driver, vehicle, tmp_path):
+    log_entry = LogEntry.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        date=START.date(),
+        start_odometer=0,
+        end_odometer=700,
+        signature="John Doe",
+    )
+    clock = START
+    for status, hours in (("D", 6), ("D", 6), ("ON", 1)):
+        DutyStatus.objects.bulk_create(
+            [
+                DutyStatus(
+                    log_entry=log_entry,
+                    driver=driver,
+                    status=status,
+                    start_time=clock,
+                    end_time=clock + timedelta(hours=hours),
+                    location_name="En route",
+                )
+            ]
+        )
+        clock += timedelta(hours=hours)
+
+    violations = list(run_audit(chunk_size=2))
+    assert {violation.rule for violation in violations} == {DRIVING_LIMIT, BREAK}
+    assert violations[0].start_time == START + timedelta(hours=6)
+
+    report = tmp_path / "audit.csv"
+    err = StringIO()
+    call_command("hos_audit", output=str(report), stdout=StringIO(), stderr=err)
+    lines = report.read_text().splitlines()
+    assert lines[0] == "driver_id,rule,start_time,end_time,hours,limit"
+    assert len(lines) == 3
+    assert err.getvalue().startswith("2 violation(s)")
+
+    out = StringIO()
+    naive_since = (START + timedelta(hours=13)).replace(tzinfo=None).isoformat()
+    call_command("hos_audit", since=naive_since, stdout=out, stderr=StringIO())
+    assert len(out.getvalue().splitlines()) == 1
+
+    assert not list(run_audit(since=START + timedelta(days=2)))
+
+
+def test_cycle_windows_open_at_local_midnight(settings):
+    settings.TIME_ZONE = "America/Chicago"
+    end_days = np.array(["2025-03-10", "2025-03-10", "2025-03-17"], "datetime64[D]")
+
+    window_starts = local_window_starts(end_days, 8)
+
+    opens = [datetime(2025, 3, 3, 6), datetime(2025, 3, 10, 5)]
+    expected = [opens[0], opens[0], opens[1]]
+    assert window_starts.tolist() == [
+        day.replace(tzinfo=dt_timezone.utc).timestamp() / 3600 for day in expected
+    ]
@@ -0,0 +1,224 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from django.utils import timezone
+
+from trucker.models import DutyStatus, LogEntry, Trip, TripPlan
+from trucker.services.hos_planner import (
+    DRIVE,
+    DRIVING,
+    OFF_DUTY,
+    RESET,
+    RESTART,
+    SLEEPER,
+    SPLIT,
+    plan_hos,
+)
+from trucker.services.hos_services import (
+    cached_hos_logs,
+    generate_hos_logs,
+    plan_inputs_hash,
+)
+from trucker.validators import validate_sleeper_berth
+
+
+def test_short_trip_is_a_single_driving_segment():
+    plan = plan_hos(5)
+
+    assert plan.segments == ((DRIVING, 0.0, 5.0, 0),)
+    assert plan.total_hours == 5.0
+    assert plan.cycle_used == 5.0
+
+
+def test_long_trip_takes_breaks_and_daily_resets():
+    plan = plan_hos(20, cycle_used=10)
+
+    assert plan.segments == (
+        (DRIVING, 0.0, 8.0, DRIVE),
+        (OFF_DUTY, 8.0, 8.5, DRIVE),
+        (DRIVING, 8.5, 11.5, DRIVE),
+        (OFF_DUTY, 11.5, 21.5, RESET),
+        (DRIVING, 21.5, 29.5, DRIVE),
+        (OFF_DUTY, 29.5, 30.0, DRIVE),
+        (DRIVING, 30.0, 31.0, DRIVE),
+    )
+    assert plan.resets == 1
+    assert plan.cycle_remaining == 40.0
+
+
+def test_split_sleeper_berth_beats_flat_resets():
+    plan = plan_hos(45)
+
+    assert plan.total_hours < plan_hos(45, splits=False).total_hours
+    assert {
+        (status, end - start)
+        for status, start, end, kind in plan.segments
+        if kind == SPLIT
+    } <= {
+        (SLEEPER, 7.0),
+        (OFF_DUTY, 3.0),
+        (SLEEPER, 8.0),
+        (OFF_DUTY, 2.0),
+    }
+    validate_sleeper_berth(
+        [SimpleNamespace(**log) for log in plan.to_logs(datetime(2025, 3, 3, 6, 0))]
+    )
+
+
+def test_split_pair_recalculates_from_end_of_first_half():
+    plan = plan_hos(15)
+
+    assert plan.segments == (
+        (DRIVING, 0.0, 8.0, DRIVE),
+        (SLEEPER, 8.0, 15.0, SPLIT),
+        (DRIVING, 15.0, 18.0, DRIVE),
+        (OFF_DUTY, 18.0, 21.0, SPLIT),
+        (DRIVING, 21.0, 25.0, DRIVE),
+    )
+
+
+def test_trip_beyond_cycle_takes_34_hour_restart():
+    plan = plan_hos(30, cycle_used=50, cycle_hours=70)
+
+    assert plan.restarts == 1
+    restart = next(segment for segment in plan.segments if segment[3] == RESTART)
+    assert restart[2] - restart[1] == 34.0
+    before_restart = sum(
+        end - start
+        for status, start, end, _ in plan.segments
+        if status == DRIVING and end <= restart[1]
+    )
+    assert before_restart <= 20.0
+    assert plan.cycle_used == pytest.approx(30 - before_restart)
+
+
+@pytest.mark.parametrize("splits", [True, False])
+def test_mid_shift_departure_continues_the_current_shift(splits):
+    plan = plan_hos(4, shift_driving=9, window_used=10, since_break=2, splits=splits)
+
+    assert plan.segments[0] == (DRIVING, 0.0, 2.0, 0)
+    assert plan.segments[1][2] - plan.segments[1][1] == 10.0
+    assert plan.total_hours == 14.0
+
+
+def test_time_off_before_departure_shortens_a_restart():
+    plan = plan_hos(8, cycle_used=69, cycle_hours=70, off_duty=20)
+
+    assert plan.segments[0][3] == RESTART
+    assert plan.segments[0][2] == 14.0
+    assert plan.total_hours == 22.0
+
+
+def test_cross_country_search_is_fast():
+    runs = 50
+    started_at = time.perf_counter()
+    for _ in range(runs):
+        plan_hos(45, cycle_used=40)
+    elapsed = (time.perf_counter() - started_at) / runs
+
+    assert elapsed < 0.01
+
+
+def test_resets_only_plan_is_sub_millisecond():
+    runs = 1000
+    started_at = time.perf_counter()
+    for _ in range(runs):
+        plan = plan_hos(69.5, splits=False)
+    elapsed = (time.perf_counter() - started_at) / runs
+
+    assert sum(
+        end - start for status, start, end, _ in plan.segments if status == DRIVING
+    ) == pytest.approx(69.5)
+    assert elapsed < 0.001
+
+
+def test_generate_hos_logs_leaves_driver_untouched(driver, vehicle, settings):
+    settings.TRIP_PLANNING_ASYNC = True
+    driver.current_cycle_used = 12
+    driver.save()
+    trip = Trip.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        pickup_location="Chicago, IL",
+        dropoff_location="Denver, CO",
+        current_location="Chicago, IL",
+        start_time=datetime(2025, 3, 3, 6, 0),
+        estimated_duration=timedelta(hours=15),
+    )
+
+    logs = generate_hos_logs(trip)
+
+    assert [log["location_name"] for log in logs] == [
+        "En route",
+        "Sleeper berth",
+        "En route",
+        "Split rest",
+        "En route",
+    ]
+    assert logs[-1]["end_time"] == datetime(2025, 3, 4, 7, 0)
+    driver.refresh_from_db()
+    assert driver.current_cycle_used == 12
+
+
+@pytest.fixture
+def planned_trip(driver, vehicle, settings):
+    settings.TRIP_PLANNING_ASYNC = True
+    return Trip.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        pickup_location="Chicago, IL",
+        dropoff_location="Denver, CO",
+        current_location="Chicago, IL",
+        start_time=datetime(2025, 3, 3, 6, 0),
+        distance=1000,
+        estimated_duration=timedelta(hours=15),
+    )
+
+
+def test_cached_plan_is_served_until_inputs_change(
+    planned_trip, django_assert_num_queries
+):
+    logs = cached_hos_logs(planned_trip)
+    plan = TripPlan.objects.get(trip=planned_trip)
+
+    with django_assert_num_queries(1):
+        assert cached_hos_logs(planned_trip) == logs
+
+    planned_trip.estimated_duration = timedelta(hours=5)
+    planned_trip.save()
+    assert not TripPlan.objects.filter(pk=plan.pk).exists()
+    assert len(cached_hos_logs(planned_trip)) == 1
+
+
+def test_duty_history_change_rebuilds_plan(planned_trip, driver, vehicle):
+    cached_hos_logs(planned_trip)
+    log_entry = LogEntry.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        start_odometer=0,
+        end_odometer=10,
+        signature="John Doe",
+    )
+    start = timezone.now() - timedelta(hours=3)
+    DutyStatus.objects.create(
+        log_entry=log_entry,
+        status="D",
+        start_time=start,
+        end_time=start + timedelta(hours=2),
+        location_name="Yard",
+    )
+
+    assert not TripPlan.objects.filter(trip=planned_trip).exists()
+    planned_trip.driver.refresh_from_db()
+    previous_hash = plan_inputs_hash(planned_trip)
+    cached_hos_logs(planned_trip)
+    assert TripPlan.objects.get(trip=planned_trip).inputs_hash == previous_hash
+
+
+def test_stale_hash_is_rebuilt(planned_trip):
+    cached_hos_logs(planned_trip)
+    TripPlan.objects.filter(trip=planned_trip).update(inputs_hash="stale", logs=[])
+
+    assert cached_hos_logs(planned_trip)[-1]["end_time"] == "2025-03-04T07:00:00"
@@ -0,0 +1,261 @@
+import json
+from datetime import datetime, timedelta
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from trucker.models import CycleCalculation, DailyDutyTotal, DutyStatus, LogEntry
+from trucker.services.log_ingestion import ingest_logs
+
+
+@pytest.fixture
+def day_start():
+    return timezone.localtime().replace(
+        hour=1, minute=0, second=0, microsecond=0
+    ) - timedelta(days=2)
+
+
+def day_entry(driver, vehicle, start, segments, **fields):
+    statuses, clock = [], start
+    for status, hours in segments:
+        end = clock + timedelta(hours=hours)
+        statuses.append(
+            {
+                "status": status,
+                "start_time": clock,
+                "end_time": end,
+                "location_name": "En route",
+            }
+        )
+        clock = end
+    return {
+        "driver_id": driver.pk,
+        "vehicle_id": vehicle.pk,
+        "date": start.date(),
+        "start_odometer": 0,
+        "end_odometer": 500,
+        "signature": "John Doe",
+        "duty_statuses": statuses,
+        **fields,
+    }
+
+
+def test_ingest_writes_in_bulk_and_recomputes_once(
+    driver, vehicle, day_start, django_assert_max_num_queries
+):
+    entries = [
+        day_entry(
+            driver,
+            vehicle,
+            day_start + timedelta(days=offset),
+            [("ON", 1), ("D", 6), ("OFF", 0.5), ("D", 3), ("OFF", 10)],
+        )
+        for offset in range(2)
+    ]
+
+    with django_assert_max_num_queries(17):
+        result = ingest_logs(entries)
+
+    assert len(result.logs) == 2
+    assert result.statuses == 10
+    assert result.drivers == 1
+    assert result.rows_per_second > 0
+    assert LogEntry.objects.get(pk=result.logs[0].pk).total_miles == 500
+    assert DutyStatus.objects.filter(driver=driver).count() == 10
+    assert dict(
+        DailyDutyTotal.objects.filter(driver=driver).values_list("date", "hours")
+    ) == {day_start.date(): 10.0, day_start.date() + timedelta(days=1): 10.0}
+    assert CycleCalculation.objects.get(
+        driver=driver, calculation_date=day_start.date() + timedelta(days=1)
+    ).total_hours == pytest.approx(20.0)
+    driver.refresh_from_db()
+    assert driver.current_cycle_used == pytest.approx(20.0)
+
+
+def test_ingest_records_restart(driver, vehicle, day_start):
+    result = ingest_logs(
+        [day_entry(driver, vehicle, day_start, [("OFF", 12), ("SB", 23), ("D", 1)])]
+    )
+
+    driver.refresh_from_db()
+    assert driver.last_34hr_restart == day_start + timedelta(hours=35)
+    assert result.statuses == 3
+
+
+def test_invalid_entry_writes_nothing(driver, vehicle, day_start):
+    entries = [
+        day_entry(driver, vehicle, day_start, [("D", 6), ("OFF", 1)]),
+        day_entry(driver, vehicle, day_start + timedelta(days=1), [("D", 8), ("D", 1)]),
+    ]
+
+    with pytest.raises(ValidationError) as excinfo:
+        ingest_logs(entries)
+
+    assert list(excinfo.value.message_dict) == ["1"]
+    assert not LogEntry.objects.exists()
+    assert not DailyDutyTotal.objects.exists()
+
+
+def api_payload(driver, vehicle, day_start, segments):
+    entry = day_entry(driver, vehicle, day_start, segments)
+    return {
+        "driver": driver.pk,
+        "vehicle": vehicle.pk,
+        "start_odometer": 0,
+        "end_odometer": 200,
+        "signature": "John Doe",
+        "duty_statuses": [
+            {
+                **status,
+                "start_time": status["start_time"].isoformat(),
+                "end_time": status["end_time"].isoformat(),
+                "location_lat": 41.8,
+                "location_lon": -87.6,
+            }
+            for status in entry["duty_statuses"]
+        ],
+    }
+
+
+def test_bulk_endpoint(api_client, driver, vehicle, day_start):
+    payload = api_payload(driver, vehicle, day_start, [("ON", 1), ("D", 4)])
+
+    response = api_client.post("/api/logs/bulk/", [payload], format="json")
+
+    assert response.status_code == 201
+    assert response.data["statuses"] == 2
+    driver.refresh_from_db()
+    assert driver.current_cycle_used == pytest.approx(5.0)
+
+
+def test_create_without_date_uses_today(api_client, driver, vehicle, day_start):
+    payload = api_payload(driver, vehicle, day_start, [("ON", 1), ("D", 4)])
+
+    response = api_client.post("/api/logs/", payload, format="json")
+
+    assert response.status_code == 201
+    assert LogEntry.objects.get().date == timezone.localdate()
+
+
+def test_bulk_endpoint_rejects_status_ending_before_it_starts(
+    api_client, driver, vehicle, day_start
+):
+    payload = api_payload(driver, vehicle, day_start, [("ON", 1), ("D", -2)])
+
+    response = api_client.post("/api/logs/bulk/", [payload], format="json")
+
+    assert response.status_code == 400
+    assert response.data == {"0": ["Duty status must end after it starts."]}
+    assert not DutyStatus.objects.exists()
+
+
+def test_ingest_validates_status_fields(driver, vehicle, day_start):
+    entry = day_entry(driver, vehicle, day_start, [("DRIVING", 2)])
+
+    with pytest.raises(ValidationError) as excinfo:
+        ingest_logs([entry])
+
+    assert excinfo.value.message_dict == {
+        "0": ["Value 'DRIVING' is not a valid choice."]
+    }
+
+
+def test_ingest_logs_command_rejects_unknown_driver(tmp_path, driver, vehicle):
+    ndjson = tmp_path / "logs.ndjson"
+    ndjson.write_text(
+        json.dumps(
+            {
+                "driver": driver.pk + 100,
+                "vehicle": vehicle.pk,
+                "start_odometer": 0,
+                "end_odometer": 100,
+                "signature": "John Doe",
+            }
+        )
+        + "\n"
+    )
+
+    with pytest.raises(CommandError, match=f"Unknown driver {driver.pk + 100}"):
+        call_command("ingest_logs", str(ndjson), stdout=StringIO())
+    assert not LogEntry.objects.exists()
+
+
+def test_ingest_logs_command_reads_ndjson_and_csv(tmp_path, driver, vehicle, day_start):
+    entry = day_entry(driver, vehicle, day_start, [("ON", 1), ("D", 4)])
+    ndjson = tmp_path / "logs.ndjson"
+    ndjson.write_text(
+        json.dumps(
+            {
+                **{key: value for key, value in entry.items() if key[-3:] != "_id"},
+                "driver": driver.pk,
+                "vehicle": vehicle.pk,
+                "date": entry["date"].isoformat(),
+            },
+            default=str,
+        )
+        + "\n"
+    )
+
+    next_day = day_start + timedelta(days=1)
+    header = (
+        "driver,vehicle,date,start_odometer,end_odometer,signature,"
+        "status,start_time,end_time,location_name\n"
+    )
+    rows = [
+        f"{driver.pk},{vehicle.pk},{next_day.date()},0,100,John Doe,{status},"
+        f"{start.isoformat()},{(start + timedelta(hours=hours)).isoformat()},Yard\n"
+        for status, start, hours in (
+            ("ON", next_day, 1),
+            ("D", next_day + timedelta(hours=1), 2),
+        )
+    ]
+    csv_file = tmp_path / "logs.csv"
+    csv_file.write_text(header + "".join(rows))
+
+    out = StringIO()
+    call_command("ingest_logs", str(ndjson), stdout=out)
+    call_command("ingest_logs", str(csv_file), stdout=out)
+
+    assert "rows/s" in out.getvalue()
+    assert LogEntry.objects.count() == 2
+    assert DutyStatus.objects.count() == 4
+    driver.refresh_from_db()
+    assert driver.current_cycle_used == pytest.approx(8.0)
+
+
+def test_ingest_logs_command_accepts_naive_csv_times(tmp_path, driver, vehicle):
+    header = (
+        "driver,vehicle,date,start_odometer,end_odometer,signature,"
+        "status,start_time,end_time,location_name\n"
+    )
+    csv_file = tmp_path / "logs.csv"
+    csv_file.write_text(
+        header + f"{driver.pk},{vehicle.pk},2025-03-01,0,100,John Doe,D,"
+        "2025-03-01T06:00:00,2025-03-01T09:00:00,Yard\n"
+    )
+
+    call_command("ingest_logs", str(csv_file), stdout=StringIO())
+
+    status = DutyStatus.objects.get()
+    assert status.start_time == timezone.make_aware(datetime(2025, 3, 1, 6, 0))
+    assert status.duration == 3.0
+
+
+@pytest.mark.parametrize("end_time", ["", "2025-03-01T25:00:00", "yesterday"])
+def test_ingest_logs_command_rejects_bad_times(tmp_path, driver, vehicle, end_time):
+    header = (
+        "driver,vehicle,start_odometer,end_odometer,signature,"
+        "status,start_time,end_time\n"
+    )
+    csv_file = tmp_path / "logs.csv"
+    csv_file.write_text(
+        header + f"{driver.pk},{vehicle.pk},0,100,John Doe,D,"
+        f"2025-03-01T06:00:00,{end_time}\n"
+    )
+
+    with pytest.raises(CommandError, match="end_time must be an ISO datetime"):
+        call_command("ingest_logs", str(csv_file), stdout=StringIO())
+    assert not LogEntry.objects.exists()
@@ -370,6 +370,22 @@ def test_34_hour_restart_success(driver, log_entry):
     assert driver.check_34hr_restart(timezone.localtime())
 
 
+def test_34_hour_restart_interrupted_by_on_duty_time(driver, log_entry):
+    now = timezone.localtime().replace(microsecond=0)
+    DutyStatus.objects.create(
+        log_entry=log_entry,
+        status="ON",
+        start_time=now - timedelta(hours=20),
+        end_time=now - timedelta(hours=19),
+        location_name="Yard",
+    )
+
+    assert not driver.check_34hr_restart(now)
+    assert driver.check_34hr_restart(now + timedelta(hours=15))
+    driver.refresh_from_db()
+    assert driver.last_34hr_restart == now + timedelta(hours=15)
+
+
 def test_8_day_cycle_reset(driver):
     old_date = timezone.now() - timedelta(days=9)
     CycleCalculation.objects.create(
@@ -0,0 +1,113 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+
+from trucker.models import PlanningJob, Trip
+from trucker.services.planning_queue import (
+    claim_next_job,
+    requeue_stale_jobs,
+    run_pending_jobs,
+)
+
+
+@pytest.fixture
+def directions_response():
+    step = {
+        "distance": {"value": 1609344},
+        "duration": {"value": 64800},
+        "end_location": {"lat": 35.2, "lng": -101.8},
+    }
+    leg = {"distance": step["distance"], "duration": step["duration"], "steps": [step]}
+    return {"status": "OK", "routes": [{"legs": [leg]}]}
+
+
+@pytest.fixture
+def places_response():
+    return {
+        "status": "OK",
+        "results": [
+            {
+                "name": "Amarillo Truck Stop",
+                "geometry": {"location": {"lat": 35.2, "lng": -101.8}},
+            }
+        ],
+    }
+
+
+@pytest.fixture
+def trip(driver, maps_transport):
+    return Trip.objects.create(
+        driver=driver,
+        current_location="Los Angeles, CA",
+        pickup_location="Los Angeles, CA",
+        dropoff_location="Oklahoma City, OK",
+    )
+
+
+def test_trip_create_defers_planning(trip, maps_transport):
+    assert trip.planning_status == Trip.PlanningStatus.PENDING
+    assert trip.distance is None
+    assert maps_transport.calls == []
+    assert PlanningJob.objects.filter(trip=trip, status="queued").count() == 1
+
+
+def test_worker_computes_route_and_stops(
+    trip, maps_transport, directions_response, places_response
+):
+    maps_transport.add("directions", directions_response)
+    maps_transport.add("nearbysearch", places_response)
+
+    call_command("run_planning_worker", "--once")
+
+    trip.refresh_from_db()
+    assert trip.planning_status == Trip.PlanningStatus.READY
+    assert trip.distance == 1000.0
+    assert trip.estimated_duration == timedelta(hours=18)
+    assert trip.stops.count() == 2
+    assert maps_transport.count("directions") == 1
+    assert PlanningJob.objects.get(trip=trip).status == PlanningJob.Status.DONE
+
+
+def test_failed_job_is_retried_then_marked_failed(trip, maps_transport, settings):
+    settings.TRIP_PLANNING_MAX_ATTEMPTS = 2
+    maps_transport.add("directions", {"status": "NOT_FOUND"})
+
+    assert run_pending_jobs() == 1
+    trip.refresh_from_db()
+    assert trip.planning_status == Trip.PlanningStatus.PENDING
+
+    PlanningJob.objects.update(run_after=trip.created_at)
+    assert run_pending_jobs() == 1
+    trip.refresh_from_db()
+    job = PlanningJob.objects.get(trip=trip)
+    assert job.status == PlanningJob.Status.FAILED
+    assert job.attempts == 2
+    assert trip.planning_status == Trip.PlanningStatus.FAILED
+    assert "directions" in trip.planning_error
+
+
+def test_stale_running_job_is_requeued_then_failed(trip, settings):
+    settings.TRIP_PLANNING_MAX_ATTEMPTS = 2
+    job = claim_next_job()
+    assert requeue_stale_jobs() == 0
+
+    PlanningJob.objects.update(started_at=job.started_at - timedelta(hours=1))
+    reclaimed = claim_next_job()
+    trip.refresh_from_db()
+    assert reclaimed.pk == job.pk
+    assert reclaimed.attempts == 2
+    assert trip.planning_status == Trip.PlanningStatus.PLANNING
+
+    PlanningJob.objects.update(started_at=job.started_at - timedelta(hours=1))
+    assert requeue_stale_jobs() == 1
+    trip.refresh_from_db()
+    assert PlanningJob.objects.get().status == PlanningJob.Status.FAILED
+    assert trip.planning_status == Trip.PlanningStatus.FAILED
+
+
+def test_planning_status_endpoint(api_client, trip):
+    response = api_client.get(f"/api/trips/{trip.id}/planning/")
+
+    assert response.status_code == 200
+    assert response.data["planning_status"] == "pending"
+    assert response.data["job"]["status"] == "queued"
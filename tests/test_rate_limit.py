@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from trucker.exceptions import MapsQuotaExceeded, RouteServiceError
+from trucker.services.places_cache import places_cache
+from trucker.services.rate_limit import (
+    Priority,
+    RequestScheduler,
+    maps_scheduler,
+    request_priority,
+)
+from trucker.services.stop_services import RoutePlan, query_places
+
+WAYPOINT = {"lat": 36.0, "lng": -101.0}
+
+
+@pytest.fixture
+def rate_limits(settings):
+    settings.MAPS_RATE_LIMITS = {
+        "default": {"RATE": 20, "BURST": 2},
+        "MAX_WAIT": 5,
+        "PENALTY_SECONDS": 0,
+    }
+    maps_scheduler.reset()
+    yield settings.MAPS_RATE_LIMITS
+    maps_scheduler.reset()
+
+
+def test_token_bucket_paces_requests_to_quota(rate_limits):
+    scheduler = RequestScheduler()
+
+    started_at = time.monotonic()
+    for _ in range(6):
+        scheduler.acquire("directions")
+    elapsed = time.monotonic() - started_at
+
+    assert elapsed == pytest.approx(0.2, abs=0.1)
+    stats = scheduler.stats()["directions"]
+    assert stats["requests"] == 6
+    assert stats["queued"] == 4
+    assert stats["max_wait_ms"] > 0
+
+
+def test_interactive_requests_jump_batch_queue(rate_limits):
+    rate_limits["default"] = {"RATE": 10, "BURST": 1}
+    scheduler = RequestScheduler()
+    scheduler.acquire("place/nearbysearch")
+    order = []
+
+    def call(priority):
+        scheduler.acquire("place/nearbysearch", priority)
+        order.append(priority)
+
+    batch = threading.Thread(target=call, args=(Priority.BATCH,))
+    interactive = threading.Thread(target=call, args=(Priority.INTERACTIVE,))
+    batch.start()
+    time.sleep(0.01)
+    interactive.start()
+    batch.join()
+    interactive.join()
+
+    assert order == [Priority.INTERACTIVE, Priority.BATCH]
+    assert scheduler.stats()["place/nearbysearch"]["by_priority"] == {
+        "interactive": 2,
+        "batch": 1,
+    }
+
+
+def test_request_priority_is_scoped(rate_limits):
+    with request_priority(Priority.BATCH):
+        maps_scheduler.acquire("directions")
+    maps_scheduler.acquire("directions")
+
+    assert maps_scheduler.stats()["directions"]["by_priority"] == {
+        "batch": 1,
+        "interactive": 1,
+    }
+
+
+def test_query_places_retries_over_query_limit(rate_limits, maps_transport):
+    maps_transport.add(
+        "nearbysearch",
+        {"status": "OVER_QUERY_LIMIT"},
+        {"status": "OK", "results": [{"name": "Travel Center"}]},
+    )
+
+    results = query_places("fake-key", WAYPOINT, "gas_station")
+
+    assert results == [{"name": "Travel Center"}]
+    assert maps_transport.count("nearbysearch") == 2
+    assert maps_scheduler.stats()["place/nearbysearch"]["throttled"] == 1
+
+
+def test_query_places_raises_instead_of_returning_nothing(rate_limits, maps_transport):
+    maps_transport.add("nearbysearch", {"status": "OVER_QUERY_LIMIT"})
+    with pytest.raises(MapsQuotaExceeded):
+        query_places("fake-key", WAYPOINT, "gas_station")
+
+    maps_transport.payloads["nearbysearch"] = [
+        {"status": "REQUEST_DENIED", "error_message": "Key rejected"}
+    ]
+    with pytest.raises(RouteServiceError, match="Key rejected"):
+        query_places("fake-key", WAYPOINT, "gas_station")
+
+    maps_transport.payloads["nearbysearch"] = [{"status": "ZERO_RESULTS"}]
+    assert query_places("fake-key", WAYPOINT, "gas_station") == []
+
+
+def test_failed_lookups_fail_the_plan_but_keep_cached_cells(
+    db, rate_limits, maps_transport
+):
+    step = {
+        "distance": {"value": 2 * 1000 * 1609.34},
+        "duration": {"value": 20 * 3600},
+        "end_location": {"lat": 38.0, "lng": -98.0},
+    }
+    maps_transport.add(
+        "directions",
+        {
+            "status": "OK",
+            "routes": [
+                {
+                    "legs": [
+                        {
+                            "distance": step["distance"],
+                            "duration": step["duration"],
+                            "steps": [
+                                {**step, "end_location": WAYPOINT},
+                                step,
+                            ],
+                        }
+                    ]
+                }
+            ],
+        },
+    )
+    maps_transport.add(
+        "nearbysearch",
+        {"status": "OK", "results": [{"name": "Travel Center"}]},
+        {"status": "UNKNOWN_ERROR"},
+    )
+    plan = RoutePlan("fake-key", "A", "B")
+
+    with pytest.raises(RouteServiceError, match="1 places lookup"):
+        plan.find_stops({"gas_station": 1000}, max_workers=1)
+
+    jobs = plan.place_jobs({"gas_station": 1000})
+    cached = places_cache.get_many({(cell, place_type) for cell, place_type, _ in jobs})
+    assert len(cached) == 1
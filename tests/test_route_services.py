@@ -0,0 +1,297 @@
+import json
+import pytest
+from datetime import timedelta
+
+from trucker.models import RouteCache
+from trucker.services.maps_client import (
+    FixtureTransport,
+    MapsClient,
+    RecordedResponse,
+    SessionTransport,
+)
+from trucker.services.rate_limit import maps_scheduler
+from trucker.services.route_cache import make_key, route_cache
+from trucker.services.route_services import (
+    calculate_route_distance,
+    RouteResult,
+    calculate_route_distances,
+    chunk_route_pairs,
+    get_route,
+)
+
+
+@pytest.fixture
+def distance_matrix_response():
+    return {
+        "status": "OK",
+        "rows": [
+            {
+                "elements": [
+                    {
+                        "distance": {"text": "925 mi", "value": 1488637},
+                        "duration": {"text": "13 hours 30 mins", "value": 48600},
+                    }
+                ]
+            }
+        ],
+    }
+
+
+def test_make_key_normalizes_locations():
+    assert make_key("Chicago ,  IL", "DALLAS,TX") == make_key(
+        "chicago, il", "  dallas , tx "
+    )
+
+
+def test_repeat_lane_served_from_cache(db, maps_transport, distance_matrix_response):
+    maps_transport.add("distancematrix", distance_matrix_response)
+
+    first = calculate_route_distance("Chicago, IL", "Dallas, TX")
+    second = calculate_route_distance("chicago,il", "dallas, tx")
+
+    assert first == second
+    assert maps_transport.count("distancematrix") == 1
+    assert RouteCache.objects.count() == 1
+    stats = route_cache.stats.as_dict()
+    assert stats["misses"] == 1
+    assert stats["memory_hits"] == 1
+
+
+def test_database_tier_survives_memory_clear(
+    db, maps_transport, distance_matrix_response
+):
+    maps_transport.add("distancematrix", distance_matrix_response)
+
+    calculate_route_distance("Chicago, IL", "Dallas, TX")
+    route_cache.clear()
+    calculate_route_distance("Chicago, IL", "Dallas, TX")
+
+    assert maps_transport.count("distancematrix") == 1
+    assert route_cache.stats.db_hits == 1
+    assert RouteCache.objects.get().hits == 1
+
+
+def test_eviction_bounds_table_size(db, settings):
+    settings.ROUTE_CACHE = {
+        **settings.ROUTE_CACHE,
+        "DB_MAX_ENTRIES": 2,
+        "EVICT_EVERY": 1,
+    }
+    for index in range(4):
+        route_cache.set(
+            f"origin {index}", "destination", "driving", RouteResult(16093, 3600)
+        )
+
+    assert RouteCache.objects.count() == 2
+    assert set(RouteCache.objects.values_list("origin", flat=True)) == {
+        "origin 2",
+        "origin 3",
+    }
+
+
+def test_eviction_runs_every_n_writes(db, settings):
+    settings.ROUTE_CACHE = {
+        **settings.ROUTE_CACHE,
+        "DB_MAX_ENTRIES": 1,
+        "EVICT_EVERY": 3,
+    }
+    for index in range(2):
+        route_cache.set(
+            f"origin {index}", "destination", "driving", RouteResult(16093, 3600)
+        )
+    assert RouteCache.objects.count() == 2
+
+    route_cache.set("origin 2", "destination", "driving", RouteResult(16093, 3600))
+    assert RouteCache.objects.count() == 1
+
+
+def test_fixture_transport_replays_recordings(tmp_path, distance_matrix_response):
+    params = {"origins": "A", "destinations": "B", "mode": "driving"}
+    exact, _ = FixtureTransport.fixture_names(
+        "https://maps.googleapis.com/maps/api/distancematrix/json", params
+    )
+    (tmp_path / exact).write_text(json.dumps(distance_matrix_response))
+
+    client = MapsClient(transport=FixtureTransport(tmp_path))
+    response = client.get("distancematrix", params)
+
+    assert response.status_code == 200
+    assert response.json() == distance_matrix_response
+
+
+def test_session_transport_pools_and_retries():
+    transport = SessionTransport(pool_size=7, retries=2)
+    adapter = transport.session.get_adapter("https://maps.googleapis.com")
+
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.total == 2
+    assert adapter.max_retries.status == 0
+
+
+def test_client_retries_take_a_token_each(settings):
+    settings.MAPS_CLIENT = {"RETRIES": 3, "BACKOFF_FACTOR": 0}
+    settings.MAPS_RATE_LIMITS = {"default": {"RATE": 100, "BURST": 10}}
+    maps_scheduler.reset()
+    responses = [
+        RecordedResponse({}, 429),
+        RecordedResponse({}, 503),
+        RecordedResponse({"status": "OK"}),
+    ]
+
+    class FlakyTransport:
+        def get(self, url, params=None, timeout=None):
+            return responses.pop(0)
+
+    response = MapsClient(transport=FlakyTransport()).get("directions", {})
+
+    assert response.status_code == 200
+    stats = maps_scheduler.stats()["directions"]
+    assert stats["requests"] == 3
+    assert stats["throttled"] == 1
+    maps_scheduler.reset()
+
+
+def matrix_payload(origins, destinations):
+    return {
+        "status": "OK",
+        "rows": [
+            {
+                "elements": [
+                    {
+                        "status": "OK",
+                        "distance": {"value": 1000 * (100 * (o + 1) + d)},
+                        "duration": {"value": 3600 * (o + 1)},
+                    }
+                    for d in range(destinations)
+                ]
+            }
+            for o in range(origins)
+        ],
+    }
+
+
+def test_chunk_route_pairs_respects_matrix_limits():
+    pairs = [(f"origin {o}", f"destination {d}") for o in range(30) for d in range(8)]
+    chunks = chunk_route_pairs(pairs)
+
+    assert sum(len(chunk) for chunk in chunks) == len(pairs)
+    for chunk in chunks:
+        origins = {origin for origin, _ in chunk}
+        destinations = {destination for _, destination in chunk}
+        assert len(origins) <= 25 and len(destinations) <= 25
+        assert len(origins) * len(destinations) <= 100
+
+
+def test_calculate_route_distances_preserves_input_order(db, maps_transport):
+    maps_transport.add("distancematrix", matrix_payload(2, 2))
+    pairs = [
+        ("Chicago, IL", "Dallas, TX"),
+        ("Denver, CO", "Dallas, TX"),
+        ("Chicago, IL", "Memphis, TN"),
+        ("chicago,il", "dallas,tx"),
+    ]
+
+    results = calculate_route_distances(pairs)
+
+    assert maps_transport.count("distancematrix") == 1
+    assert [result.distance_meters for result in results] == [
+        100000,
+        200000,
+        101000,
+        100000,
+    ]
+    assert [result.duration_hours for result in results] == [1, 2, 1, 1]
+    assert calculate_route_distances(pairs[:1]) == results[:1]
+    assert maps_transport.count("distancematrix") == 1
+
+
+def test_bulk_create_with_routes(db, maps_transport):
+    from django.contrib.auth.models import User
+
+    from trucker.models import Driver, Trip
+
+    maps_transport.add("distancematrix", matrix_payload(1, 2))
+    drivers = [
+        Driver.objects.create(
+            user=User.objects.create_user(username=f"driver{index}"),
+            license_number=f"DL{index}",
+        )
+        for index in range(2)
+    ]
+
+    trips = Trip.objects.bulk_create_with_routes(
+        Trip(
+            driver=driver,
+            current_location="Chicago, IL",
+            pickup_location="Chicago, IL",
+            dropoff_location=destination,
+        )
+        for driver, destination in zip(drivers, ["Dallas, TX", "Memphis, TN"])
+    )
+
+    assert maps_transport.count("distancematrix") == 1
+    assert [trip.distance for trip in trips] == [62.14, 62.76]
+    assert trips[0].estimated_duration == timedelta(hours=1)
+    assert Trip.objects.filter(distance__isnull=False).count() == 2
+
+
+def test_route_result_uses_numeric_values(db, maps_transport):
+    maps_transport.add(
+        "distancematrix",
+        {
+            "status": "OK",
+            "rows": [
+                {
+                    "elements": [
+                        {
+                            "status": "OK",
+                            "distance": {"text": "1,234 mi", "value": 1985930},
+                            "duration": {"text": "1 day 3 hours", "value": 97200},
+                        }
+                    ]
+                }
+            ],
+        },
+    )
+
+    distance, duration = calculate_route_distance("Seattle, WA", "Denver, CO")
+
+    assert distance == 1234.0
+    assert duration == 27
+
+
+def test_detailed_route_is_cached_for_stop_planning(db, maps_transport):
+    maps_transport.add(
+        "directions",
+        {
+            "status": "OK",
+            "routes": [
+                {
+                    "overview_polyline": {"points": "_p~iF~ps|U_ulLnnqC_mqNvxq`@"},
+                    "legs": [
+                        {
+                            "distance": {"value": 321869},
+                            "duration": {"value": 12600},
+                            "steps": [
+                                {
+                                    "distance": {"value": 321869},
+                                    "duration": {"value": 12600},
+                                    "end_location": {"lat": 40.7, "lng": -120.95},
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+        },
+    )
+
+    route = get_route("A", "B", detailed=True)
+    route_cache.clear()
+
+    assert get_route("A", "B") == route
+    assert get_route("A", "B", detailed=True).steps == route.steps
+    assert route.polyline == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert route.duration == timedelta(hours=3, minutes=30)
+    assert maps_transport.count("directions") == 1
+    assert maps_transport.count("distancematrix") == 0
@@ -0,0 +1,180 @@
+import pytest
+from datetime import timedelta
+
+import numpy as np
+import polyline
+
+from django.utils import timezone
+
+from trucker.models import PlaceCache
+from trucker.services.places_cache import geohash_center, geohash_encode, places_cache
+from trucker.services.route_geometry import RouteGeometry
+from trucker.services.stop_services import RoutePlan, plan_trip_stops
+
+
+def make_step(miles, hours, lat, lng):
+    return {
+        "distance": {"value": miles * 1609.34},
+        "duration": {"value": hours * 3600},
+        "end_location": {"lat": lat, "lng": lng},
+    }
+
+
+@pytest.fixture
+def directions_response():
+    steps = [make_step(600, 10, 35.0 + index, -100.0 - index) for index in range(4)]
+    leg = {
+        "distance": {"value": sum(step["distance"]["value"] for step in steps)},
+        "duration": {"value": sum(step["duration"]["value"] for step in steps)},
+        "steps": steps,
+    }
+    return {"status": "OK", "routes": [{"legs": [leg]}]}
+
+
+@pytest.fixture
+def places_response():
+    return {
+        "status": "OK",
+        "results": [
+            {
+                "name": "Corridor Travel Center",
+                "geometry": {"location": {"lat": 36.0, "lng": -101.0}},
+            }
+        ],
+    }
+
+
+def test_route_plan_fetches_directions_once(
+    db, maps_transport, directions_response, places_response
+):
+    maps_transport.add("directions", directions_response)
+    maps_transport.add("nearbysearch", places_response)
+
+    plan = RoutePlan("fake-key", "Los Angeles, CA", "New York, NY")
+    stops = plan.find_stops({"gas_station": 1000, "rest_stop": 500})
+
+    assert maps_transport.count("directions") == 1
+    assert len(stops["gas_station"]) == 2
+    assert len(stops["rest_stop"]) == 4
+    assert maps_transport.count("nearbysearch") == 6
+    place_types = {params["type"] for _, params in maps_transport.calls[1:]}
+    assert place_types == {"gas_station", "rest_stop"}
+
+
+def test_plan_trip_stops_maps_both_stop_types(
+    db, maps_transport, directions_response, places_response
+):
+    maps_transport.add("directions", directions_response)
+    maps_transport.add("nearbysearch", places_response)
+
+    stops = plan_trip_stops("fake-key", "Los Angeles, CA", "New York, NY")
+
+    assert maps_transport.count("directions") == 1
+    assert sorted(stop["stop_type"] for stop in stops) == [
+        "FUEL",
+        "FUEL",
+        "REST",
+        "REST",
+    ]
+    assert {stop["duration"] for stop in stops} == {
+        timedelta(minutes=30),
+        timedelta(minutes=45),
+    }
+
+
+def test_route_geometry_interpolates_along_polyline():
+    geometry = RouteGeometry(np.array([[35.0, -100.0], [35.0, -99.0], [36.0, -99.0]]))
+    first_leg = geometry.segment_miles[0]
+
+    point = geometry.locate([first_leg / 2])[0]
+
+    assert point == pytest.approx([35.0, -99.5])
+    assert geometry.locate([geometry.total_miles])[0] == pytest.approx([36.0, -99.0])
+
+
+def test_route_geometry_waypoints_match_interval_targets():
+    lngs = np.linspace(-118.0, -74.0, 3000)
+    points = np.column_stack([np.full_like(lngs, 36.0), lngs])
+    geometry = RouteGeometry(points, total_miles=2400.0, total_hours=40.0)
+
+    waypoints = geometry.waypoints_every(500)
+
+    assert len(waypoints) == 4
+    assert [w["estimated_time_hours"] for w in waypoints] == [
+        pytest.approx(8.33),
+        pytest.approx(16.67),
+        pytest.approx(25.0),
+        pytest.approx(33.33),
+    ]
+    assert waypoints[1]["lng"] == pytest.approx(-118.0 + 44.0 * 1000 / 2400, abs=1e-3)
+
+
+def test_route_plan_uses_overview_polyline(db, maps_transport, places_response):
+    encoded = polyline.encode([(35.0, -118.0), (35.0, -106.0), (35.0, -94.0)])
+    step = {
+        "distance": {"value": 1931213},
+        "duration": {"value": 3600 * 20},
+        "end_location": {"lat": 35.0, "lng": -94.0},
+    }
+    maps_transport.add(
+        "directions",
+        {
+            "status": "OK",
+            "routes": [
+                {
+                    "overview_polyline": {"points": encoded},
+                    "legs": [
+                        {
+                            "distance": step["distance"],
+                            "duration": step["duration"],
+                            "steps": [step],
+                        }
+                    ],
+                }
+            ],
+        },
+    )
+
+    waypoints = RoutePlan("fake-key", "A", "B").waypoints(600)
+
+    assert len(waypoints) == 2
+    assert waypoints[0]["lng"] == pytest.approx(-106.0, abs=0.05)
+    assert waypoints[0]["estimated_time_hours"] == pytest.approx(10.0)
+
+
+def test_geohash_round_trip():
+    assert geohash_encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    center = geohash_center(geohash_encode(35.2, -101.8))
+    assert geohash_encode(center["lat"], center["lng"]) == geohash_encode(35.2, -101.8)
+
+
+def test_places_reused_across_trips_on_same_corridor(
+    db, maps_transport, directions_response, places_response
+):
+    maps_transport.add("directions", directions_response)
+    maps_transport.add("nearbysearch", places_response)
+
+    first = RoutePlan("fake-key", "Los Angeles, CA", "New York, NY")
+    first.find_stops({"gas_station": 1000})
+    second = RoutePlan("fake-key", "Los Angeles, CA", "New York, NY")
+    stops = second.find_stops({"gas_station": 1000})
+
+    assert first.places_stats.as_dict() == {"hits": 0, "misses": 2, "hit_ratio": 0.0}
+    assert second.places_stats.hit_ratio == 1.0
+    assert maps_transport.count("nearbysearch") == 2
+    assert stops["gas_station"][0]["stations"][0]["name"] == "Corridor Travel Center"
+
+
+def test_storing_places_purges_expired_rows(db):
+    now = timezone.now()
+    PlaceCache.objects.create(
+        cell="9q5ct",
+        place_type="gas_station",
+        results=[],
+        fetched_at=now - timedelta(days=31),
+        expires_at=now - timedelta(days=1),
+    )
+
+    places_cache.set_many({("9q5cu", "gas_station"): [{"name": "Fuel"}]})
+
+    assert list(PlaceCache.objects.values_list("cell", flat=True)) == ["9q5cu"]
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from trucker.models import DutyStatus, LogEntry
+from trucker.validators import validate_duty_statuses
+
+START = datetime(2025, 3, 3, 6, 0, tzinfo=dt_timezone.utc)
+
+
+def day(*segments):
+    statuses, clock = [], START
+    for status, hours in segments:
+        end = clock + timedelta(hours=hours)
+        statuses.append(SimpleNamespace(status=status, start_time=clock, end_time=end))
+        clock = end
+    return statuses
+
+
+def test_valid_day_passes_in_one_sweep():
+    statuses = day(
+        ("ON", 1), ("D", 7.5), ("OFF", 0.5), ("D", 3), ("ON", 1), ("OFF", 11)
+    )
+
+    assert validate_duty_statuses(statuses) == []
+
+
+@pytest.mark.parametrize(
+    "segments, message",
+    [
+        ((("D", 8.5), ("D", 1)), "30-minute break"),
+        ((("D", 6), ("OFF", 0.5), ("D", 5.5)), "11-hour limit"),
+        ((("ON", 6), ("OFF", 3), ("D", 6)), "14-hour duty window"),
+    ],
+)
+def test_rule_violations(segments, message):
+    with pytest.raises(ValidationError, match=message):
+        validate_duty_statuses(day(*segments))
+
+
+def test_adverse_conditions_and_rule_selection():
+    statuses = day(("ON", 6), ("OFF", 3), ("D", 6))
+
+    validate_duty_statuses(statuses, adverse_conditions=True)
+    validate_duty_statuses(statuses, rules={"overlap"})
+
+
+def test_overlap_is_scoped_to_target():
+    statuses = day(("D", 2), ("OFF", 2))
+    overlapping = SimpleNamespace(
+        status="ON",
+        start_time=START + timedelta(hours=1),
+        end_time=START + timedelta(hours=3),
+    )
+    statuses = sorted(statuses + [overlapping], key=lambda s: s.start_time)
+
+    with pytest.raises(ValidationError, match="overlap"):
+        validate_duty_statuses(statuses)
+    with pytest.raises(ValidationError, match="overlap"):
+        validate_duty_statuses(statuses, rules={"overlap"}, target=overlapping)
+    validate_duty_statuses(statuses[:1] + statuses[2:], target=statuses[2])
+
+
+def test_contiguous_off_duty_counts_as_restart():
+    statuses = day(("OFF", 10), ("SB", 24), ("ON", 1), ("OFF", 20))
+
+    assert validate_duty_statuses(statuses) == [START + timedelta(hours=34)]
+
+
+def test_clean_uses_one_query_and_restart_applies_on_save(
+    driver, vehicle, django_assert_num_queries
+):
+    log_entry = LogEntry.objects.create(
+        driver=driver,
+        vehicle=vehicle,
+        start_odometer=0,
+        end_odometer=10,
+        signature="John Doe",
+    )
+    start = timezone.now() - timedelta(hours=40)
+    restart = DutyStatus(
+        log_entry=log_entry,
+        status="OFF",
+        start_time=start,
+        end_time=start + timedelta(hours=35),
+        location_name="Home",
+    )
+
+    with django_assert_num_queries(1):
+        restart.clean()
+    driver.refresh_from_db()
+    assert driver.last_34hr_restart is None
+
+    restart.save()
+    driver.refresh_from_db()
+    assert driver.last_34hr_restart == restart.end_time
+
+
+def test_log_entry_create_rejects_invalid_day(api_client, driver, vehicle):
+    statuses = [
+        {
+            "status": "D",
+            "start_time": (START + timedelta(hours=offset)).isoformat(),
+            "end_time": (START + timedelta(hours=offset + 6)).isoformat(),
+            "location_lat": 41.8,
+            "location_lon": -87.6,
+            "location_name": "Chicago, IL",
+        }
+        for offset in (0, 6)
+    ]
+
+    response = api_client.post(
+        "/api/logs/",
+        {
+            "driver": driver.pk,
+            "vehicle": vehicle.pk,
+            "start_odometer": 0,
+            "end_odometer": 600,
+            "signature": "John Doe",
+            "duty_statuses": statuses,
+        },
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert "30-minute break" in response.data["duty_statuses"][0]
+    assert not LogEntry.objects.exists()
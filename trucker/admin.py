@@ -2,7 +2,19 @@ from django.contrib import admin
 
 # admin.py
 from django.contrib import admin
-from .models import Carrier, Driver, Vehicle, LogEntry, DutyStatus, Trip, Stop
+from .models import (
+    Carrier,
+    Driver,
+    Vehicle,
+    LogEntry,
+    DutyStatus,
+    Trip,
+    Stop,
+    RouteCache,
+    PlaceCache,
+    DailyDutyTotal,
+    TripPlan,
+)
 
 
 @admin.register(Carrier)
@@ -71,3 +83,38 @@ class StopAdmin(admin.ModelAdmin):
         "actual_time",
         "duration",
     )
+
+
+@admin.register(RouteCache)
+class RouteCacheAdmin(admin.ModelAdmin):
+    list_display = (
+        "origin",
+        "destination",
+        "mode",
+        "distance_meters",
+        "duration_seconds",
+        "hits",
+        "last_used_at",
+        "expires_at",
+    )
+    search_fields = ("origin", "destination")
+
+
+@admin.register(PlaceCache)
+class PlaceCacheAdmin(admin.ModelAdmin):
+    list_display = ("cell", "place_type", "fetched_at", "expires_at")
+    list_filter = ("place_type",)
+    search_fields = ("cell",)
+
+
+@admin.register(DailyDutyTotal)
+class DailyDutyTotalAdmin(admin.ModelAdmin):
+    list_display = ("driver", "date", "hours")
+    list_filter = ("date",)
+    search_fields = ("driver__user__username", "driver__license_number")
+
+
+@admin.register(TripPlan)
+class TripPlanAdmin(admin.ModelAdmin):
+    list_display = ("trip", "inputs_hash", "updated_at")
+    search_fields = ("trip__driver__user__username",)
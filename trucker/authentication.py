@@ -0,0 +1,16 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from trucker.services.driver_context import driver_context
+
+
+class DriverContextJWTAuthentication(JWTAuthentication):
+    """JWT authentication that also resolves ``request.driver_context``."""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            user, token = result
+            # Set on the Django request so middleware sees it too; DRF's
+            # Request proxies attribute reads through to it.
+            request._request.driver_context = driver_context(user, token)
+        return result
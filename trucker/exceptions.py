@@ -2,3 +2,11 @@ class TripValidationError(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(message)
+
+
+class RouteServiceError(Exception):
+    pass
+
+
+class MapsQuotaExceeded(RouteServiceError):
+    pass
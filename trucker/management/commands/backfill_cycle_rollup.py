@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trucker.models import CycleCalculation, DailyDutyTotal, Driver, DutyStatus
+from trucker.services.cycle_services import (
+    affected_dates,
+    cycle_days,
+    cycle_type,
+    duty_contribution,
+    rolling_totals,
+    status_deltas,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily duty totals and the CycleCalculation rollup from DutyStatus"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--driver",
+            type=int,
+            action="append",
+            help="Only rebuild these driver ids (repeatable)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        drivers = Driver.objects.select_related("carrier")
+        if options["driver"]:
+            drivers = drivers.filter(pk__in=options["driver"])
+        drivers = {driver.pk: driver for driver in drivers}
+
+        daily = defaultdict(dict)
+        rows = (
+            DutyStatus.objects.filter(status__in=["D", "ON"], driver_id__in=drivers)
+            .values_list("driver_id", "status", "start_time", "end_time")
+            .iterator()
+        )
+        deltas = status_deltas((None, duty_contribution(*row)) for row in rows)
+        for (driver_id, day), hours in deltas.items():
+            daily[driver_id][day] = hours
+
+        totals, rollups = [], []
+        for driver_id, days_worked in daily.items():
+            driver = drivers[driver_id]
+            choice = driver.carrier.hos_cycle_choice if driver.carrier else "60"
+            days = cycle_days(choice)
+            totals.extend(
+                DailyDutyTotal(driver_id=driver_id, date=day, hours=hours)
+                for day, hours in days_worked.items()
+            )
+            rolling = rolling_totals(
+                days_worked, affected_dates(days_worked, days), days
+            )
+            rollups.extend(
+                CycleCalculation(
+                    driver_id=driver_id,
+                    calculation_date=day,
+                    total_hours=round(total, 6),
+                    cycle_type=cycle_type(choice),
+                )
+                for day, total in rolling.items()
+            )
+
+        with transaction.atomic():
+            DailyDutyTotal.objects.filter(driver_id__in=drivers).delete()
+            CycleCalculation.objects.filter(driver_id__in=drivers).delete()
+            DailyDutyTotal.objects.bulk_create(totals, batch_size=options["batch_size"])
+            CycleCalculation.objects.bulk_create(
+                rollups, batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {len(totals)} daily total(s) and {len(rollups)} cycle "
+                f"rollup row(s) for {len(daily)} driver(s)"
+            )
+        )
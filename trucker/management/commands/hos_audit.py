@@ -0,0 +1,77 @@
+import csv
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from trucker.services.hos_audit import run_audit
+
+REPORT_FIELDS = ("driver_id", "rule", "start_time", "end_time", "hours", "limit")
+
+
+class Command(BaseCommand):
+    help = "Report every 11-hour, 14-hour, 30-minute and 60/70-hour violation as CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--driver",
+            type=int,
+            action="append",
+            help="Only audit these driver ids (repeatable)",
+        )
+        parser.add_argument("--since", help="ISO datetime to report from")
+        parser.add_argument("--until", help="ISO datetime to report up to")
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="CSV file to write; defaults to stdout",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=20000,
+            help="Rows fetched per database round trip",
+        )
+
+    def _parse(self, value, option):
+        if value is None:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"--{option} must be an ISO datetime")
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    def handle(self, *args, **options):
+        since = self._parse(options["since"], "since")
+        until = self._parse(options["until"], "until")
+        started = time.perf_counter()
+        counts = Counter()
+
+        handle = (
+            open(options["output"], "w", newline="")
+            if options["output"]
+            else self.stdout
+        )
+        try:
+            writer = csv.writer(handle)
+            writer.writerow(REPORT_FIELDS)
+            for violation in run_audit(
+                options["driver"], since, until, options["chunk_size"]
+            ):
+                counts[violation.rule] += 1
+                writer.writerow([getattr(violation, field) for field in REPORT_FIELDS])
+        finally:
+            if options["output"]:
+                handle.close()
+
+        summary = ", ".join(
+            f"{rule}: {count}" for rule, count in sorted(counts.items())
+        )
+        self.stderr.write(
+            f"{sum(counts.values())} violation(s) in "
+            f"{time.perf_counter() - started:.2f}s ({summary or 'none'})"
+        )
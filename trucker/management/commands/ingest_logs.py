@@ -0,0 +1,151 @@
+import csv
+import json
+from itertools import groupby, islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from trucker.services.log_ingestion import ingest_logs
+
+LOG_FIELDS = (
+    "driver",
+    "vehicle",
+    "date",
+    "start_odometer",
+    "end_odometer",
+    "remarks",
+    "signature",
+    "adverse_conditions",
+)
+STATUS_FIELDS = (
+    "status",
+    "start_time",
+    "end_time",
+    "location_lat",
+    "location_lon",
+    "location_name",
+)
+
+
+def _float(value):
+    return float(value) if value not in (None, "") else None
+
+
+def _datetime(value, field):
+    """ISO datetime, made aware in the current time zone when it has no offset."""
+    try:
+        parsed = parse_datetime(value or "")
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f"{field} must be an ISO datetime, got {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_entry(data: dict) -> dict:
+    """Log entry fields from an NDJSON object or grouped CSV row, ready for ingest_logs."""
+    entry = {
+        "driver_id": int(data["driver"]),
+        "vehicle_id": int(data["vehicle"]),
+        "start_odometer": float(data["start_odometer"]),
+        "end_odometer": float(data["end_odometer"]),
+        "remarks": data.get("remarks") or "",
+        "signature": data["signature"],
+        "adverse_conditions": str(data.get("adverse_conditions", "")).lower()
+        in ("1", "true", "yes"),
+        "duty_statuses": [
+            {
+                "status": status["status"],
+                "start_time": _datetime(status.get("start_time"), "start_time"),
+                "end_time": _datetime(status.get("end_time"), "end_time"),
+                "location_lat": _float(status.get("location_lat")),
+                "location_lon": _float(status.get("location_lon")),
+                "location_name": status.get("location_name") or "",
+            }
+            for status in data.get("duty_statuses", [])
+        ],
+    }
+    if data.get("date"):
+        entry["date"] = parse_date(data["date"])
+    return entry
+
+
+def read_ndjson(handle):
+    for line in handle:
+        if line.strip():
+            yield parse_entry(json.loads(line))
+
+
+def read_csv(handle):
+    """One row per duty status; consecutive rows of the same log are grouped."""
+    rows = csv.DictReader(handle)
+    for _, group in groupby(
+        rows, key=lambda row: tuple(row.get(name, "") for name in LOG_FIELDS)
+    ):
+        group = list(group)
+        data = {name: group[0].get(name) for name in LOG_FIELDS}
+        data["duty_statuses"] = [
+            {name: row.get(name) for name in STATUS_FIELDS} for row in group
+        ]
+        yield parse_entry(data)
+
+
+class Command(BaseCommand):
+    help = "Bulk ingest log entries and duty statuses from an NDJSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON (one log per line) or CSV file")
+        parser.add_argument(
+            "--format",
+            choices=["ndjson", "csv"],
+            default=None,
+            help="Input format; defaults to the file extension",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Log entries validated and written per transaction",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per bulk insert",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "csv" if path.lower().endswith(".csv") else "ndjson"
+        )
+        reader = read_csv if file_format == "csv" else read_ndjson
+
+        logs = statuses = chunks = 0
+        seconds = 0.0
+        with open(path, newline="") as handle:
+            entries = reader(handle)
+            while chunk := list(islice(entries, options["chunk_size"])):
+                try:
+                    result = ingest_logs(chunk, batch_size=options["batch_size"])
+                except ValidationError as e:
+                    raise CommandError(
+                        f"Chunk {chunks + 1} rejected, nothing written for it: "
+                        f"{e.message_dict}"
+                    )
+                chunks += 1
+                logs += len(result.logs)
+                statuses += result.statuses
+                seconds += result.seconds
+
+        rate = statuses / seconds if seconds > 0 else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ingested {logs} log(s) and {statuses} duty status(es) in "
+                f"{seconds:.2f}s ({rate:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from trucker.services.planning_queue import run_pending_jobs
+from trucker.services.rate_limit import maps_scheduler
+
+
+class Command(BaseCommand):
+    help = "Process queued trip planning jobs (route, duration and stops)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit instead of polling",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Stop after processing this many jobs",
+        )
+
+    def handle(self, *args, **options):
+        max_jobs = options["max_jobs"]
+        total = 0
+
+        while True:
+            remaining = None if max_jobs is None else max_jobs - total
+            processed = run_pending_jobs(max_jobs=remaining)
+            total += processed
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)"))
+
+            if options["once"] or (max_jobs is not None and total >= max_jobs):
+                break
+            if not processed:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Planning worker finished ({total} job(s))")
+        )
+        for endpoint, stats in maps_scheduler.stats().items():
+            self.stdout.write(f"Maps {endpoint}: {stats}")
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:57
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0012_alter_stop_options_alter_trip_vehicle_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RouteCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("origin", models.CharField(max_length=200)),
+                ("destination", models.CharField(max_length=200)),
+                ("mode", models.CharField(default="driving", max_length=20)),
+                ("distance", models.FloatField()),
+                ("duration", models.FloatField()),
+                ("hits", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="stop",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("location_lat__gte", -90), ("location_lat__lte", 90)
+                ),
+                name="valid_latitude",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="stop",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("location_lon__gte", -180), ("location_lon__lte", 180)
+                ),
+                name="valid_longitude",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="routecache",
+            index=models.Index(
+                fields=["expires_at"], name="trucker_rou_expires_9d05ef_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="routecache",
+            index=models.Index(
+                fields=["last_used_at"], name="trucker_rou_last_us_5765aa_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="routecache",
+            constraint=models.UniqueConstraint(
+                fields=("origin", "destination", "mode"), name="unique_route_cache_key"
+            ),
+        ),
+    ]
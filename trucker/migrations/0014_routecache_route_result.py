@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def clear_route_cache(apps, schema_editor):
+    apps.get_model("trucker", "RouteCache").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0013_routecache"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_route_cache, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="routecache",
+            name="distance",
+        ),
+        migrations.RemoveField(
+            model_name="routecache",
+            name="duration",
+        ),
+        migrations.AddField(
+            model_name="routecache",
+            name="distance_meters",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="routecache",
+            name="duration_seconds",
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="routecache",
+            name="polyline",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="routecache",
+            name="legs",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
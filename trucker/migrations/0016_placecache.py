@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0015_trip_planning_queue"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaceCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("cell", models.CharField(max_length=12)),
+                ("place_type", models.CharField(max_length=50)),
+                ("results", models.JSONField(blank=True, default=list)),
+                ("fetched_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("expires_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="trucker_pla_expires_f4bf4e_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("cell", "place_type"), name="unique_place_cache_cell"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:19
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_daily_totals(apps, schema_editor):
+    DutyStatus = apps.get_model("trucker", "DutyStatus")
+    DailyDutyTotal = apps.get_model("trucker", "DailyDutyTotal")
+
+    totals = defaultdict(float)
+    rows = DutyStatus.objects.filter(status__in=["D", "ON"]).values_list(
+        "log_entry__driver_id", "start_time", "end_time"
+    )
+    for driver_id, start_time, end_time in rows.iterator():
+        # Split at local midnight, as the live signals do.
+        while start_time < end_time:
+            day = timezone.localdate(start_time)
+            midnight = timezone.make_aware(
+                datetime.combine(day + timedelta(days=1), time())
+            )
+            until = min(end_time, midnight)
+            totals[(driver_id, day)] += (until - start_time).total_seconds() / 3600
+            start_time = until
+
+    DailyDutyTotal.objects.bulk_create(
+        [
+            DailyDutyTotal(driver_id=driver_id, date=day, hours=hours)
+            for (driver_id, day), hours in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0016_placecache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyDutyTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("hours", models.FloatField(default=0)),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_duty_totals",
+                        to="trucker.driver",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("driver", "date"), name="unique_daily_duty_total"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_daily_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:33
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0017_dailydutytotal"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TripPlan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("inputs_hash", models.CharField(max_length=64)),
+                (
+                    "logs",
+                    models.JSONField(
+                        default=list,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "trip",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="plan",
+                        to="trucker.trip",
+                    ),
+                ),
+            ],
+        ),
+    ]
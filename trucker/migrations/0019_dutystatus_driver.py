@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0018_tripplan"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dutystatus",
+            name="driver",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="duty_statuses",
+                to="trucker.driver",
+            ),
+        ),
+    ]
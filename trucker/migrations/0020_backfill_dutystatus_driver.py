@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+
+def backfill_driver(apps, schema_editor):
+    DutyStatus = apps.get_model("trucker", "DutyStatus")
+    LogEntry = apps.get_model("trucker", "LogEntry")
+
+    DutyStatus.objects.update(
+        driver_id=models.Subquery(
+            LogEntry.objects.filter(pk=models.OuterRef("log_entry_id")).values(
+                "driver_id"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    # Kept apart from the AddField and AlterField around it: on PostgreSQL,
+    # altering the column in the same transaction as this update fails with
+    # "pending trigger events" from the deferred foreign key checks.
+
+    dependencies = [
+        ("trucker", "0019_dutystatus_driver"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_driver, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0020_backfill_dutystatus_driver"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dutystatus",
+            name="driver",
+            field=models.ForeignKey(
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="duty_statuses",
+                to="trucker.driver",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dutystatus",
+            index=models.Index(
+                fields=["driver", "start_time"], name="trucker_dut_driver__ff09ba_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trucker", "0021_alter_dutystatus_driver"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["driver", "completed", "start_time"],
+                name="trucker_tri_driver__e1f976_idx",
+            ),
+        ),
+    ]
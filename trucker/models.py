@@ -2,6 +2,7 @@ from datetime import timedelta, datetime
 from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
@@ -9,19 +10,21 @@ from django.conf import settings
 
 from model_utils import FieldTracker
 
-from trucker.services.route_services import calculate_route_distance
-from trucker.services.stop_services import (
-    flatten_and_map,
-    get_fueling_stations,
-    get_rest_stops,
-)
-from trucker.validators import (
-    check_34_hour_restart,
-    validate_11_hour_driving_limit,
-    validate_14_hour_duty_window,
-    validate_30_minute_break,
-    validate_overlapping_statuses,
+from trucker.services.cycle_services import (
+    apply_duty_deltas,
+    detect_restart,
+    duty_contribution,
+    last_restart_gap,
+    record_restart,
+    refresh_cycle_rollup,
+    refresh_cycle_used,
+    status_deltas,
 )
+from trucker.services.driver_context import invalidate_driver_context
+from trucker.services.hos_services import invalidate_trip_plans
+from trucker.services.route_services import calculate_route_distances, get_route
+from trucker.services.stop_services import plan_trip_stops
+from trucker.validators import validate_duty_statuses
 
 
 class Carrier(models.Model):
@@ -55,24 +58,49 @@ class Driver(models.Model):
         return max(cycle_hours - self.current_cycle_used, 0)
 
     def check_34hr_restart(self, restart_time):
-        thirty_four_hours_ago = restart_time - timezone.timedelta(hours=34)
-        overlapping_statuses = DutyStatus.objects.filter(
-            log_entry__driver=self,
-            start_time__lt=restart_time,
-            end_time__gt=thirty_four_hours_ago,
-        ).exclude(status__in=["OFF", "SB"])
-
-        if not overlapping_statuses.exists():
-            self.last_34hr_restart = restart_time
-            self.save()
-            return True
-        return False
+        if last_restart_gap(self, as_of=restart_time) != restart_time:
+            return False
+        record_restart(self, restart_time)
+        return True
 
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.license_number})"
 
 
+class TripManager(models.Manager):
+    def bulk_create_with_routes(self, trips, **kwargs):
+        """
+        Bulk create trips, resolving missing distance/duration with one batched
+        Distance Matrix lookup instead of a request per trip. Like bulk_create,
+        this skips Trip.save() and the post_save stop generation.
+        """
+        trips = list(trips)
+        pending = [
+            trip for trip in trips if not trip.distance or not trip.estimated_duration
+        ]
+        routes = calculate_route_distances(
+            [(trip.pickup_location, trip.dropoff_location) for trip in pending]
+        )
+
+        for trip, route in zip(pending, routes):
+            if route is None:
+                raise ValidationError(
+                    f"Route calculation failed: {trip.pickup_location} -> "
+                    f"{trip.dropoff_location}"
+                )
+            trip.distance = route.distance_miles
+            trip.estimated_duration = route.duration
+
+        return self.bulk_create(trips, **kwargs)
+
+
 class Trip(models.Model):
+    class PlanningStatus(models.TextChoices):
+        PENDING = "pending", "Pending"
+        PLANNING = "planning", "Planning"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
     driver = models.ForeignKey("Driver", on_delete=models.CASCADE)
     vehicle = models.ForeignKey(
         "Vehicle",
@@ -90,11 +118,25 @@ class Trip(models.Model):
     average_speed = models.FloatField(default=50)
     completed_at = models.DateTimeField(null=True, blank=True)
     completed = models.BooleanField(default=False)
+    planning_status = models.CharField(
+        max_length=10,
+        choices=PlanningStatus.choices,
+        default=PlanningStatus.READY,
+    )
+    planning_error = models.TextField(blank=True)
 
     tracker = FieldTracker(
-        fields=["distance", "pickup_location", "dropoff_location", "start_time"]
+        fields=[
+            "distance",
+            "estimated_duration",
+            "pickup_location",
+            "dropoff_location",
+            "start_time",
+        ]
     )
 
+    objects = TripManager()
+
     def __str__(self):
         return self.driver.user.username
 
@@ -106,6 +148,7 @@ class Trip(models.Model):
                 name="unique_active_trip_per_driver",
             )
         ]
+        indexes = [models.Index(fields=["driver", "completed", "start_time"])]
 
     def save(self, *args, **kwargs):
         if self.pk is None and not self.completed:
@@ -113,60 +156,84 @@ class Trip(models.Model):
                 raise ValidationError("Driver already has an active trip")
 
         if not self.distance or not self.estimated_duration:
-            self.calculate_route_details()
+            if settings.TRIP_PLANNING_ASYNC:
+                self.planning_status = self.PlanningStatus.PENDING
+            else:
+                self.calculate_route_details()
 
+        plan_changed = not self._state.adding and bool(self.tracker.changed())
         super().save(*args, **kwargs)
+        if plan_changed:
+            TripPlan.objects.filter(trip=self).delete()
 
     def calculate_route_details(self):
         try:
-            distance, duration = calculate_route_distance(
-                self.pickup_location, self.dropoff_location
+            route = get_route(
+                self.pickup_location, self.dropoff_location, detailed=True
             )
 
-            self.distance = distance
-            self.estimated_duration = timedelta(hours=duration)
+            self.distance = route.distance_miles
+            self.estimated_duration = route.duration
 
         except Exception as e:
             raise ValidationError(f"Route calculation failed: {str(e)}") from e
 
     def generate_stops(self):
+        try:
+            mapped_stops = plan_trip_stops(
+                api_key=settings.MAPS_API_KEY,
+                origin=self.pickup_location,
+                destination=self.dropoff_location,
+                fuel_interval=1000,
+                rest_interval=1000,
+            )
+        except Exception as e:
+            raise ValidationError(f"Stop generation failed: {str(e)}") from e
+        self.replace_stops(mapped_stops)
+
+    def replace_stops(self, mapped_stops):
         with transaction.atomic():
             self.stops.all().delete()
+            Stop.objects.bulk_create([Stop(trip=self, **stop) for stop in mapped_stops])
+            getattr(self, "_prefetched_objects_cache", {}).pop("stops", None)
 
-            try:
-                fueling_interval = 1000
-                rest_interval = 1000
 
-                raw_fuel_data = get_fueling_stations(
-                    api_key=settings.MAPS_API_KEY,
-                    origin=self.pickup_location,
-                    destination=self.dropoff_location,
-                    interval_miles=fueling_interval,
-                )
-                mapped_fuel_stops = flatten_and_map(
-                    raw_fuel_data, duration="0:30:00", stop_type="FUEL"
-                )
+class PlanningJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
 
-                Stop.objects.bulk_create(
-                    [Stop(trip=self, **stop) for stop in mapped_fuel_stops]
-                )
-                raw_rest_data = get_rest_stops(
-                    api_key=settings.MAPS_API_KEY,
-                    origin=self.pickup_location,
-                    destination=self.dropoff_location,
-                    interval_miles=rest_interval,
-                )
-                mapped_rest_stops = flatten_and_map(
-                    raw_rest_data, duration="0:45:00", stop_type="REST"
-                )
+    trip = models.ForeignKey(
+        Trip, on_delete=models.CASCADE, related_name="planning_jobs"
+    )
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
-                Stop.objects.bulk_create(
-                    [Stop(trip=self, **stop) for stop in mapped_rest_stops]
-                )
-            except Exception as e:
-                raise ValidationError(f"Stop generation failed: {str(e)}") from e
+    def __str__(self):
+        return f"Planning job {self.pk} for trip {self.trip_id} ({self.status})"
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [models.Index(fields=["status", "run_after"])]
 
 
+class TripPlan(models.Model):
+    trip = models.OneToOneField(Trip, on_delete=models.CASCADE, related_name="plan")
+    inputs_hash = models.CharField(max_length=64)
+    logs = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Plan for trip {self.trip_id}"
 
 
 class Stop(models.Model):
@@ -244,7 +311,43 @@ class LogEntry(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
         self.total_miles = self.end_odometer - self.start_odometer
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if not adding:
+            self._move_duty_statuses()
+
+    def _move_duty_statuses(self):
+        """
+        Re-point statuses at this log's driver after a reassignment and move
+        their hours between the two drivers' totals; ``update()`` sends no
+        signals, so update_driver_cycle never sees the change.
+        """
+        moved = self.duty_statuses.exclude(driver_id=self.driver_id)
+        rows = list(moved.values_list("driver_id", "status", "start_time", "end_time"))
+        if not rows:
+            return
+        moved.update(driver_id=self.driver_id)
+
+        deltas = status_deltas(
+            (
+                duty_contribution(*row),
+                duty_contribution(self.driver_id, *row[1:]),
+            )
+            for row in rows
+        )
+        apply_duty_deltas(deltas)
+        driver_ids = {driver_id for driver_id, _ in deltas}
+        invalidate_trip_plans(driver_ids)
+        for driver in Driver.objects.select_related("carrier").filter(
+            pk__in=driver_ids | {row[0] for row in rows} | {self.driver_id}
+        ):
+            detect_restart(driver)
+            refresh_cycle_used(driver)
+            refresh_cycle_rollup(
+                driver,
+                {day for key, day in deltas if key == driver.pk},
+                create=driver.pk == self.driver_id,
+            )
 
     def __str__(self):
         return f"{self.driver} - {self.date}"
@@ -269,6 +372,9 @@ class DutyStatus(models.Model):
     log_entry = models.ForeignKey(
         "LogEntry", on_delete=models.CASCADE, related_name="duty_statuses"
     )
+    driver = models.ForeignKey(
+        Driver, on_delete=models.CASCADE, related_name="duty_statuses", editable=False
+    )
     status = models.CharField(max_length=3, choices=STATUS_CHOICES, default="OFF")
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
@@ -276,11 +382,17 @@ class DutyStatus(models.Model):
     location_lon = models.FloatField(null=True, blank=True)
     location_name = models.CharField(max_length=100)
 
+    tracker = FieldTracker(fields=["status", "start_time", "end_time", "log_entry"])
+
     @property
     def duration(self):
         return (self.end_time - self.start_time).total_seconds() / 3600
 
-    def clean(self):
+    def clean_period(self):
+        """Checks on this status alone, without reading its log's other statuses."""
+        if self.end_time <= self.start_time:
+            raise ValidationError("Duty status must end after it starts.")
+
         if self.status in ["Pickup", "Dropoff"]:
             if (self.end_time - self.start_time).seconds != 3600:
                 raise ValidationError(f"{self.status} must be exactly 1 hour long.")
@@ -290,20 +402,28 @@ class DutyStatus(models.Model):
             if (self.end_time - self.start_time).total_seconds() < min_duration:
                 raise ValidationError("Sleeper berth must be at least 6 hours long.")
 
+    def clean(self):
+        self.clean_period()
+
         statuses = list(self.__class__.objects.filter(log_entry=self.log_entry))
         if self.pk:
             statuses = [s for s in statuses if s.pk != self.pk]
         statuses.append(self)
         statuses.sort(key=lambda s: s.start_time)
 
-        validate_overlapping_statuses(statuses, self)
+        rules = {"overlap"}
         if self.status in ["D", "ON"]:
-            validate_14_hour_duty_window(statuses, self.log_entry.adverse_conditions)
+            rules.add("window")
         if self.status == "D":
-            validate_11_hour_driving_limit(statuses)
-            validate_30_minute_break(statuses)
-        if self.status in ["OFF", "SB"]:
-            check_34_hour_restart(self)
+            rules.update({"driving", "break"})
+        restarts = validate_duty_statuses(
+            statuses, self.log_entry.adverse_conditions, rules, target=self
+        )
+        self._restarts = [end for end in restarts if end == self.end_time]
+
+    def save(self, *args, **kwargs):
+        self.driver_id = self.log_entry.driver_id
+        super().save(*args, **kwargs)
 
     def get_status_display(self):
         mapping = dict(self.STATUS_CHOICES)
@@ -314,26 +434,100 @@ class DutyStatus(models.Model):
 
     class Meta:
         ordering = ["start_time"]
-        indexes = [models.Index(fields=["log_entry", "start_time"])]
+        indexes = [
+            models.Index(fields=["log_entry", "start_time"]),
+            models.Index(fields=["driver", "start_time"]),
+        ]
 
 
-@receiver([post_save, post_delete], sender=DutyStatus)
-def update_driver_cycle(sender, instance, **kwargs):
+class DailyDutyTotal(models.Model):
+    driver = models.ForeignKey(
+        Driver, on_delete=models.CASCADE, related_name="daily_duty_totals"
+    )
+    date = models.DateField()
+    hours = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.driver} - {self.date}: {self.hours:.2f}h"
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["driver", "date"], name="unique_daily_duty_total"
+            )
+        ]
+
+
+@receiver(post_save, sender=DutyStatus)
+def update_driver_cycle(sender, instance, created, **kwargs):
     driver = instance.log_entry.driver
-    cycle_days = 8 if driver.carrier.hos_cycle_choice == "70" else 7
-    end_date = timezone.now().date()
-    start_date = end_date - timezone.timedelta(days=cycle_days)
-
-    statuses = DutyStatus.objects.filter(
-        log_entry__driver=driver,
-        status__in=["D", "ON"],
-        start_time__gte=start_date,
+    new = duty_contribution(
+        driver.pk, instance.status, instance.start_time, instance.end_time
     )
-    if driver.last_34hr_restart:
-        statuses = statuses.filter(start_time__gte=driver.last_34hr_restart)
 
-    driver.current_cycle_used = sum(s.duration for s in statuses)
-    driver.save()
+    restarts = getattr(instance, "_restarts", None)
+    if restarts is None and instance.status in ["OFF", "SB"]:
+        restarts = [instance.end_time] if instance.duration >= 34 else []
+    if restarts and record_restart(driver, max(restarts)):
+        refresh_cycle_used(driver)
+
+    old = None
+    if not created:
+        previous = instance.tracker.previous
+        old_driver_id = driver.pk
+        if previous("log_entry") != instance.log_entry_id:
+            old_driver_id = (
+                LogEntry.objects.filter(pk=previous("log_entry"))
+                .values_list("driver_id", flat=True)
+                .first()
+            )
+        old = duty_contribution(
+            old_driver_id,
+            previous("status"),
+            previous("start_time"),
+            previous("end_time"),
+        )
+
+    if old == new:
+        return
+    deltas = status_deltas([(old, new)])
+    apply_duty_deltas(deltas)
+    invalidate_trip_plans({driver_id for driver_id, _ in deltas})
+    for driver_id in {driver_id for driver_id, _ in deltas}:
+        owner = driver
+        if driver_id != driver.pk:
+            owner = Driver.objects.select_related("carrier").get(pk=driver_id)
+        refresh_cycle_used(owner)
+        refresh_cycle_rollup(owner, {day for key, day in deltas if key == driver_id})
+
+
+@receiver(post_delete, sender=DutyStatus)
+def remove_from_driver_cycle(sender, instance, **kwargs):
+    driver = instance.log_entry.driver
+    old = duty_contribution(
+        driver.pk, instance.status, instance.start_time, instance.end_time
+    )
+    if old is None:
+        return
+    apply_duty_deltas(status_deltas([(old, None)]))
+    invalidate_trip_plans({driver.pk})
+    detect_restart(driver)
+    refresh_cycle_used(driver)
+    refresh_cycle_rollup(driver, {day for _, day in old}, create=False)
+
+
+@receiver(post_save, sender=Driver)
+@receiver(post_delete, sender=Driver)
+def clear_driver_context(sender, instance, **kwargs):
+    invalidate_driver_context([instance.user_id])
+
+
+@receiver(post_save, sender=Carrier)
+def clear_carrier_driver_contexts(sender, instance, **kwargs):
+    invalidate_driver_context(
+        Driver.objects.filter(carrier_id=instance.pk).values_list("user_id", flat=True)
+    )
 
 
 class CycleCalculation(models.Model):
@@ -344,3 +538,51 @@ class CycleCalculation(models.Model):
 
     class Meta:
         unique_together = ("driver", "calculation_date")
+
+
+class RouteCache(models.Model):
+    origin = models.CharField(max_length=200)
+    destination = models.CharField(max_length=200)
+    mode = models.CharField(max_length=20, default="driving")
+    distance_meters = models.PositiveIntegerField()
+    duration_seconds = models.PositiveIntegerField()
+    polyline = models.TextField(blank=True)
+    legs = models.JSONField(default=list, blank=True)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.origin} -> {self.destination} ({self.mode})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["origin", "destination", "mode"],
+                name="unique_route_cache_key",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+            models.Index(fields=["last_used_at"]),
+        ]
+
+
+class PlaceCache(models.Model):
+    cell = models.CharField(max_length=12)
+    place_type = models.CharField(max_length=50)
+    results = models.JSONField(default=list, blank=True)
+    fetched_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.place_type} in {self.cell}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cell", "place_type"], name="unique_place_cache_cell"
+            )
+        ]
+        indexes = [models.Index(fields=["expires_at"])]
@@ -0,0 +1,8 @@
+from rest_framework.pagination import CursorPagination
+
+
+class LogEntryCursorPagination(CursorPagination):
+    ordering = ("-date", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
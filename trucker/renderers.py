@@ -0,0 +1,17 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional extra
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON rendered by orjson when it is installed, DRF's encoder otherwise."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        return orjson.dumps(data, option=orjson.OPT_UTC_Z)
@@ -1,7 +1,63 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 from .models import Driver, Carrier, Stop, Trip, Vehicle, LogEntry, DutyStatus
+from .services.log_ingestion import ingest_logs
+from .validators import validate_duty_statuses
+
+
+class ExpandableFieldsMixin:
+    """
+    Sparse fieldsets for reads. ``?fields=a,b`` limits the top-level fields
+    and ``?expand=driver,driver.user`` swaps the compact id of a relation in
+    ``expandable_fields`` for its nested serializer. List actions are compact
+    unless expanded; detail reads, and serializers used without a request,
+    nest everything. Writes always use the compact (id) fields.
+    """
+
+    expandable_fields = {}
+
+    def _path(self):
+        names, field = [], self
+        while field.parent is not None:
+            if not isinstance(field.parent, serializers.ListSerializer):
+                names.append(field.field_name)
+            field = field.parent
+        return names[::-1]
+
+    def _expanded(self, request):
+        if request is None:
+            return set(self.expandable_fields)
+        if request.method not in SAFE_METHODS:
+            return set()
+        if getattr(self.context.get("view"), "action", None) != "list":
+            return set(self.expandable_fields)
+
+        prefix = self._path()
+        expanded = set()
+        for name in request.query_params.get("expand", "").split(","):
+            parts = name.strip().split(".")
+            if len(parts) > len(prefix) and parts[: len(prefix)] == prefix:
+                expanded.add(parts[len(prefix)])
+        return expanded
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+
+        for name in self._expanded(request) & set(fields):
+            serializer_class, kwargs = self.expandable_fields[name]
+            fields[name] = serializer_class(read_only=True, **kwargs)
+
+        requested = request.query_params.get("fields") if request else None
+        if requested and request.method in SAFE_METHODS and not self._path():
+            requested = {name.strip() for name in requested.split(",")}
+            fields = {
+                name: field for name, field in fields.items() if name in requested
+            }
+        return fields
 
 
 class DutyStatusSerializer(serializers.ModelSerializer):
@@ -43,12 +99,27 @@ class CarrierSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = "__all__"
+        fields = [
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "email",
+            "is_staff",
+            "is_superuser",
+            "is_active",
+            "date_joined",
+            "last_login",
+        ]
+
 
+class DriverSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    name = serializers.CharField(source="user.get_full_name", read_only=True)
 
-class DriverSerializer(serializers.ModelSerializer):
-    carrier = CarrierSerializer(required=False)
-    user = UserSerializer(required=False)
+    expandable_fields = {
+        "user": (UserSerializer, {}),
+        "carrier": (CarrierSerializer, {}),
+    }
 
     class Meta:
         model = Driver
@@ -68,10 +139,18 @@ class VehicleSerializer(serializers.ModelSerializer):
         }
 
 
-class LogEntrySerializer(serializers.ModelSerializer):
-    duty_statuses = DutyStatusSerializer(many=True, required=False)
-    driver = DriverSerializer()
-    vehicle = VehicleSerializer()
+class LogEntrySerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    duty_statuses = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    driver_name = serializers.CharField(
+        source="driver.user.get_full_name", read_only=True
+    )
+    truck_number = serializers.CharField(source="vehicle.truck_number", read_only=True)
+
+    expandable_fields = {
+        "driver": (DriverSerializer, {}),
+        "vehicle": (VehicleSerializer, {}),
+        "duty_statuses": (DutyStatusSerializer, {"many": True}),
+    }
 
     class Meta:
         model = LogEntry
@@ -79,12 +158,16 @@ class LogEntrySerializer(serializers.ModelSerializer):
             "id",
             "date",
             "vehicle",
+            "truck_number",
             "start_odometer",
             "end_odometer",
+            "total_miles",
             "remarks",
             "signature",
+            "adverse_conditions",
             "duty_statuses",
             "driver",
+            "driver_name",
         ]
 
 
@@ -108,12 +191,22 @@ class LogEntryCreateSerializer(serializers.ModelSerializer):
             "id": {"read_only": True},
         }
 
+    def validate(self, data):
+        statuses = sorted(
+            (DutyStatus(**ds_data) for ds_data in data.get("duty_statuses", [])),
+            key=lambda s: s.start_time,
+        )
+        try:
+            validate_duty_statuses(statuses, data.get("adverse_conditions", False))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"duty_statuses": e.messages})
+        return data
+
     def create(self, validated_data):
-        duty_statuses_data = validated_data.pop("duty_statuses", [])
-        log_entry = LogEntry.objects.create(**validated_data)
-        for ds_data in duty_statuses_data:
-            DutyStatus.objects.create(log_entry=log_entry, **ds_data)
-        return log_entry
+        try:
+            return ingest_logs([validated_data]).logs[0]
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
 
 
 class StopSerializer(serializers.ModelSerializer):
@@ -132,8 +225,8 @@ class StopSerializer(serializers.ModelSerializer):
         ]
 
 
-class TripSerializer(serializers.ModelSerializer):
-    stops = StopSerializer(many=True, read_only=True)
+class TripSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    stops = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
     driver_name = serializers.CharField(
         source="driver.user.get_full_name", read_only=True
     )
@@ -141,6 +234,11 @@ class TripSerializer(serializers.ModelSerializer):
         source="driver.remaining_hours", read_only=True
     )
 
+    expandable_fields = {
+        "driver": (DriverSerializer, {}),
+        "stops": (StopSerializer, {"many": True}),
+    }
+
     class Meta:
         model = Trip
         fields = [
@@ -159,7 +257,8 @@ class TripSerializer(serializers.ModelSerializer):
             "created_at",
             "stops",
             "remaining_hours",
-
+            "planning_status",
+            "planning_error",
         ]
         read_only_fields = [
             "distance",
@@ -167,6 +266,8 @@ class TripSerializer(serializers.ModelSerializer):
             "created_at",
             "stops",
             "remaining_hours",
+            "planning_status",
+            "planning_error",
         ]
 
 
@@ -186,3 +287,8 @@ class TripSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         return Trip.objects.create(**validated_data)
+
+
+class FeasibilityRequestSerializer(serializers.Serializer):
+    duration_hours = serializers.FloatField(min_value=0)
+    earliest_start = serializers.DateTimeField(required=False)
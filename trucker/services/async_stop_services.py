@@ -0,0 +1,197 @@
+import asyncio
+import weakref
+from datetime import datetime
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from trucker.exceptions import MapsQuotaExceeded, RouteServiceError
+from trucker.services.maps_client import MAPS_BASE_URL, RETRY_STATUSES
+from trucker.services.rate_limit import maps_scheduler
+from trucker.services.places_cache import geohash_center, places_cache
+from trucker.services.route_cache import route_cache
+from trucker.services.route_services import RouteResult
+from trucker.services.stop_services import (
+    RoutePlan,
+    map_trip_stops,
+    parse_places_response,
+    store_fetched_places,
+)
+
+
+def _client_setting(name, default):
+    return getattr(settings, "ASYNC_MAPS_CLIENT", {}).get(name, default)
+
+
+class AsyncMapsClient:
+    """
+    httpx-based Maps client bounded by a global semaphore and a per-host
+    semaphore. Bound to the event loop it was created on.
+    """
+
+    def __init__(self, transport=None, max_concurrency=None, per_host=None):
+        max_concurrency = max_concurrency or _client_setting("MAX_CONCURRENCY", 50)
+        self.per_host = per_host or _client_setting("PER_HOST_CONCURRENCY", 10)
+        self.retries = _client_setting("RETRIES", 3)
+        self.backoff_factor = _client_setting("BACKOFF_FACTOR", 0.5)
+        self.client = httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(_client_setting("TIMEOUT", 10.0), connect=3.05),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=self.per_host,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._host_semaphores = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._host_semaphores[host]
+
+    async def get(self, endpoint: str, params: Dict) -> httpx.Response:
+        params = dict(params)
+        params.setdefault("key", settings.MAPS_API_KEY)
+        url = f"{MAPS_BASE_URL}/{endpoint}/json"
+
+        async with self._semaphore, self._host_semaphore(url):
+            for attempt in range(self.retries + 1):
+                await maps_scheduler.acquire_async(endpoint)
+                response = await self.client.get(url, params=params)
+                if response.status_code == 429:
+                    maps_scheduler.penalize(endpoint)
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt == self.retries
+                ):
+                    return response
+                await asyncio.sleep(self.backoff_factor * (2**attempt))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_clients = weakref.WeakKeyDictionary()
+_transport = None
+
+
+def get_async_maps_client() -> AsyncMapsClient:
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = AsyncMapsClient(transport=_transport)
+    return _clients[loop]
+
+
+def set_async_transport(transport):
+    global _transport
+    _transport = transport
+    _clients.clear()
+
+
+async def get_route_async(
+    origin: str, destination: str, client: AsyncMapsClient, mode: str = "driving"
+) -> RouteResult:
+    cached = await sync_to_async(route_cache.get)(origin, destination, mode)
+    if cached is not None and cached.is_detailed:
+        return cached
+
+    response = await client.get(
+        "directions", {"origin": origin, "destination": destination, "mode": mode}
+    )
+    data = response.json()
+    if data.get("status") == "OVER_QUERY_LIMIT":
+        maps_scheduler.penalize("directions")
+    if response.status_code != 200 or data.get("status") != "OK":
+        raise RouteServiceError(
+            data.get("error_message", "Failed to retrieve directions")
+        )
+
+    route = RouteResult.from_directions(data["routes"][0])
+    await sync_to_async(route_cache.set)(origin, destination, mode, route)
+    return route
+
+
+async def query_places_async(
+    client: AsyncMapsClient,
+    waypoint: Dict,
+    place_type: str,
+    radius: int = 5000,
+    max_results: int = 3,
+) -> List[Dict]:
+    params = {
+        "location": f"{waypoint['lat']},{waypoint['lng']}",
+        "radius": radius,
+        "type": place_type,
+    }
+    for attempt in range(client.retries + 1):
+        response = await client.get("place/nearbysearch", params)
+        try:
+            return parse_places_response(response.json(), max_results)
+        except MapsQuotaExceeded:
+            maps_scheduler.penalize("place/nearbysearch")
+            if attempt == client.retries:
+                raise
+
+
+async def find_stops_async(
+    plan: RoutePlan,
+    intervals: Dict[str, int],
+    client: AsyncMapsClient,
+    departure_time: datetime = None,
+) -> Dict[str, List[Dict]]:
+    jobs = plan.place_jobs(intervals)
+    keys = {(cell, place_type) for cell, place_type, _ in jobs}
+    cached = await sync_to_async(places_cache.get_many)(keys)
+    cold = sorted(keys - cached.keys())
+
+    fetched = {}
+    if cold:
+        results = await asyncio.gather(
+            *(
+                query_places_async(client, geohash_center(cell), place_type)
+                for cell, place_type in cold
+            ),
+            return_exceptions=True,
+        )
+        outcomes = dict(zip(cold, results))
+        fetched = {
+            key: result
+            for key, result in outcomes.items()
+            if not isinstance(result, BaseException)
+        }
+        await sync_to_async(store_fetched_places)(
+            fetched,
+            {key: result for key, result in outcomes.items() if key not in fetched},
+        )
+
+    return plan.assemble_stops(intervals, jobs, cached, fetched, departure_time)
+
+
+async def plan_trip_stops_async(
+    origin: str,
+    destination: str,
+    fuel_interval: int = 1000,
+    rest_interval: int = 1000,
+    departure_time: datetime = None,
+    client: AsyncMapsClient = None,
+) -> List[Dict]:
+    """
+    Async counterpart of plan_trip_stops. Outbound calls share one event loop
+    instead of a thread each; cancelling the caller (e.g. on client disconnect)
+    cancels every in-flight request.
+    """
+    client = client or get_async_maps_client()
+    route = await get_route_async(origin, destination, client)
+    plan = RoutePlan(settings.MAPS_API_KEY, origin, destination, route=route)
+    raw_data = await find_stops_async(
+        plan,
+        {"gas_station": fuel_interval, "rest_stop": rest_interval},
+        client,
+        departure_time,
+    )
+    return map_trip_stops(raw_data)
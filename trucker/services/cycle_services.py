@@ -0,0 +1,278 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import DurationField, ExpressionWrapper, F, Sum, Window
+from django.db.models.functions import Lag
+from django.utils import timezone
+
+ON_DUTY_STATUSES = ("D", "ON")
+
+
+def cycle_days(hos_cycle_choice: str) -> int:
+    return 8 if hos_cycle_choice == "70" else 7
+
+
+def duty_contribution(driver_id, status, start_time, end_time):
+    """
+    On-duty hours a status adds to each local day it covers, as
+    ``{(driver_id, day): hours}``, split at local midnight; None if off duty.
+    """
+    if status not in ON_DUTY_STATUSES or None in (driver_id, start_time, end_time):
+        return None
+    contribution = {}
+    while start_time < end_time:
+        day = timezone.localdate(start_time)
+        midnight = timezone.make_aware(
+            datetime.combine(day + timedelta(days=1), time())
+        )
+        until = min(end_time, midnight)
+        contribution[(driver_id, day)] = (until - start_time).total_seconds() / 3600
+        start_time = until
+    return contribution
+
+
+def apply_duty_deltas(deltas: dict):
+    """Add ``{(driver_id, date): hours}`` to the daily totals, creating rows as needed."""
+    from trucker.models import DailyDutyTotal
+
+    deltas = {key: hours for key, hours in deltas.items() if abs(hours) > 1e-9}
+    if not deltas:
+        return
+
+    # Removals only ever touch existing rows, which also keeps cascading
+    # deletes from recreating totals for a driver being deleted.
+    DailyDutyTotal.objects.bulk_create(
+        [
+            DailyDutyTotal(driver_id=driver_id, date=day, hours=0)
+            for (driver_id, day), hours in deltas.items()
+            if hours > 0
+        ],
+        ignore_conflicts=True,
+    )
+    for (driver_id, day), hours in deltas.items():
+        DailyDutyTotal.objects.filter(driver_id=driver_id, date=day).update(
+            hours=F("hours") + hours
+        )
+
+
+def status_deltas(changes) -> dict:
+    """Net per-day deltas from ``(old_contribution, new_contribution)`` pairs."""
+    deltas = defaultdict(float)
+    for old, new in changes:
+        for key, hours in (old or {}).items():
+            deltas[key] -= hours
+        for key, hours in (new or {}).items():
+            deltas[key] += hours
+    return deltas
+
+
+def cycle_start_date(driver, as_of: date = None) -> date:
+    as_of = as_of or timezone.localdate()
+    days = cycle_days(driver.carrier.hos_cycle_choice if driver.carrier else "60")
+    start = as_of - timedelta(days=days - 1)
+    if driver.last_34hr_restart:
+        start = max(start, timezone.localdate(driver.last_34hr_restart))
+    return start
+
+
+def cycle_hours_used(driver, as_of: date = None) -> float:
+    """On-duty hours in the driver's rolling 7/8-day cycle, summed in the database."""
+    from trucker.models import DailyDutyTotal
+
+    as_of = as_of or timezone.localdate()
+    total = DailyDutyTotal.objects.filter(
+        driver_id=driver.pk, date__gte=cycle_start_date(driver, as_of), date__lte=as_of
+    ).aggregate(total=Sum("hours"))["total"]
+    return max(round(total or 0.0, 6), 0.0)
+
+
+def record_restart(driver, restart_time) -> bool:
+    """Move the driver's last 34-hour restart forward; False if it is not newer."""
+    from trucker.models import Driver
+
+    if driver.last_34hr_restart and driver.last_34hr_restart >= restart_time:
+        return False
+    driver.last_34hr_restart = restart_time
+    Driver.objects.filter(pk=driver.pk).update(last_34hr_restart=restart_time)
+    return True
+
+
+def last_restart_gap(driver, as_of=None):
+    """
+    When the driver's latest 34-hour restart ended: the start of the first
+    on-duty status after a gap of at least 34 hours since the previous one.
+    One query on the (driver, start_time) index, with LAG over the driver's
+    on-duty statuses.
+
+    With ``as_of``, only history up to then is considered, and ``as_of``
+    itself is returned if the driver has been off duty for the 34 hours
+    before it.
+    """
+    from trucker.models import DutyStatus
+
+    statuses = DutyStatus.objects.filter(
+        driver_id=driver.pk, status__in=ON_DUTY_STATUSES
+    )
+    if as_of is not None:
+        statuses = statuses.filter(start_time__lte=as_of)
+        last_end = (
+            statuses.order_by("-end_time").values_list("end_time", flat=True).first()
+        )
+        if last_end is None or as_of - last_end >= timedelta(hours=34):
+            return as_of
+    return (
+        statuses.annotate(
+            gap=ExpressionWrapper(
+                F("start_time")
+                - Window(Lag("end_time"), order_by=F("start_time").asc()),
+                output_field=DurationField(),
+            )
+        )
+        .filter(gap__gte=timedelta(hours=34))
+        .order_by("-start_time")
+        .values_list("start_time", flat=True)
+        .first()
+    )
+
+
+def detect_restart(driver) -> bool:
+    """Cache the latest restart found in the duty history on the driver."""
+    restart_time = last_restart_gap(driver)
+    return restart_time is not None and record_restart(driver, restart_time)
+
+
+def refresh_cycle_used(driver) -> float:
+    from trucker.models import Driver
+
+    driver.current_cycle_used = cycle_hours_used(driver)
+    Driver.objects.filter(pk=driver.pk).update(
+        current_cycle_used=driver.current_cycle_used
+    )
+    return driver.current_cycle_used
+
+
+def cycle_type(hos_cycle_choice: str) -> str:
+    return "70-hour" if hos_cycle_choice == "70" else "60-hour"
+
+
+def rolling_totals(daily: dict, dates, days: int) -> dict:
+    """Cycle total for each of ``dates``: the sum of the ``days`` daily totals ending on it."""
+    return {
+        day: sum(daily.get(day - timedelta(days=offset), 0.0) for offset in range(days))
+        for day in dates
+    }
+
+
+def affected_dates(duty_dates, days: int) -> set:
+    """Every date whose cycle window contains one of ``duty_dates``."""
+    return {
+        day + timedelta(days=offset) for day in duty_dates for offset in range(days)
+    }
+
+
+def refresh_cycle_rollup(driver, duty_dates, create=True):
+    """
+    Recompute the CycleCalculation rows whose window covers ``duty_dates``.
+    Removals pass ``create=False`` and only touch existing rows, like
+    apply_duty_deltas.
+    """
+    from trucker.models import CycleCalculation, DailyDutyTotal
+
+    duty_dates = set(duty_dates)
+    if not duty_dates:
+        return
+
+    choice = driver.carrier.hos_cycle_choice if driver.carrier else "60"
+    days = cycle_days(choice)
+    dates = affected_dates(duty_dates, days)
+    daily = dict(
+        DailyDutyTotal.objects.filter(
+            driver_id=driver.pk,
+            date__gte=min(dates) - timedelta(days=days - 1),
+            date__lte=max(dates),
+        ).values_list("date", "hours")
+    )
+
+    totals = rolling_totals(daily, dates, days)
+
+    if not create:
+        rows = list(
+            CycleCalculation.objects.filter(
+                driver_id=driver.pk, calculation_date__in=dates
+            )
+        )
+        for row in rows:
+            row.total_hours = round(totals[row.calculation_date], 6)
+        CycleCalculation.objects.bulk_update(rows, ["total_hours"])
+        return
+
+    CycleCalculation.objects.bulk_create(
+        [
+            CycleCalculation(
+                driver_id=driver.pk,
+                calculation_date=day,
+                total_hours=round(total, 6),
+                cycle_type=cycle_type(choice),
+            )
+            for day, total in totals.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["driver", "calculation_date"],
+        update_fields=["total_hours", "cycle_type"],
+    )
+
+
+def driver_recap(driver, as_of: date = None) -> dict:
+    """
+    The 8-day recap served to the driver dashboard, read from the daily totals
+    and the CycleCalculation rollup only.
+    """
+    from trucker.models import CycleCalculation, DailyDutyTotal
+
+    as_of = as_of or timezone.localdate()
+    choice = driver.carrier.hos_cycle_choice if driver.carrier else "60"
+    days = cycle_days(choice)
+    limit = 70.0 if choice == "70" else 60.0
+    first_day = as_of - timedelta(days=7)
+
+    daily = dict(
+        DailyDutyTotal.objects.filter(
+            driver_id=driver.pk, date__gte=first_day, date__lte=as_of
+        ).values_list("date", "hours")
+    )
+    rollup = dict(
+        CycleCalculation.objects.filter(
+            driver_id=driver.pk,
+            calculation_date__gte=first_day,
+            calculation_date__lte=as_of,
+        ).values_list("calculation_date", "total_hours")
+    )
+
+    tomorrow = as_of + timedelta(days=1)
+    counted_from = cycle_start_date(driver, tomorrow)
+    used_tomorrow = sum(
+        hours for day, hours in daily.items() if counted_from <= day <= as_of
+    )
+    return {
+        "driver": driver.pk,
+        "cycle_type": cycle_type(choice),
+        "cycle_hours": limit,
+        "last_34hr_restart": driver.last_34hr_restart,
+        "days": [
+            {
+                "date": day,
+                "hours": round(daily.get(day, 0.0), 2),
+                "cycle_total": round(rollup.get(day, 0.0), 2),
+            }
+            for day in (first_day + timedelta(days=offset) for offset in range(8))
+        ],
+        "cycle_used": round(
+            sum(
+                hours
+                for day, hours in daily.items()
+                if cycle_start_date(driver, as_of) <= day
+            ),
+            2,
+        ),
+        "available_tomorrow": round(max(limit - used_tomorrow, 0.0), 2),
+    }
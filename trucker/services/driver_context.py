@@ -0,0 +1,86 @@
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+CLAIMS = ("driver_id", "carrier_id", "hos_cycle")
+
+
+def _context_setting(name, default):
+    return getattr(settings, "DRIVER_CONTEXT", {}).get(name, default)
+
+
+def _ttl() -> float:
+    return _context_setting("TTL", timedelta(minutes=5)).total_seconds()
+
+
+def _key(user_id) -> str:
+    return f"driver-context:{user_id}"
+
+
+@dataclass(frozen=True)
+class DriverContext:
+    driver_id: Optional[int] = None
+    carrier_id: Optional[int] = None
+    hos_cycle: Optional[str] = None
+
+    @property
+    def cycle_hours(self) -> float:
+        return 70.0 if self.hos_cycle == "70" else 60.0
+
+    def as_claims(self) -> dict:
+        return asdict(self)
+
+
+def load_driver_context(user) -> DriverContext:
+    from trucker.models import Driver
+
+    row = (
+        Driver.objects.filter(user=user)
+        .values_list("pk", "carrier_id", "carrier__hos_cycle_choice")
+        .first()
+    )
+    return DriverContext(*row) if row else DriverContext()
+
+
+def _from_claims(token, invalidated_at=None) -> Optional[DriverContext]:
+    if token is None or any(claim not in token for claim in CLAIMS):
+        return None
+    issued_at = token.get("iat", 0)
+    if time.time() - issued_at >= _ttl():
+        return None
+    if invalidated_at is not None and issued_at <= invalidated_at:
+        return None
+    return DriverContext(*(token[claim] for claim in CLAIMS))
+
+
+def driver_context(user, token=None) -> DriverContext:
+    """
+    The driver id, carrier id and HOS cycle for ``user``, from the cache, the
+    token's claims or one query, in that order.
+
+    Invalidation replaces the entry with its timestamp for a full TTL rather
+    than deleting it, so claims are only trusted from tokens younger than the
+    TTL that were issued after the last invalidation.
+    """
+    if user is None or not user.is_authenticated:
+        return DriverContext()
+
+    key = _key(user.pk)
+    cached = cache.get(key)
+    if isinstance(cached, DriverContext):
+        return cached
+
+    context = _from_claims(token, invalidated_at=cached)
+    if context is None:
+        context = load_driver_context(user)
+    cache.set(key, context, _ttl())
+    return context
+
+
+def invalidate_driver_context(user_ids: Iterable[int]):
+    now = time.time()
+    cache.set_many({_key(user_id): now for user_id in user_ids}, _ttl())
@@ -0,0 +1,371 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+from trucker.services.hos_planner import (
+    BREAK_AFTER_DRIVING_HOURS,
+    BREAK_HOURS,
+    DAILY_RESET_HOURS,
+    DUTY_WINDOW_HOURS,
+    EPSILON,
+    MAX_DRIVING_HOURS,
+    RESTART_HOURS,
+    cycle_limit,
+    plan_hos,
+)
+
+ON_DUTY_STATUSES = ("D", "ON")
+
+# Drivers whose estimated arrival is refined by the split-aware planner.
+PLANNED_DRIVERS = 25
+
+
+def load_duty_history(drivers, earliest_start: datetime):
+    """
+    One query for the on-duty history of every driver in ``drivers`` over the
+    longest cycle window, as flat arrays of hour offsets from ``earliest_start``.
+    """
+    from trucker.models import DutyStatus
+
+    driver_ids = [driver.pk for driver in drivers]
+    rows = (
+        DutyStatus.objects.filter(
+            driver_id__in=driver_ids,
+            status__in=ON_DUTY_STATUSES,
+            end_time__gt=earliest_start - timedelta(days=8),
+            start_time__lt=earliest_start,
+        )
+        .order_by("driver_id", "start_time")
+        .values_list("driver_id", "status", "start_time", "end_time")
+    )
+
+    position = {driver_id: index for index, driver_id in enumerate(driver_ids)}
+    owner, driving, starts, ends = [], [], [], []
+    for driver_id, status, start_time, end_time in rows:
+        owner.append(position[driver_id])
+        driving.append(status == "D")
+        starts.append((start_time - earliest_start).total_seconds() / 3600)
+        ends.append(
+            (min(end_time, earliest_start) - earliest_start).total_seconds() / 3600
+        )
+
+    return (
+        np.array(owner, dtype=np.int64),
+        np.array(driving, dtype=bool),
+        np.array(starts, dtype=np.float64),
+        np.array(ends, dtype=np.float64),
+    )
+
+
+def _last_per_driver(values, owner, mask, count, default):
+    """Value from the last row of each driver where ``mask`` holds."""
+    result = np.full(count, default, dtype=np.float64)
+    result[owner[mask]] = values[mask]
+    return result
+
+
+def duty_state(owner, driving, starts, ends, count, cycle_hours, restarts):
+    """
+    Per-driver HOS state at the load's earliest start, all as float hours:
+    hours off duty so far, driving and window used in the current shift,
+    driving since the last 30-minute break and hours used in the cycle.
+    """
+    durations = ends - starts
+    same_driver = np.zeros(len(owner), dtype=bool)
+    same_driver[1:] = owner[1:] == owner[:-1]
+    gaps = np.where(same_driver, starts - np.roll(ends, 1), np.inf)
+
+    last_end = _last_per_driver(ends, owner, np.ones(len(owner), bool), count, -np.inf)
+    off_so_far = -last_end
+
+    shift_start = _last_per_driver(
+        starts, owner, gaps >= DAILY_RESET_HOURS, count, -np.inf
+    )
+    in_shift = starts >= shift_start[owner]
+    shift_driving = np.bincount(
+        owner, weights=durations * (driving & in_shift), minlength=count
+    )
+
+    is_break = (gaps >= BREAK_HOURS) | (~driving & (durations >= BREAK_HOURS))
+    break_start = _last_per_driver(starts, owner, is_break, count, -np.inf)
+    since_break = np.bincount(
+        owner,
+        weights=durations * (driving & (starts >= break_start[owner])),
+        minlength=count,
+    )
+
+    cycle_window = np.where(np.asarray(cycle_hours) == 70.0, 8 * 24.0, 7 * 24.0)
+    cycle_start = np.maximum.reduce(
+        [
+            _last_per_driver(starts, owner, gaps >= RESTART_HOURS, count, -np.inf),
+            restarts,
+            -cycle_window,
+        ]
+    )
+    counted = np.clip(ends - np.maximum(starts, cycle_start[owner]), 0, None)
+    cycle_used = np.bincount(owner, weights=counted, minlength=count)
+    cycle_used = np.where(off_so_far >= RESTART_HOURS, 0.0, cycle_used)
+
+    fresh = off_so_far >= DAILY_RESET_HOURS
+    window_used = np.where(fresh, 0.0, -shift_start)
+    shift_driving = np.where(fresh, 0.0, shift_driving)
+    since_break = np.where(fresh | (off_so_far >= BREAK_HOURS), 0.0, since_break)
+    return off_so_far, shift_driving, window_used, since_break, cycle_used
+
+
+def resets_only_eta(
+    duration_hours: float,
+    shift_driving,
+    window_used,
+    since_break,
+    cycle_left,
+    cycle_hours,
+    clock=0.0,
+    off_duty=0.0,
+):
+    """
+    Arrival of every driver under the planner's resets-only layout, stepping
+    the whole fleet through each break, reset, restart and driving stretch in
+    lockstep. Returns the arrival and whether a 34-hour restart was taken.
+    """
+    count = len(cycle_hours)
+    clock = np.zeros(count) + clock
+    remaining = np.full(count, float(duration_hours))
+    shift = np.array(shift_driving, dtype=np.float64)
+    since = np.array(since_break, dtype=np.float64)
+    cycle_left = np.array(cycle_left, dtype=np.float64)
+    window_start = clock - window_used
+    restarted = np.zeros(count, dtype=bool)
+
+    while True:
+        active = remaining > EPSILON
+        if not active.any():
+            return clock, restarted
+
+        restart = active & (cycle_left <= EPSILON)
+        reset = (
+            active
+            & ~restart
+            & (
+                (shift >= MAX_DRIVING_HOURS - EPSILON)
+                | (clock - window_start >= DUTY_WINDOW_HOURS - EPSILON)
+            )
+        )
+        pause = (
+            active & ~restart & ~reset & (since >= BREAK_AFTER_DRIVING_HOURS - EPSILON)
+        )
+        drive = active & ~(restart | reset | pause)
+
+        rest = restart | reset
+        rest_hours = np.where(restart, RESTART_HOURS, DAILY_RESET_HOURS)
+        rest_hours = np.where(
+            clock <= EPSILON, np.maximum(rest_hours - off_duty, 0.0), rest_hours
+        )
+        clock = np.where(rest, clock + rest_hours, clock)
+        clock = np.where(pause, clock + BREAK_HOURS, clock)
+        window_start = np.where(rest, clock, window_start)
+        shift = np.where(rest, 0.0, shift)
+        since = np.where(rest | pause, 0.0, since)
+        cycle_left = np.where(restart, cycle_hours, cycle_left)
+        restarted |= restart
+
+        hours = np.minimum.reduce(
+            [
+                remaining,
+                MAX_DRIVING_HOURS - shift,
+                DUTY_WINDOW_HOURS - (clock - window_start),
+                BREAK_AFTER_DRIVING_HOURS - since,
+                cycle_left,
+            ]
+        )
+        hours = np.where(drive, hours, 0.0)
+        clock += hours
+        remaining -= hours
+        shift += hours
+        since += hours
+        cycle_left -= hours
+
+
+def estimate_feasibility(
+    duration_hours: float,
+    off_so_far,
+    shift_driving,
+    window_used,
+    since_break,
+    cycle_used,
+    cycle_hours,
+):
+    """
+    Vectorized earliest arrival for every driver: the best of carrying on
+    with the current shift, resting now and, when the cycle cannot cover the
+    load, restarting now, each laid out with resets only. Hours already off
+    duty count toward a rest taken now.
+    """
+    cycle_hours = np.asarray(cycle_hours, dtype=np.float64)
+    off_duty = np.minimum(off_so_far, RESTART_HOURS)
+    cycle_left = cycle_hours - cycle_used
+    zeros = np.zeros(len(cycle_hours))
+
+    eta, needs_restart = resets_only_eta(
+        duration_hours,
+        shift_driving,
+        window_used,
+        since_break,
+        cycle_left,
+        cycle_hours,
+        off_duty=off_duty,
+    )
+
+    rested_eta, rested_restart = resets_only_eta(
+        duration_hours,
+        zeros,
+        zeros,
+        zeros,
+        cycle_left,
+        cycle_hours,
+        clock=np.maximum(DAILY_RESET_HOURS - off_duty, 0.0),
+    )
+    better = rested_eta < eta
+    eta = np.where(better, rested_eta, eta)
+    needs_restart = np.where(better, rested_restart, needs_restart)
+
+    restarted_eta, _ = resets_only_eta(
+        duration_hours,
+        zeros,
+        zeros,
+        zeros,
+        cycle_hours,
+        cycle_hours,
+        clock=np.maximum(RESTART_HOURS - off_duty, 0.0),
+    )
+    better = (duration_hours > cycle_left + EPSILON) & (restarted_eta < eta)
+    eta = np.where(better, restarted_eta, eta)
+    needs_restart = needs_restart | better
+    return eta, needs_restart
+
+
+def plan_feasibility(
+    duration_hours: float,
+    off_so_far,
+    shift_driving,
+    window_used,
+    since_break,
+    cycle_used,
+    cycle_hours,
+    planned_drivers: int = PLANNED_DRIVERS,
+):
+    """
+    Feasibility and earliest arrival, in hours from the earliest start, for
+    every driver.
+
+    The whole fleet is estimated in one vectorized pass; only the
+    ``planned_drivers`` best estimates are then handed to ``plan_hos``, once
+    per distinct HOS state, so the drivers dispatch will actually pick get
+    the split-aware arrival the trip planner produces. A driver is feasible
+    when they can start driving now and finish without a 34-hour restart.
+    """
+    cycle_hours = np.asarray(cycle_hours, dtype=np.float64)
+    eta, needs_restart = estimate_feasibility(
+        duration_hours,
+        off_so_far,
+        shift_driving,
+        window_used,
+        since_break,
+        cycle_used,
+        cycle_hours,
+    )
+
+    best = np.argsort(eta, kind="stable")[:planned_drivers]
+    states = np.column_stack(
+        [
+            np.minimum(off_so_far, RESTART_HOURS),
+            shift_driving,
+            window_used,
+            since_break,
+            cycle_used,
+            cycle_hours,
+        ]
+    )[best].round(6)
+    distinct, inverse = np.unique(states, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    for index, (off_duty, shift, window, since, used, limit) in enumerate(distinct):
+        plan = plan_hos(
+            duration_hours,
+            cycle_used=used,
+            cycle_hours=limit,
+            shift_driving=shift,
+            window_used=window,
+            since_break=since,
+            off_duty=off_duty,
+        )
+        drivers = best[inverse == index]
+        improved = drivers[plan.total_hours < eta[drivers]]
+        eta[improved] = plan.total_hours
+        needs_restart[improved] = plan.restarts > 0
+
+    available = np.maximum(
+        np.minimum(MAX_DRIVING_HOURS - shift_driving, DUTY_WINDOW_HOURS - window_used),
+        0.0,
+    )
+    feasible = (available > EPSILON) & (
+        duration_hours <= cycle_hours - cycle_used + EPSILON
+    )
+    return feasible, needs_restart, eta, available
+
+
+def rank_drivers(
+    drivers, duration_hours: float, earliest_start: datetime
+) -> List[Dict]:
+    """Feasibility and earliest legal arrival for every driver, best first."""
+    drivers = list(drivers)
+    if not drivers:
+        return []
+
+    cycle_hours = np.array(
+        [
+            cycle_limit(driver.carrier.hos_cycle_choice if driver.carrier else "60")
+            for driver in drivers
+        ]
+    )
+    restarts = np.array(
+        [
+            (
+                (driver.last_34hr_restart - earliest_start).total_seconds() / 3600
+                if driver.last_34hr_restart
+                else -np.inf
+            )
+            for driver in drivers
+        ]
+    )
+    owner, driving, starts, ends = load_duty_history(drivers, earliest_start)
+    off_so_far, shift_driving, window_used, since_break, cycle_used = duty_state(
+        owner, driving, starts, ends, len(drivers), cycle_hours, restarts
+    )
+    feasible, needs_restart, eta, available = plan_feasibility(
+        duration_hours,
+        off_so_far,
+        shift_driving,
+        window_used,
+        since_break,
+        cycle_used,
+        cycle_hours,
+    )
+
+    order = np.lexsort((-(cycle_hours - cycle_used), eta, ~feasible))
+    return [
+        {
+            "driver": drivers[index].pk,
+            "name": str(drivers[index]),
+            "feasible": bool(feasible[index]),
+            "requires_restart": bool(needs_restart[index]),
+            "available_driving_hours": round(float(available[index]), 2),
+            "cycle_remaining": round(
+                float(max(cycle_hours[index] - cycle_used[index], 0.0)), 2
+            ),
+            "eta_hours": round(float(eta[index]), 2),
+            "earliest_arrival": earliest_start + timedelta(hours=float(eta[index])),
+        }
+        for index in order
+    ]
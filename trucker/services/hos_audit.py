@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import groupby
+from typing import Iterator
+
+import numpy as np
+from django.utils import timezone
+
+from trucker.services.hos_planner import (
+    BREAK_AFTER_DRIVING_HOURS,
+    BREAK_HOURS,
+    DAILY_RESET_HOURS,
+    DUTY_WINDOW_HOURS,
+    MAX_DRIVING_HOURS,
+    RESTART_HOURS,
+    cycle_limit,
+)
+
+ON_DUTY_STATUSES = ("D", "ON")
+TOLERANCE = 1e-6
+
+DRIVING_LIMIT = "11-hour"
+DUTY_WINDOW = "14-hour"
+BREAK = "30-minute"
+CYCLE = "cycle"
+
+
+@dataclass(frozen=True)
+class Violation:
+    driver_id: int
+    rule: str
+    start_time: datetime
+    end_time: datetime
+    hours: float
+    limit: float
+
+
+def stream_duty_history(driver_ids=None, since=None, until=None, chunk_size=20000):
+    """
+    Yield ``(driver_id, driving, starts, ends, end_days)`` per driver from one
+    query ordered by driver and start time, streamed with ``.iterator()`` so
+    only one driver's on-duty rows are held in memory at a time. Times are
+    float hours since the epoch and ``end_days`` the local date each row ends
+    on. Off-duty time is implied by the gaps between rows.
+    """
+    from trucker.models import DutyStatus
+
+    rows = DutyStatus.objects.filter(status__in=ON_DUTY_STATUSES)
+    if driver_ids:
+        rows = rows.filter(driver_id__in=driver_ids)
+    if since is not None:
+        rows = rows.filter(end_time__gt=since)
+    if until is not None:
+        rows = rows.filter(start_time__lt=until)
+    rows = (
+        rows.order_by("driver_id", "start_time")
+        .values_list("driver_id", "status", "start_time", "end_time")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    for driver_id, group in groupby(rows, key=lambda row: row[0]):
+        _, statuses, starts, ends = zip(*group)
+        yield (
+            driver_id,
+            np.array(statuses) == "D",
+            np.array([start.timestamp() for start in starts]) / 3600,
+            np.array([end.timestamp() for end in ends]) / 3600,
+            np.array([timezone.localdate(end) for end in ends], dtype="datetime64[D]"),
+        )
+
+
+def local_window_starts(end_days, days):
+    """
+    Epoch hours of the local midnight that opens the ``days``-day cycle window
+    ending on each of ``end_days``, computed once per distinct date.
+    """
+    distinct, inverse = np.unique(end_days, return_inverse=True)
+    midnights = [
+        timezone.make_aware(
+            datetime.combine(day.item() - timedelta(days=days - 1), time())
+        ).timestamp()
+        / 3600
+        for day in distinct
+    ]
+    return np.array(midnights)[inverse.reshape(-1)]
+
+
+def _period_start(values, boundaries):
+    """For each row, ``values`` at the first row of the period it belongs to."""
+    period = np.cumsum(boundaries) - 1
+    return values[boundaries][period]
+
+
+def audit_history(driving, starts, ends, cycle_hours, window_starts=None):
+    """
+    Evaluate every rule over one driver's time-ordered on-duty rows at once.
+
+    Shifts begin after 10 or more hours off, driving segments after a
+    30-minute break, and cycles after a 34-hour restart; the 60/70-hour cycle
+    counts on-duty hours over the 7/8 days ending on each row, from
+    ``window_starts`` (see local_window_starts) or UTC midnights if omitted.
+    Returns ``{rule: (row_indices, measured_hours, limit)}`` for violating
+    driving rows.
+    """
+    count = len(starts)
+    if not count:
+        return {}
+
+    durations = ends - starts
+    latest_end = np.maximum.accumulate(ends)
+    gaps = np.full(count, np.inf)
+    gaps[1:] = starts[1:] - latest_end[:-1]
+
+    driven = np.cumsum(durations * driving)
+    driven_before = driven - durations * driving
+    on_duty = np.cumsum(durations)
+    on_duty_before = on_duty - durations
+
+    new_shift = gaps >= DAILY_RESET_HOURS - TOLERANCE
+    window_used = ends - _period_start(starts, new_shift)
+    shift_driving = driven - _period_start(driven_before, new_shift)
+    since_break = driven - _period_start(driven_before, gaps >= BREAK_HOURS - TOLERANCE)
+
+    if window_starts is None:
+        days = 8 if cycle_hours == 70.0 else 7
+        window_starts = (np.floor(ends / 24) - (days - 1)) * 24
+    window_start = np.maximum(
+        window_starts, _period_start(starts, gaps >= RESTART_HOURS - TOLERANCE)
+    )
+    first = np.searchsorted(latest_end, window_start, side="right")
+    cycle_used = (
+        on_duty
+        - on_duty_before[first]
+        - np.clip(window_start - starts[first], 0.0, None)
+    )
+
+    results = {}
+    for rule, measured, limit in (
+        (DRIVING_LIMIT, shift_driving, MAX_DRIVING_HOURS),
+        (DUTY_WINDOW, window_used, DUTY_WINDOW_HOURS),
+        (BREAK, since_break, BREAK_AFTER_DRIVING_HOURS),
+        (CYCLE, cycle_used, cycle_hours),
+    ):
+        rows = np.flatnonzero(driving & (measured > limit + TOLERANCE))
+        if len(rows):
+            results[rule] = (rows, measured[rows], limit)
+    return results
+
+
+def _as_datetime(hours):
+    return datetime.fromtimestamp(float(hours) * 3600, tz=dt_timezone.utc)
+
+
+def run_audit(
+    driver_ids=None, since=None, until=None, chunk_size=20000
+) -> Iterator[Violation]:
+    """
+    Every 11-hour, 14-hour, 30-minute and 60/70-hour violation in the duty
+    history, driver by driver. History from the 8 days before ``since`` is
+    read so cycles spanning it are counted, but only violations ending on or
+    after ``since`` are reported.
+    """
+    from trucker.models import Driver
+
+    drivers = Driver.objects.all()
+    if driver_ids:
+        drivers = drivers.filter(pk__in=driver_ids)
+    cycles = {
+        driver_id: cycle_limit(choice or "60")
+        for driver_id, choice in drivers.values_list("pk", "carrier__hos_cycle_choice")
+    }
+
+    lookback = since - timedelta(days=8) if since is not None else None
+    reported_from = since.timestamp() / 3600 if since is not None else -np.inf
+    for driver_id, driving, starts, ends, end_days in stream_duty_history(
+        driver_ids, lookback, until, chunk_size
+    ):
+        cycle_hours = cycles.get(driver_id, 60.0)
+        results = audit_history(
+            driving,
+            starts,
+            ends,
+            cycle_hours,
+            local_window_starts(end_days, 8 if cycle_hours == 70.0 else 7),
+        )
+        for rule, (rows, measured, limit) in results.items():
+            for row, hours in zip(rows, measured):
+                if ends[row] < reported_from:
+                    continue
+                yield Violation(
+                    driver_id=driver_id,
+                    rule=rule,
+                    start_time=_as_datetime(starts[row]),
+                    end_time=_as_datetime(ends[row]),
+                    hours=round(float(hours), 2),
+                    limit=limit,
+                )
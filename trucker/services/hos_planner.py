@@ -0,0 +1,422 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+from math import ceil
+from typing import List, Tuple
+
+MAX_DRIVING_HOURS = 11.0
+DUTY_WINDOW_HOURS = 14.0
+BREAK_AFTER_DRIVING_HOURS = 8.0
+BREAK_HOURS = 0.5
+DAILY_RESET_HOURS = 10.0
+EPSILON = 1e-9
+
+RESTART_HOURS = 34.0
+MAX_EXPANSIONS = 500
+
+DRIVING = "D"
+OFF_DUTY = "OFF"
+SLEEPER = "SB"
+
+DRIVE, RESET, RESTART, SPLIT = 0, 1, 2, 3
+
+# Qualifying split sleeper-berth periods and the period each pairs with:
+# 7/3 and 8/2, in either order, at least 10 hours in total.
+SPLIT_PERIODS = {
+    (SLEEPER, 7.0): (OFF_DUTY, 3.0),
+    (SLEEPER, 8.0): (OFF_DUTY, 2.0),
+    (OFF_DUTY, 3.0): (SLEEPER, 7.0),
+    (OFF_DUTY, 2.0): (SLEEPER, 8.0),
+}
+
+SEGMENT_LABELS = {
+    (DRIVING, DRIVE): "En route",
+    (OFF_DUTY, DRIVE): "Rest break",
+    (OFF_DUTY, RESET): "Mandatory rest",
+    (OFF_DUTY, RESTART): "34-hour restart",
+    (OFF_DUTY, SPLIT): "Split rest",
+    (SLEEPER, SPLIT): "Sleeper berth",
+}
+
+
+def cycle_limit(hos_cycle_choice: str) -> float:
+    return 70.0 if hos_cycle_choice == "70" else 60.0
+
+
+@dataclass(frozen=True)
+class HOSPlan:
+    """
+    Duty segments for a trip as hour offsets from departure.
+
+    Each segment is ``(status, start, end, kind)`` where ``kind`` is one of
+    DRIVE (driving or a 30-minute break), RESET (10 hours off), RESTART
+    (34 hours off) or SPLIT (one half of a 7/3 or 8/2 sleeper-berth split).
+    """
+
+    segments: Tuple[Tuple[str, float, float, int], ...]
+    driving_hours: float
+    cycle_used: float
+    cycle_hours: float
+
+    @property
+    def total_hours(self) -> float:
+        return self.segments[-1][2] if self.segments else 0.0
+
+    @property
+    def cycle_remaining(self) -> float:
+        return max(self.cycle_hours - self.cycle_used, 0.0)
+
+    @property
+    def resets(self) -> int:
+        return sum(1 for _, _, _, kind in self.segments if kind == RESET)
+
+    @property
+    def restarts(self) -> int:
+        return sum(1 for _, _, _, kind in self.segments if kind == RESTART)
+
+    def to_logs(self, start_time: datetime) -> List[dict]:
+        return [
+            {
+                "status": status,
+                "start_time": start_time + timedelta(hours=start),
+                "end_time": start_time + timedelta(hours=end),
+                "location_name": SEGMENT_LABELS[(status, kind)],
+            }
+            for status, start, end, kind in self.segments
+        ]
+
+
+def _lower_bound(remaining, shift_driving, window_used, cycle_left, pending):
+    """Hours still needed: the driving left plus the least rest it forces."""
+    available = max(
+        min(MAX_DRIVING_HOURS - shift_driving, DUTY_WINDOW_HOURS - window_used), 0.0
+    )
+    rest = 0.0
+    if remaining > available + EPSILON:
+        shifts = ceil((remaining - available) / MAX_DRIVING_HOURS - EPSILON)
+        first = SPLIT_PERIODS[pending][1] if pending else DAILY_RESET_HOURS
+        rest = first + DAILY_RESET_HOURS * (shifts - 1)
+    if remaining > cycle_left + EPSILON:
+        rest = max(rest + RESTART_HOURS - DAILY_RESET_HOURS, RESTART_HOURS)
+    return remaining + rest
+
+
+def _rest_hours(hours, clock, off_duty):
+    """Rest still needed, crediting hours already off duty before departure."""
+    return max(hours - off_duty, 0.0) if clock <= EPSILON else hours
+
+
+def _resets_only(
+    driving_hours,
+    cycle_used,
+    cycle_hours,
+    shift_driving=0.0,
+    window_used=0.0,
+    since_break=0.0,
+    off_duty=0.0,
+):
+    """Single-path layout: 30-minute breaks, 10-hour resets and 34-hour restarts."""
+    segments = []
+    clock = 0.0
+    window_start = -window_used
+    remaining = float(driving_hours)
+    cycle_left = cycle_hours - cycle_used
+
+    while remaining > EPSILON:
+        if cycle_left <= EPSILON:
+            rest = _rest_hours(RESTART_HOURS, clock, off_duty)
+            segments.append((OFF_DUTY, clock, clock + rest, RESTART))
+            clock += rest
+            window_start = clock
+            shift_driving = since_break = 0.0
+            cycle_left = cycle_hours
+            continue
+
+        if (
+            shift_driving >= MAX_DRIVING_HOURS - EPSILON
+            or clock - window_start >= DUTY_WINDOW_HOURS - EPSILON
+        ):
+            rest = _rest_hours(DAILY_RESET_HOURS, clock, off_duty)
+            segments.append((OFF_DUTY, clock, clock + rest, RESET))
+            clock += rest
+            window_start = clock
+            shift_driving = since_break = 0.0
+            continue
+
+        if since_break >= BREAK_AFTER_DRIVING_HOURS - EPSILON:
+            segments.append((OFF_DUTY, clock, clock + BREAK_HOURS, DRIVE))
+            clock += BREAK_HOURS
+            since_break = 0.0
+            continue
+
+        drive = min(
+            remaining,
+            MAX_DRIVING_HOURS - shift_driving,
+            DUTY_WINDOW_HOURS - (clock - window_start),
+            BREAK_AFTER_DRIVING_HOURS - since_break,
+            cycle_left,
+        )
+        segments.append((DRIVING, clock, clock + drive, DRIVE))
+        clock += drive
+        remaining -= drive
+        shift_driving += drive
+        since_break += drive
+        cycle_left -= drive
+
+    return segments
+
+
+def _search(
+    driving_hours,
+    cycle_used,
+    cycle_hours,
+    max_expansions,
+    shift_driving=0.0,
+    window_used=0.0,
+    since_break=0.0,
+    off_duty=0.0,
+):
+    """
+    Best-first (A*) search over rest choices for the earliest arrival.
+
+    Driving is always extended as far as the limits allow; the branching
+    happens where a limit is hit: a 30-minute break, a 10-hour reset, a
+    34-hour restart when the cycle cannot cover the rest of the trip, or
+    either half of a 7/3 or 8/2 sleeper-berth split. A completed split
+    recalculates the 11 and 14-hour limits from the end of its first half,
+    and neither half counts against the 14-hour window. Returns the plan's
+    segments, or None once ``max_expansions`` states have been expanded.
+
+    Hours already off duty before departure shorten a reset or restart taken
+    at departure, so one is also offered there while driving is still legal.
+    """
+    # state: remaining, shift driving, window used, driving since break,
+    # cycle left, pending split half, driving and window since that half
+    start = (float(driving_hours), shift_driving, window_used, since_break)
+    start += (cycle_hours - cycle_used, None, 0.0, 0.0)
+    counter = 0
+    frontier = [(_lower_bound(*start[:3], start[4], None), counter, 0.0, start, None)]
+    best = {}
+    expansions = 0
+
+    while frontier:
+        _, _, clock, state, path = heappop(frontier)
+        (
+            remaining,
+            shift,
+            window,
+            since_break,
+            cycle_left,
+            pending,
+            after,
+            after_window,
+        ) = state
+        if remaining <= EPSILON:
+            segments = []
+            while path:
+                segment, path = path
+                segments.append(segment)
+            return segments[::-1]
+
+        key = tuple(
+            round(value, 6) if isinstance(value, float) else value for value in state
+        )
+        if best.get(key, float("inf")) <= clock:
+            continue
+        best[key] = clock
+        expansions += 1
+        if expansions > max_expansions:
+            return None
+
+        successors = []
+        drive = min(
+            remaining,
+            MAX_DRIVING_HOURS - shift,
+            DUTY_WINDOW_HOURS - window,
+            BREAK_AFTER_DRIVING_HOURS - since_break,
+            cycle_left,
+        )
+        if drive > EPSILON:
+            successors.append(
+                (
+                    (DRIVING, drive, DRIVE),
+                    (
+                        remaining - drive,
+                        shift + drive,
+                        window + drive,
+                        since_break + drive,
+                        cycle_left - drive,
+                        pending,
+                        after + drive,
+                        after_window + drive,
+                    ),
+                )
+            )
+            if clock <= EPSILON and off_duty > EPSILON:
+                if remaining > cycle_left + EPSILON:
+                    successors.append(
+                        (
+                            (OFF_DUTY, RESTART_HOURS, RESTART),
+                            (remaining, 0.0, 0.0, 0.0, cycle_hours, None, 0.0, 0.0),
+                        )
+                    )
+                if shift > EPSILON or window > EPSILON:
+                    successors.append(
+                        (
+                            (OFF_DUTY, DAILY_RESET_HOURS, RESET),
+                            (remaining, 0.0, 0.0, 0.0, cycle_left, None, 0.0, 0.0),
+                        )
+                    )
+        else:
+            if cycle_left <= EPSILON or remaining > cycle_left + EPSILON:
+                successors.append(
+                    (
+                        (OFF_DUTY, RESTART_HOURS, RESTART),
+                        (remaining, 0.0, 0.0, 0.0, cycle_hours, None, 0.0, 0.0),
+                    )
+                )
+            if cycle_left > EPSILON:
+                shift_limited = (
+                    shift >= MAX_DRIVING_HOURS - EPSILON
+                    or window >= DUTY_WINDOW_HOURS - EPSILON
+                )
+                if shift_limited:
+                    successors.append(
+                        (
+                            (OFF_DUTY, DAILY_RESET_HOURS, RESET),
+                            (remaining, 0.0, 0.0, 0.0, cycle_left, None, 0.0, 0.0),
+                        )
+                    )
+                else:
+                    successors.append(
+                        (
+                            (OFF_DUTY, BREAK_HOURS, DRIVE),
+                            (
+                                remaining,
+                                shift,
+                                window + BREAK_HOURS,
+                                0.0,
+                                cycle_left,
+                                pending,
+                                after,
+                                after_window + BREAK_HOURS,
+                            ),
+                        )
+                    )
+
+                if pending:
+                    # Completing the pair: limits restart from the end of the
+                    # first half, and this half may pair with the next one.
+                    status, hours = SPLIT_PERIODS[pending]
+                    successors.append(
+                        (
+                            (status, hours, SPLIT),
+                            (
+                                remaining,
+                                after,
+                                after_window,
+                                0.0,
+                                cycle_left,
+                                (status, hours),
+                                0.0,
+                                0.0,
+                            ),
+                        )
+                    )
+                elif not shift_limited:
+                    for status, hours in SPLIT_PERIODS:
+                        successors.append(
+                            (
+                                (status, hours, SPLIT),
+                                (
+                                    remaining,
+                                    shift,
+                                    window,
+                                    0.0,
+                                    cycle_left,
+                                    (status, hours),
+                                    0.0,
+                                    0.0,
+                                ),
+                            )
+                        )
+
+        for (status, hours, kind), successor in successors:
+            if kind in (RESET, RESTART):
+                hours = _rest_hours(hours, clock, off_duty)
+            counter += 1
+            arrival = clock + hours
+            segment = (status, clock, arrival, kind)
+            estimate = arrival + _lower_bound(
+                successor[0], successor[1], successor[2], successor[4], successor[5]
+            )
+            heappush(frontier, (estimate, counter, arrival, successor, (segment, path)))
+
+    return None
+
+
+def plan_hos(
+    driving_hours: float,
+    cycle_used: float = 0.0,
+    cycle_hours: float = 70.0,
+    splits: bool = True,
+    max_expansions: int = MAX_EXPANSIONS,
+    shift_driving: float = 0.0,
+    window_used: float = 0.0,
+    since_break: float = 0.0,
+    off_duty: float = 0.0,
+) -> HOSPlan:
+    """
+    Fastest legal layout of ``driving_hours`` of driving under the 11-hour
+    driving limit, the 14-hour duty window, the 30-minute break after 8 hours
+    of driving and the 60/70-hour cycle, using 7/3 and 8/2 sleeper-berth
+    splits and 34-hour restarts where they help. Pure float arithmetic;
+    nothing is read from or written to the database.
+
+    The search is bounded by ``max_expansions``; past that (or with
+    ``splits=False``) the plan falls back to a single path of 10-hour resets,
+    taking a 34-hour restart whenever the cycle runs out.
+
+    A driver part-way through a shift departs with ``shift_driving``,
+    ``window_used`` and ``since_break`` already counted, after ``off_duty``
+    hours off that count toward a reset or restart taken at departure.
+    """
+    state = (shift_driving, window_used, since_break, off_duty)
+    segments = None
+    if splits:
+        segments = _search(
+            driving_hours, cycle_used, cycle_hours, max_expansions, *state
+        )
+    if segments is None:
+        segments = _resets_only(driving_hours, cycle_used, cycle_hours, *state)
+
+    # Hours since the last restart are what count toward the cycle.
+    cycle_used += float(driving_hours)
+    for index, (_, _, _, kind) in enumerate(segments):
+        if kind == RESTART:
+            cycle_used = sum(
+                end - start
+                for status, start, end, _ in segments[index:]
+                if status == DRIVING
+            )
+    return HOSPlan(
+        segments=tuple(segments),
+        driving_hours=float(driving_hours),
+        cycle_used=cycle_used,
+        cycle_hours=cycle_hours,
+    )
+
+
+def plan_trip_hos(trip) -> HOSPlan:
+    driver = trip.driver
+    return plan_hos(
+        (
+            trip.estimated_duration.total_seconds() / 3600
+            if trip.estimated_duration
+            else 0
+        ),
+        cycle_used=driver.current_cycle_used,
+        cycle_hours=cycle_limit(
+            driver.carrier.hos_cycle_choice if driver.carrier else "60"
+        ),
+    )
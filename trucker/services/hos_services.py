@@ -1,76 +1,63 @@
-from datetime import timedelta
-from django.core.exceptions import ValidationError
+import hashlib
+import json
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
-def generate_hos_logs(trip):
-    driver = trip.driver
-    cycle_hours = 70 if driver.carrier.hos_cycle_choice == "70" else 60
-    remaining_hours = max(cycle_hours - driver.current_cycle_used, 0)
-
-    logs = []
-    current_time = trip.start_time
-    total_driving = 0
-    duty_window_start = current_time
-    break_accumulator = 0
-
-    while total_driving < trip.estimated_duration.total_seconds() / 3600:
-        if remaining_hours <= 0:
-            raise ValidationError("Driver exceeds cycle hours - requires 34hr restart")
+from trucker.services.hos_planner import plan_trip_hos
 
-        if (current_time - duty_window_start).total_seconds() / 3600 >= 14:
-            current_time = duty_window_start + timedelta(hours=14)
-            logs.append(create_off_duty_log(current_time, 10))
-            duty_window_start = current_time + timedelta(hours=10)
-            current_time = duty_window_start
-            continue
+# Bump when the planner's output changes so stored plans are rebuilt.
+PLAN_VERSION = 2
 
-        max_drive_segment = min(
-            11 - (driver.current_cycle_used % 11),
-            remaining_hours,
-            trip.estimated_duration.total_seconds() / 3600 - total_driving,
-            14 - (current_time - duty_window_start).total_seconds() / 3600,
-        )
 
-        drive_end = current_time + timedelta(hours=max_drive_segment)
-        logs.append(
-            {
-                "log_entry": trip.log_entry,
-                "status": "D",
-                "start_time": current_time,
-                "end_time": drive_end,
-                "location_name": "En route",
-            }
-        )
-
-        total_driving += max_drive_segment
-        driver.current_cycle_used += max_drive_segment
-        remaining_hours -= max_drive_segment
-        current_time = drive_end
-        break_accumulator += max_drive_segment
+def generate_hos_logs(trip):
+    start_time = trip.start_time or timezone.now()
+    return plan_trip_hos(trip).to_logs(start_time)
 
-        if break_accumulator >= 8:
-            break_time = current_time + timedelta(minutes=30)
-            logs.append(
-                {
-                    "log_entry": trip.log_entry,
-                    "status": "OFF",
-                    "start_time": current_time,
-                    "end_time": break_time,
-                    "location_name": "Rest break",
-                }
-            )
-            current_time = break_time
-            break_accumulator = 0
 
-    driver.save()
+def plan_inputs_hash(trip) -> str:
+    """Hash of everything the trip's HOS plan depends on, driver cycle state included."""
+    driver = trip.driver
+    inputs = [
+        PLAN_VERSION,
+        trip.distance,
+        trip.estimated_duration,
+        trip.pickup_location,
+        trip.dropoff_location,
+        trip.start_time,
+        driver.current_cycle_used,
+        driver.last_34hr_restart,
+        driver.carrier.hos_cycle_choice if driver.carrier else None,
+    ]
+    return hashlib.sha256(
+        json.dumps(inputs, cls=DjangoJSONEncoder).encode()
+    ).hexdigest()
+
+
+def cached_hos_logs(trip):
+    """
+    The trip's HOS logs from its stored TripPlan, rebuilt only when the plan
+    inputs hash no longer matches. Times are ISO strings, as served.
+    """
+    from trucker.models import TripPlan
+
+    inputs_hash = plan_inputs_hash(trip)
+    plan = TripPlan.objects.filter(trip=trip).first()
+    if plan is not None and plan.inputs_hash == inputs_hash:
+        return plan.logs
+
+    logs = json.loads(json.dumps(generate_hos_logs(trip), cls=DjangoJSONEncoder))
+    TripPlan.objects.update_or_create(
+        trip=trip, defaults={"inputs_hash": inputs_hash, "logs": logs}
+    )
     return logs
 
 
-def create_off_duty_log(start_time, hours):
-    return {
-        "log_entry": None,  
-        "status": "OFF",
-        "start_time": start_time,
-        "end_time": start_time + timedelta(hours=hours),
-        "location_name": "Mandatory rest",
-    }
+def invalidate_trip_plans(driver_ids):
+    """Drop stored plans for the drivers' open trips after their duty history changes."""
+    from trucker.models import TripPlan
+
+    if driver_ids:
+        TripPlan.objects.filter(
+            trip__driver_id__in=driver_ids, trip__completed=False
+        ).delete()
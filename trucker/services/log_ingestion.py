@@ -0,0 +1,163 @@
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from trucker.services.cycle_services import (
+    apply_duty_deltas,
+    detect_restart,
+    duty_contribution,
+    record_restart,
+    refresh_cycle_rollup,
+    refresh_cycle_used,
+    status_deltas,
+)
+from trucker.services.hos_services import invalidate_trip_plans
+from trucker.validators import validate_duty_statuses
+
+
+@dataclass
+class IngestResult:
+    logs: list = field(default_factory=list)
+    statuses: int = 0
+    drivers: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.statuses / self.seconds if self.seconds > 0 else 0.0
+
+
+def build_log(entry: dict):
+    """
+    An unsaved LogEntry and its sorted, unsaved DutyStatus rows from one
+    ``entry`` (LogEntry fields plus a ``duty_statuses`` list), validated in
+    memory. Returns ``(log_entry, statuses, restarts)``.
+    """
+    from trucker.models import DutyStatus, LogEntry
+
+    entry = dict(entry)
+    statuses_data = entry.pop("duty_statuses", [])
+    # bulk_create skips DateField.pre_save, so the timezone.now default would
+    # be stored as a datetime.
+    log_date = entry.get("date") or timezone.localdate()
+    if isinstance(log_date, datetime):
+        log_date = timezone.localdate(log_date)
+    entry["date"] = log_date
+    log_entry = LogEntry(**entry)
+    log_entry.clean()
+    log_entry.total_miles = log_entry.end_odometer - log_entry.start_odometer
+
+    statuses = [DutyStatus(**data) for data in statuses_data]
+    for status in statuses:
+        status.clean_fields(exclude=["log_entry", "driver"])
+        status.clean_period()
+    statuses.sort(key=lambda s: s.start_time)
+    restarts = validate_duty_statuses(statuses, log_entry.adverse_conditions)
+    return log_entry, statuses, restarts
+
+
+def unknown_references(logs) -> Dict[str, List[str]]:
+    """Errors keyed by index for logs whose driver or vehicle does not exist."""
+    from trucker.models import Driver, Vehicle
+
+    drivers = set(
+        Driver.objects.filter(
+            pk__in={log_entry.driver_id for log_entry in logs}
+        ).values_list("pk", flat=True)
+    )
+    vehicles = set(
+        Vehicle.objects.filter(
+            pk__in={log_entry.vehicle_id for log_entry in logs}
+        ).values_list("pk", flat=True)
+    )
+    errors = {}
+    for index, log_entry in enumerate(logs):
+        messages = []
+        if log_entry.driver_id not in drivers:
+            messages.append(f"Unknown driver {log_entry.driver_id}.")
+        if log_entry.vehicle_id not in vehicles:
+            messages.append(f"Unknown vehicle {log_entry.vehicle_id}.")
+        if messages:
+            errors[str(index)] = messages
+    return errors
+
+
+def ingest_logs(entries: Iterable[dict], batch_size: int = 1000) -> IngestResult:
+    """
+    Validate every entry in memory, write all logs and duty statuses with
+    ``bulk_create`` in one transaction and bring each driver's daily totals,
+    cycle rollup, restart and cycle hours up to date once at the end.
+
+    ``bulk_create`` sends no post_save signals, so nothing is recomputed per
+    status. Raises ValidationError keyed by entry index if any entry is
+    invalid or names an unknown driver or vehicle; nothing is written in
+    that case.
+    """
+    from trucker.models import Driver, DutyStatus, LogEntry
+
+    started = time.perf_counter()
+    built, errors = [], {}
+    for index, entry in enumerate(entries):
+        try:
+            built.append(build_log(entry))
+        except ValidationError as e:
+            errors[str(index)] = e.messages
+    if errors:
+        raise ValidationError(errors)
+
+    errors = unknown_references([log_entry for log_entry, _, _ in built])
+    if errors:
+        raise ValidationError(errors)
+
+    with transaction.atomic():
+        logs = LogEntry.objects.bulk_create(
+            [log_entry for log_entry, _, _ in built], batch_size=batch_size
+        )
+        statuses = []
+        for log_entry, log_statuses, _ in built:
+            for status in log_statuses:
+                status.log_entry = log_entry
+                status.driver_id = log_entry.driver_id
+            statuses.extend(log_statuses)
+        DutyStatus.objects.bulk_create(statuses, batch_size=batch_size)
+
+        restarts: Dict[int, List] = defaultdict(list)
+        for log_entry, _, log_restarts in built:
+            restarts[log_entry.driver_id].extend(log_restarts)
+        deltas = status_deltas(
+            (
+                None,
+                duty_contribution(
+                    status.driver_id,
+                    status.status,
+                    status.start_time,
+                    status.end_time,
+                ),
+            )
+            for status in statuses
+        )
+        apply_duty_deltas(deltas)
+        invalidate_trip_plans({driver_id for driver_id, _ in deltas})
+
+        drivers = Driver.objects.select_related("carrier").filter(pk__in=restarts)
+        for driver in drivers:
+            if restarts[driver.pk]:
+                record_restart(driver, max(restarts[driver.pk]))
+            detect_restart(driver)
+            refresh_cycle_used(driver)
+            refresh_cycle_rollup(
+                driver, {day for driver_id, day in deltas if driver_id == driver.pk}
+            )
+
+    return IngestResult(
+        logs=logs,
+        statuses=len(statuses),
+        drivers=len(restarts),
+        seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from trucker.services.rate_limit import maps_scheduler
+
+MAPS_BASE_URL = "https://maps.googleapis.com/maps/api"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _client_setting(name, default):
+    return getattr(settings, "MAPS_CLIENT", {}).get(name, default)
+
+
+class SessionTransport:
+    """
+    Keep-alive transport backed by a single connection-pooled requests.Session.
+
+    Only connection failures are retried here; 429 and 5xx responses are
+    retried by ``MapsClient`` so every attempt takes a rate limit token.
+    """
+
+    def __init__(self, pool_size=None, retries=None, backoff_factor=None):
+        pool_size = pool_size or _client_setting("POOL_SIZE", 20)
+        retry = Retry(
+            total=_client_setting("RETRIES", 3) if retries is None else retries,
+            backoff_factor=(
+                _client_setting("BACKOFF_FACTOR", 0.5)
+                if backoff_factor is None
+                else backoff_factor
+            ),
+            status=0,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, params=None, timeout=None):
+        return self.session.get(url, params=params, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class RecordedResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FixtureTransport:
+    """
+    Serves recorded JSON responses from ``directory``.
+
+    A fixture named ``<endpoint>-<params digest>.json`` is preferred, falling back
+    to ``<endpoint>.json``. When ``record_with`` is given, misses are fetched with
+    that transport and written back so later runs replay them offline.
+    """
+
+    def __init__(self, directory=None, record_with=None):
+        self.directory = Path(directory or _client_setting("FIXTURES_DIR", "fixtures"))
+        self.record_with = record_with
+
+    @staticmethod
+    def fixture_names(url, params):
+        endpoint = url.rstrip("/").split("/")[-2]
+        stable = {k: v for k, v in sorted((params or {}).items()) if k != "key"}
+        digest = hashlib.sha1(json.dumps(stable, default=str).encode()).hexdigest()
+        return f"{endpoint}-{digest[:12]}.json", f"{endpoint}.json"
+
+    def get(self, url, params=None, timeout=None):
+        exact, generic = self.fixture_names(url, params)
+        for name in (exact, generic):
+            path = self.directory / name
+            if path.exists():
+                return RecordedResponse(json.loads(path.read_text()))
+
+        if self.record_with is None:
+            raise FileNotFoundError(f"No recorded Maps fixture for {exact}")
+
+        response = self.record_with.get(url, params=params, timeout=timeout)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / exact).write_text(json.dumps(response.json(), indent=2))
+        return response
+
+    def close(self):
+        pass
+
+
+class MapsClient:
+    def __init__(self, transport=None, timeout=None):
+        self.transport = transport or build_transport()
+        self.timeout = timeout or _client_setting("TIMEOUT", (3.05, 10))
+        self.retries = _client_setting("RETRIES", 3)
+        self.backoff_factor = _client_setting("BACKOFF_FACTOR", 0.5)
+
+    def get(self, endpoint: str, params: dict, priority=None):
+        params = dict(params)
+        params.setdefault("key", settings.MAPS_API_KEY)
+        url = f"{MAPS_BASE_URL}/{endpoint}/json"
+
+        for attempt in range(self.retries + 1):
+            maps_scheduler.acquire(endpoint, priority)
+            response = self.transport.get(url, params=params, timeout=self.timeout)
+            if response.status_code == 429:
+                maps_scheduler.penalize(endpoint)
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                return response
+            time.sleep(self.backoff_factor * (2**attempt))
+
+    def close(self):
+        self.transport.close()
+
+
+def build_transport():
+    transport_path = _client_setting(
+        "TRANSPORT", "trucker.services.maps_client.SessionTransport"
+    )
+    return import_string(transport_path)()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_maps_client() -> MapsClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MapsClient()
+    return _client
+
+
+def set_transport(transport) -> MapsClient:
+    """Swap the transport used by the shared client, e.g. for recorded fixtures."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = MapsClient(transport=transport) if transport else None
+    return _client
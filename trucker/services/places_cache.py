@@ -0,0 +1,137 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def _cache_setting(name, default):
+    return getattr(settings, "PLACES_CACHE", {}).get(name, default)
+
+
+def geohash_encode(lat: float, lng: float, precision: int = None) -> str:
+    precision = precision or _cache_setting("PRECISION", 5)
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    cell, bits, bit_count, even = [], 0, 0, True
+
+    while len(cell) < precision:
+        value, bounds = (lng, lng_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            cell.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(cell)
+
+
+def geohash_center(cell: str) -> dict:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lng_range if even else lat_range
+            middle = (bounds[0] + bounds[1]) / 2
+            if (bits >> shift) & 1:
+                bounds[0] = middle
+            else:
+                bounds[1] = middle
+            even = not even
+    return {
+        "lat": (lat_range[0] + lat_range[1]) / 2,
+        "lng": (lng_range[0] + lng_range[1]) / 2,
+    }
+
+
+class PlacesLookupStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hit_ratio}
+
+
+class PlacesCache:
+    """Nearby Search results cached per geohash cell and place type."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.totals = PlacesLookupStats()
+
+    def get_many(self, keys) -> dict:
+        from trucker.models import PlaceCache
+
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        rows = PlaceCache.objects.filter(
+            cell__in={cell for cell, _ in keys},
+            place_type__in={place_type for _, place_type in keys},
+            expires_at__gt=timezone.now(),
+        ).values_list("cell", "place_type", "results")
+        return {
+            (cell, place_type): results
+            for cell, place_type, results in rows
+            if (cell, place_type) in keys
+        }
+
+    def set_many(self, entries: dict):
+        from trucker.models import PlaceCache
+
+        if not entries:
+            return
+
+        now = timezone.now()
+        expires_at = now + _cache_setting("TTL", timezone.timedelta(days=30))
+        PlaceCache.objects.bulk_create(
+            [
+                PlaceCache(
+                    cell=cell,
+                    place_type=place_type,
+                    results=results,
+                    fetched_at=now,
+                    expires_at=expires_at,
+                )
+                for (cell, place_type), results in entries.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["cell", "place_type"],
+            update_fields=["results", "fetched_at", "expires_at"],
+        )
+        self.purge_expired()
+
+    def record(self, stats: PlacesLookupStats):
+        with self._lock:
+            self.totals.hits += stats.hits
+            self.totals.misses += stats.misses
+        logger.info(
+            f"Places lookup: {stats.hits} cached, {stats.misses} fetched "
+            f"(hit ratio {stats.hit_ratio:.0%})"
+        )
+
+    def purge_expired(self) -> int:
+        from trucker.models import PlaceCache
+
+        deleted, _ = PlaceCache.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+places_cache = PlacesCache()
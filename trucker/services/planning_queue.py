@@ -0,0 +1,136 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from trucker.models import PlanningJob, Trip
+from trucker.services.rate_limit import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF_SECONDS = 30
+STALE_JOB_ERROR = "Planning worker stopped before finishing the job"
+
+
+def enqueue_trip_planning(trip: Trip) -> PlanningJob:
+    Trip.objects.filter(pk=trip.pk).update(
+        planning_status=Trip.PlanningStatus.PENDING, planning_error=""
+    )
+    trip.planning_status = Trip.PlanningStatus.PENDING
+
+    job = PlanningJob.objects.filter(
+        trip=trip, status=PlanningJob.Status.QUEUED
+    ).first()
+    if job is None:
+        job = PlanningJob.objects.create(trip=trip)
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """
+    Requeue jobs left RUNNING longer than TRIP_PLANNING_VISIBILITY_TIMEOUT by
+    a worker that died, or fail them once they are out of attempts.
+    """
+    now = timezone.now()
+    stale = PlanningJob.objects.filter(
+        status=PlanningJob.Status.RUNNING,
+        started_at__lt=now - settings.TRIP_PLANNING_VISIBILITY_TIMEOUT,
+    )
+    with transaction.atomic():
+        jobs = list(
+            stale.select_for_update(skip_locked=True).values_list(
+                "pk", "trip_id", "attempts"
+            )
+        )
+        for retry, status, planning_status in (
+            (True, PlanningJob.Status.QUEUED, Trip.PlanningStatus.PENDING),
+            (False, PlanningJob.Status.FAILED, Trip.PlanningStatus.FAILED),
+        ):
+            selected = [
+                (pk, trip_id)
+                for pk, trip_id, attempts in jobs
+                if (attempts < settings.TRIP_PLANNING_MAX_ATTEMPTS) == retry
+            ]
+            if not selected:
+                continue
+            job_ids, trip_ids = zip(*selected)
+            PlanningJob.objects.filter(pk__in=job_ids).update(
+                status=status,
+                last_error=STALE_JOB_ERROR,
+                run_after=now,
+                finished_at=None if retry else now,
+            )
+            Trip.objects.filter(pk__in=trip_ids).update(
+                planning_status=planning_status, planning_error=STALE_JOB_ERROR
+            )
+    return len(jobs)
+
+
+def claim_next_job():
+    requeue_stale_jobs()
+    with transaction.atomic():
+        job = (
+            PlanningJob.objects.select_for_update(skip_locked=True)
+            .filter(status=PlanningJob.Status.QUEUED, run_after__lte=timezone.now())
+            .order_by("run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = PlanningJob.Status.RUNNING
+        job.attempts += 1
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "attempts", "started_at"])
+        Trip.objects.filter(pk=job.trip_id).update(
+            planning_status=Trip.PlanningStatus.PLANNING
+        )
+    return job
+
+
+def run_job(job: PlanningJob) -> bool:
+    trip = Trip.objects.select_related("driver").get(pk=job.trip_id)
+    try:
+        with request_priority(Priority.BATCH):
+            trip.calculate_route_details()
+            Trip.objects.filter(pk=trip.pk).update(
+                distance=trip.distance, estimated_duration=trip.estimated_duration
+            )
+            trip.generate_stops()
+    except Exception as e:
+        logger.error(f"Planning job {job.pk} for trip {trip.pk} failed: {str(e)}")
+        retry = job.attempts < settings.TRIP_PLANNING_MAX_ATTEMPTS
+        job.status = PlanningJob.Status.QUEUED if retry else PlanningJob.Status.FAILED
+        job.last_error = str(e)
+        job.run_after = timezone.now() + timezone.timedelta(
+            seconds=RETRY_BACKOFF_SECONDS * job.attempts
+        )
+        job.finished_at = None if retry else timezone.now()
+        job.save(update_fields=["status", "last_error", "run_after", "finished_at"])
+        Trip.objects.filter(pk=trip.pk).update(
+            planning_status=(
+                Trip.PlanningStatus.PENDING if retry else Trip.PlanningStatus.FAILED
+            ),
+            planning_error=str(e),
+        )
+        return False
+
+    job.status = PlanningJob.Status.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at"])
+    Trip.objects.filter(pk=trip.pk).update(
+        planning_status=Trip.PlanningStatus.READY, planning_error=""
+    )
+    return True
+
+
+def run_pending_jobs(max_jobs=None) -> int:
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -0,0 +1,232 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+
+from django.conf import settings
+
+from trucker.exceptions import RouteServiceError
+
+logger = logging.getLogger(__name__)
+
+ASYNC_POLL_SECONDS = 0.05
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 10
+
+
+_current_priority = contextvars.ContextVar(
+    "maps_request_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Run the enclosed Maps calls at ``priority`` (e.g. batch re-plans)."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+def _endpoint_limits(endpoint: str) -> dict:
+    limits = getattr(settings, "MAPS_RATE_LIMITS", {})
+    return limits.get(endpoint, limits.get("default", {"RATE": 50, "BURST": 50}))
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def delay(self) -> float:
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def penalize(self, seconds: float):
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.queued = 0
+        self.throttled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.by_priority = {}
+
+    def record(self, priority: Priority, waited: float, queued: bool):
+        self.requests += 1
+        self.queued += queued
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        name = priority.name.lower()
+        self.by_priority[name] = self.by_priority.get(name, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "avg_wait_ms": (
+                round(1000 * self.wait_total / self.requests, 2)
+                if self.requests
+                else 0.0
+            ),
+            "max_wait_ms": round(1000 * self.wait_max, 2),
+            "by_priority": dict(self.by_priority),
+        }
+
+
+class _Endpoint:
+    def __init__(self, limits: dict):
+        self.bucket = TokenBucket(limits["RATE"], limits.get("BURST", limits["RATE"]))
+        self.waiters = []
+        self.stats = EndpointStats()
+
+
+class RequestScheduler:
+    """
+    Process-wide token buckets for outbound Maps calls, one per endpoint.
+
+    Callers queue by priority, then arrival order; the head of the queue takes
+    the next token as soon as the bucket refills, so throughput stays at the
+    quota without requests being dropped.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._endpoints = {}
+        self._sequence = itertools.count()
+
+    def _endpoint(self, endpoint: str) -> _Endpoint:
+        if endpoint not in self._endpoints:
+            self._endpoints[endpoint] = _Endpoint(_endpoint_limits(endpoint))
+        return self._endpoints[endpoint]
+
+    def _enqueue(self, endpoint: str, priority: Priority):
+        with self._condition:
+            ticket = (int(priority), next(self._sequence))
+            heapq.heappush(self._endpoint(endpoint).waiters, ticket)
+        return ticket
+
+    def _try_take(self, endpoint: str, ticket) -> float:
+        """Take a token for ``ticket`` if it is at the head; else return the wait."""
+        state = self._endpoints[endpoint]
+        state.bucket.refill(time.monotonic())
+        if state.waiters[0] != ticket:
+            return state.bucket.delay() or ASYNC_POLL_SECONDS
+        delay = state.bucket.delay()
+        if delay == 0:
+            state.bucket.tokens -= 1
+            heapq.heappop(state.waiters)
+            self._condition.notify_all()
+        return delay
+
+    def _abandon(self, endpoint: str, ticket):
+        state = self._endpoints[endpoint]
+        if ticket in state.waiters:
+            state.waiters.remove(ticket)
+            heapq.heapify(state.waiters)
+            self._condition.notify_all()
+
+    def _finish(self, endpoint, priority, started_at, queued) -> float:
+        waited = time.monotonic() - started_at if queued else 0.0
+        self._endpoints[endpoint].stats.record(priority, waited, queued)
+        if waited > 1:
+            logger.info(f"Maps {endpoint} request waited {waited:.2f}s for quota")
+        return waited
+
+    def _deadline(self, started_at: float) -> float:
+        limits = getattr(settings, "MAPS_RATE_LIMITS", {})
+        return started_at + limits.get("MAX_WAIT", 60)
+
+    def acquire(self, endpoint: str, priority: Priority = None) -> float:
+        """Block until ``endpoint`` has quota; returns the seconds spent queued."""
+        priority = current_priority() if priority is None else priority
+        started_at = time.monotonic()
+        deadline = self._deadline(started_at)
+        ticket = self._enqueue(endpoint, priority)
+        queued = False
+
+        with self._condition:
+            while True:
+                delay = self._try_take(endpoint, ticket)
+                if delay == 0:
+                    return self._finish(endpoint, priority, started_at, queued)
+                if time.monotonic() + delay > deadline:
+                    self._abandon(endpoint, ticket)
+                    raise RouteServiceError(
+                        f"Timed out waiting for {endpoint} rate limit quota"
+                    )
+                queued = True
+                self._condition.wait(delay)
+
+    async def acquire_async(self, endpoint: str, priority: Priority = None) -> float:
+        priority = current_priority() if priority is None else priority
+        started_at = time.monotonic()
+        deadline = self._deadline(started_at)
+        ticket = self._enqueue(endpoint, priority)
+        queued = False
+
+        try:
+            while True:
+                with self._condition:
+                    delay = self._try_take(endpoint, ticket)
+                    if delay == 0:
+                        return self._finish(endpoint, priority, started_at, queued)
+                if time.monotonic() + delay > deadline:
+                    raise RouteServiceError(
+                        f"Timed out waiting for {endpoint} rate limit quota"
+                    )
+                queued = True
+                await asyncio.sleep(min(delay, ASYNC_POLL_SECONDS))
+        except BaseException:
+            with self._condition:
+                self._abandon(endpoint, ticket)
+            raise
+
+    def penalize(self, endpoint: str, seconds: float = None):
+        """Back off ``endpoint`` after the provider reports it is over quota."""
+        if seconds is None:
+            limits = getattr(settings, "MAPS_RATE_LIMITS", {})
+            seconds = limits.get("PENALTY_SECONDS", 1.0)
+        with self._condition:
+            state = self._endpoint(endpoint)
+            state.bucket.refill(time.monotonic())
+            state.bucket.penalize(seconds)
+            state.stats.throttled += 1
+        logger.warning(f"Maps {endpoint} over quota, backing off {seconds:.1f}s")
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                endpoint: {**state.stats.as_dict(), "queue_depth": len(state.waiters)}
+                for endpoint, state in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._condition:
+            self._endpoints.clear()
+
+
+maps_scheduler = RequestScheduler()
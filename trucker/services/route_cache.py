@@ -0,0 +1,233 @@
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+def _cache_setting(name, default):
+    return getattr(settings, "ROUTE_CACHE", {}).get(name, default)
+
+
+def normalize_location(location: str) -> str:
+    location = " ".join(str(location).lower().split())
+    return re.sub(r"\s*,\s*", ", ", location).strip(" ,")
+
+
+def make_key(origin: str, destination: str, mode: str = "driving") -> tuple:
+    return normalize_location(origin), normalize_location(destination), mode.lower()
+
+
+def _row_value(row):
+    from trucker.services.route_services import RouteResult
+
+    return RouteResult(
+        distance_meters=row.distance_meters,
+        duration_seconds=row.duration_seconds,
+        polyline=row.polyline,
+        legs=row.legs,
+    )
+
+
+class RouteCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def record(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "hits": hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RouteCache:
+    """Two-tier route cache: an in-process LRU in front of the RouteCache table."""
+
+    def __init__(self, max_memory_entries=None):
+        self.max_memory_entries = max_memory_entries or _cache_setting(
+            "MEMORY_MAX_ENTRIES", 1024
+        )
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = RouteCacheStats()
+
+    def get(self, origin: str, destination: str, mode: str = "driving"):
+        key = make_key(origin, destination, mode)
+        now = timezone.now()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats.record("memory_hits")
+                    return value
+                del self._memory[key]
+
+        from trucker.models import RouteCache as RouteCacheEntry
+
+        row = RouteCacheEntry.objects.filter(
+            origin=key[0], destination=key[1], mode=key[2], expires_at__gt=now
+        ).first()
+        if row is None:
+            self.stats.record("misses")
+            return None
+
+        RouteCacheEntry.objects.filter(pk=row.pk).update(
+            hits=F("hits") + 1, last_used_at=now
+        )
+        value = _row_value(row)
+        self._remember(key, value, row.expires_at)
+        self.stats.record("db_hits")
+        return value
+
+    def get_many(self, pairs, mode: str = "driving") -> list:
+        from trucker.models import RouteCache as RouteCacheEntry
+
+        keys = [make_key(origin, destination, mode) for origin, destination in pairs]
+        now = timezone.now()
+        results = [None] * len(keys)
+        pending = {}
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                entry = self._memory.get(key)
+                if entry is not None and entry[1] > now:
+                    self._memory.move_to_end(key)
+                    results[index] = entry[0]
+                    self.stats.record("memory_hits")
+                else:
+                    pending.setdefault(key, []).append(index)
+
+        if not pending:
+            return results
+
+        rows = RouteCacheEntry.objects.filter(
+            origin__in={key[0] for key in pending},
+            destination__in={key[1] for key in pending},
+            mode=mode.lower(),
+            expires_at__gt=now,
+        )
+
+        found = []
+        for row in rows:
+            key = (row.origin, row.destination, row.mode)
+            if key not in pending:
+                continue
+            value = _row_value(row)
+            self._remember(key, value, row.expires_at)
+            found.append(row.pk)
+            for index in pending.pop(key):
+                results[index] = value
+                self.stats.record("db_hits")
+
+        if found:
+            RouteCacheEntry.objects.filter(pk__in=found).update(
+                hits=F("hits") + 1, last_used_at=now
+            )
+        for indices in pending.values():
+            for _ in indices:
+                self.stats.record("misses")
+        return results
+
+    def set(self, origin: str, destination: str, mode: str, value):
+        self.set_many([(origin, destination, value)], mode)
+
+    def set_many(self, entries, mode: str = "driving"):
+        """Store ``(origin, destination, RouteResult)`` entries in one upsert."""
+        from trucker.models import RouteCache as RouteCacheEntry
+
+        now = timezone.now()
+        expires_at = now + _cache_setting("TTL", timezone.timedelta(days=7))
+        rows = {}
+        for origin, destination, value in entries:
+            key = make_key(origin, destination, mode)
+            rows[key] = RouteCacheEntry(
+                origin=key[0],
+                destination=key[1],
+                mode=key[2],
+                distance_meters=value.distance_meters,
+                duration_seconds=value.duration_seconds,
+                polyline=value.polyline,
+                legs=value.legs,
+                expires_at=expires_at,
+                last_used_at=now,
+            )
+            self._remember(key, value, expires_at)
+        if not rows:
+            return
+
+        RouteCacheEntry.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=["origin", "destination", "mode"],
+            update_fields=[
+                "distance_meters",
+                "duration_seconds",
+                "polyline",
+                "legs",
+                "expires_at",
+                "last_used_at",
+            ],
+        )
+
+        # Eviction scans the table, so only run it every EVICT_EVERY rows written.
+        with self._lock:
+            self._writes += len(rows)
+            due = self._writes >= _cache_setting("EVICT_EVERY", 500)
+            if due:
+                self._writes = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        from trucker.models import RouteCache as RouteCacheEntry
+
+        RouteCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        max_entries = _cache_setting("DB_MAX_ENTRIES", 50000)
+        overflow = RouteCacheEntry.objects.count() - max_entries
+        if overflow > 0:
+            stale = RouteCacheEntry.objects.order_by("last_used_at").values_list(
+                "pk", flat=True
+            )[:overflow]
+            RouteCacheEntry.objects.filter(pk__in=list(stale)).delete()
+
+    def clear(self, persistent: bool = False):
+        with self._lock:
+            self._memory.clear()
+            self._writes = 0
+        self.stats.reset()
+        if persistent:
+            from trucker.models import RouteCache as RouteCacheEntry
+
+            RouteCacheEntry.objects.all().delete()
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+
+route_cache = RouteCache()
@@ -0,0 +1,103 @@
+from typing import Dict, List
+
+import numpy as np
+import polyline
+
+EARTH_RADIUS_MILES = 3958.7613
+METERS_TO_MILES = 1 / 1609.344
+
+
+def haversine_miles(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    lat1, lng1 = np.radians(start[:, 0]), np.radians(start[:, 1])
+    lat2, lng2 = np.radians(end[:, 0]), np.radians(end[:, 1])
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+class RouteGeometry:
+    """
+    Decoded route polyline with a cumulative along-route distance index, so any
+    mile marker can be located with a vectorized searchsorted and interpolated
+    between the two bracketing points.
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        total_miles: float = None,
+        total_hours: float = None,
+        steps: List[Dict] = None,
+    ):
+        if len(points) < 2:
+            raise ValueError("A route geometry needs at least two points")
+
+        self.points = np.asarray(points, dtype=np.float64)
+        self.segment_miles = haversine_miles(self.points[:-1], self.points[1:])
+        cumulative = np.concatenate(([0.0], np.cumsum(self.segment_miles)))
+        if total_miles and cumulative[-1] > 0:
+            scale = total_miles / cumulative[-1]
+            cumulative *= scale
+            self.segment_miles *= scale
+        self.cumulative_miles = cumulative
+
+        if steps:
+            step_miles = (
+                np.array([s["distance"]["value"] for s in steps]) * METERS_TO_MILES
+            )
+            step_hours = np.array([s["duration"]["value"] for s in steps]) / 3600
+            self._time_miles = np.concatenate(([0.0], np.cumsum(step_miles)))
+            self._time_hours = np.concatenate(([0.0], np.cumsum(step_hours)))
+        else:
+            self._time_miles = np.array([0.0, self.total_miles])
+            self._time_hours = np.array([0.0, total_hours or 0.0])
+
+    @classmethod
+    def from_route(cls, route) -> "RouteGeometry":
+        return cls(
+            np.array(polyline.decode(route.polyline)),
+            total_miles=route.distance_meters * METERS_TO_MILES,
+            total_hours=route.duration_hours,
+            steps=route.steps,
+        )
+
+    @property
+    def total_miles(self) -> float:
+        return float(self.cumulative_miles[-1])
+
+    def locate(self, miles) -> np.ndarray:
+        miles = np.clip(np.asarray(miles, dtype=np.float64), 0.0, self.total_miles)
+        index = np.searchsorted(self.cumulative_miles, miles, side="right") - 1
+        index = np.clip(index, 0, len(self.segment_miles) - 1)
+
+        segment = self.segment_miles[index]
+        fraction = np.divide(
+            miles - self.cumulative_miles[index],
+            segment,
+            out=np.zeros_like(miles),
+            where=segment > 0,
+        )
+        start, end = self.points[index], self.points[index + 1]
+        return start + (end - start) * fraction[:, None]
+
+    def hours_at(self, miles) -> np.ndarray:
+        return np.interp(miles, self._time_miles, self._time_hours)
+
+    def waypoints_every(self, interval_miles: float) -> List[Dict]:
+        num_stops = int(self.total_miles // interval_miles)
+        targets = interval_miles * np.arange(1, num_stops + 1, dtype=np.float64)
+        if not num_stops:
+            return []
+
+        locations = self.locate(targets)
+        hours = self.hours_at(targets)
+        return [
+            {
+                "lat": float(lat),
+                "lng": float(lng),
+                "estimated_time_hours": round(float(hour), 2),
+            }
+            for (lat, lng), hour in zip(locations, hours)
+        ]
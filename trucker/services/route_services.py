@@ -1,37 +1,216 @@
-import requests
-import re
-from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List
+
+from trucker.exceptions import RouteServiceError
+from trucker.services.maps_client import get_maps_client
+from trucker.services.rate_limit import maps_scheduler
+from trucker.services.route_cache import make_key, route_cache
+
+MAX_MATRIX_ELEMENTS = 100
+MAX_MATRIX_LOCATIONS = 25
+METERS_PER_MILE = 1609.344
+
+
+@dataclass(frozen=True)
+class RouteResult:
+    distance_meters: int
+    duration_seconds: int
+    polyline: str = ""
+    legs: List[Dict] = field(default_factory=list)
+
+    @property
+    def distance_miles(self) -> float:
+        return round(self.distance_meters / METERS_PER_MILE, 2)
+
+    @property
+    def duration(self) -> timedelta:
+        return timedelta(seconds=self.duration_seconds)
+
+    @property
+    def duration_hours(self) -> float:
+        return self.duration_seconds / 3600
+
+    @property
+    def steps(self) -> List[Dict]:
+        return [step for leg in self.legs for step in leg["steps"]]
+
+    @property
+    def is_detailed(self) -> bool:
+        return bool(self.legs)
+
+    @classmethod
+    def from_matrix_element(cls, element: Dict) -> "RouteResult":
+        return cls(
+            distance_meters=element["distance"]["value"],
+            duration_seconds=element["duration"]["value"],
+        )
+
+    @classmethod
+    def from_directions(cls, route: Dict) -> "RouteResult":
+        legs = [
+            {
+                "distance": leg["distance"]["value"],
+                "duration": leg["duration"]["value"],
+                "start_location": leg.get("start_location"),
+                "end_location": leg.get("end_location"),
+                "steps": [
+                    {
+                        "distance": {"value": step["distance"]["value"]},
+                        "duration": {"value": step["duration"]["value"]},
+                        "end_location": step["end_location"],
+                    }
+                    for step in leg["steps"]
+                ],
+            }
+            for leg in route["legs"]
+        ]
+        return cls(
+            distance_meters=sum(leg["distance"] for leg in legs),
+            duration_seconds=sum(leg["duration"] for leg in legs),
+            polyline=route.get("overview_polyline", {}).get("points", ""),
+            legs=legs,
+        )
+
+
+def _fetch_directions(origin, destination, mode, api_key=None) -> RouteResult:
+    params = {"origin": origin, "destination": destination, "mode": mode}
+    if api_key:
+        params["key"] = api_key
+
+    response = get_maps_client().get("directions", params)
+    data = response.json()
+    if data.get("status") == "OVER_QUERY_LIMIT":
+        maps_scheduler.penalize("directions")
+    if response.status_code != 200 or data.get("status") != "OK":
+        raise RouteServiceError(
+            data.get("error_message", "Failed to retrieve directions")
+        )
+    return RouteResult.from_directions(data["routes"][0])
+
+
+def get_route(
+    origin, destination, mode="driving", detailed=False, api_key=None
+) -> RouteResult:
+    """
+    Return the cached route for a lane, fetching it when missing. ``detailed``
+    routes come from Directions and carry the polyline and legs needed for stop
+    planning; plain lookups are served by Distance Matrix.
+    """
+    cached = route_cache.get(origin, destination, mode)
+    if cached is not None and (cached.is_detailed or not detailed):
+        return cached
+
+    if detailed:
+        result = _fetch_directions(origin, destination, mode, api_key)
+    else:
+        result = _fetch_matrix([(origin, destination)], mode).get((origin, destination))
+        if result is None:
+            raise RouteServiceError("Could not retrieve distance data.")
+
+    route_cache.set(origin, destination, mode, result)
+    return result
 
 
 def calculate_route_distance(pickup_location, dropoff_location, mode="driving"):
-    api_key = settings.MAPS_API_KEY
+    route = get_route(pickup_location, dropoff_location, mode)
+    return route.distance_miles, route.duration_hours
+
+
+def chunk_route_pairs(pairs):
+    """
+    Pack (origin, destination) pairs into matrix requests that stay within the
+    Distance Matrix limits of 25 origins, 25 destinations and 100 elements.
+    """
+    chunks = []
+    current, origins, destinations = [], set(), set()
+
+    for origin, destination in pairs:
+        next_origins = origins | {origin}
+        next_destinations = destinations | {destination}
+        fits = (
+            len(next_origins) <= MAX_MATRIX_LOCATIONS
+            and len(next_destinations) <= MAX_MATRIX_LOCATIONS
+            and len(next_origins) * len(next_destinations) <= MAX_MATRIX_ELEMENTS
+        )
+        if current and not fits:
+            chunks.append(current)
+            current, next_origins, next_destinations = [], {origin}, {destination}
+        current.append((origin, destination))
+        origins, destinations = next_origins, next_destinations
 
-    url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _fetch_matrix(pairs, mode):
+    origins = list(dict.fromkeys(origin for origin, _ in pairs))
+    destinations = list(dict.fromkeys(destination for _, destination in pairs))
     params = {
-        "origins": pickup_location,
-        "destinations": dropoff_location,
+        "origins": "|".join(origins),
+        "destinations": "|".join(destinations),
         "mode": mode,
-        "key": api_key,
     }
 
-    response = requests.get(url, params=params)
+    response = get_maps_client().get("distancematrix", params)
     data = response.json()
+    if data.get("status") == "OVER_QUERY_LIMIT":
+        maps_scheduler.penalize("distancematrix")
+    if response.status_code != 200 or data.get("status") != "OK":
+        raise RouteServiceError(
+            data.get("error_message", "Distance Matrix request failed")
+        )
 
-    if response.status_code == 200 and data["status"] == "OK":
-        try:
-            raw_distance = data["rows"][0]["elements"][0]["distance"]["text"]
-            distance = float(
-                re.sub(r"[^\d.]", "", raw_distance)
-            ) 
-
-            raw_duration = data["rows"][0]["elements"][0]["duration"]["text"]
-            duration_match = re.search(r"(\d+)", raw_duration) 
-            duration_hours = (
-                int(duration_match.group(1)) if duration_match else 0
-            ) 
-
-            return distance, duration_hours
-        except KeyError:
-            return "Error: Could not retrieve distance data."
-    else:
-        return f"Error: {data.get('error_message', 'Request failed')}"
+    results = {}
+    for origin, destination in pairs:
+        row = data["rows"][origins.index(origin)]
+        element = row["elements"][destinations.index(destination)]
+        if element.get("status", "OK") == "OK":
+            results[(origin, destination)] = RouteResult.from_matrix_element(element)
+    return results
+
+
+def calculate_route_distances(pairs, mode="driving", max_workers=4):
+    """
+    Batch counterpart of calculate_route_distance.
+
+    Returns RouteResult objects in the order of ``pairs``, with ``None`` for
+    pairs the provider could not route.
+    """
+    pairs = list(pairs)
+    results = route_cache.get_many(pairs, mode)
+
+    missing = {}
+    for index, (origin, destination) in enumerate(pairs):
+        if results[index] is None:
+            key = make_key(origin, destination, mode)
+            missing.setdefault(key, ((origin, destination), []))[1].append(index)
+
+    chunks = chunk_route_pairs(pair for pair, _ in missing.values())
+    if not chunks:
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        fetched = {}
+        for chunk_results in executor.map(
+            lambda chunk: copy_context().run(_fetch_matrix, chunk, mode), chunks
+        ):
+            fetched.update(chunk_results)
+
+    for pair, indices in missing.values():
+        value = fetched.get(pair)
+        for index in indices:
+            results[index] = value
+
+    route_cache.set_many(
+        [
+            (origin, destination, value)
+            for (origin, destination), value in fetched.items()
+        ],
+        mode,
+    )
+
+    return results
@@ -1,25 +1,28 @@
-import requests
 from typing import List, Dict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
 from datetime import datetime, timedelta
+from functools import cached_property
+
+from trucker.exceptions import MapsQuotaExceeded, RouteServiceError
+from trucker.services.maps_client import get_maps_client
+from trucker.services.places_cache import (
+    PlacesLookupStats,
+    geohash_center,
+    geohash_encode,
+    places_cache,
+)
+from trucker.services.rate_limit import maps_scheduler
+from trucker.services.route_geometry import RouteGeometry
+from trucker.services.route_services import get_route
 
 METERS_TO_MILES = 1 / 1609.34
 SECONDS_TO_HOURS = 1 / 3600
+PLACES_QUOTA_RETRIES = 3
 
 
 def get_route_steps(api_key: str, origin: str, destination: str) -> List[Dict]:
-    directions_url = "https://maps.googleapis.com/maps/api/directions/json"
-    params = {
-        "origin": origin,
-        "destination": destination,
-        "mode": "driving",
-        "key": api_key,
-    }
-    response = requests.get(directions_url, params=params)
-    data = response.json()
-    if response.status_code != 200 or data.get("status") != "OK":
-        raise Exception(data.get("error_message", "Failed to retrieve directions"))
-    return data["routes"][0]["legs"][0]["steps"]
+    return get_route(origin, destination, detailed=True, api_key=api_key).steps
 
 
 def collect_stops_by_interval(steps: List[Dict], interval_miles: int) -> List[Dict]:
@@ -61,60 +64,165 @@ def query_places(
     radius: int = 5000,
     max_results: int = 3,
 ) -> List[Dict]:
-    places_url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
     params = {
         "location": f"{waypoint['lat']},{waypoint['lng']}",
         "radius": radius,
         "type": place_type,
         "key": api_key,
     }
-    response = requests.get(places_url, params=params)
-    data = response.json()
-    if data.get("status") == "OK":
+    for attempt in range(PLACES_QUOTA_RETRIES + 1):
+        response = get_maps_client().get("place/nearbysearch", params)
+        try:
+            return parse_places_response(response.json(), max_results)
+        except MapsQuotaExceeded:
+            maps_scheduler.penalize("place/nearbysearch")
+            if attempt == PLACES_QUOTA_RETRIES:
+                raise
+
+
+def parse_places_response(data: Dict, max_results: int = 3) -> List[Dict]:
+    status = data.get("status")
+    if status == "OK":
         return data.get("results", [])[:max_results]
-    return []
+    if status == "ZERO_RESULTS":
+        return []
+    if status == "OVER_QUERY_LIMIT":
+        raise MapsQuotaExceeded(data.get("error_message", "Places quota exceeded"))
+    raise RouteServiceError(
+        data.get("error_message", f"Places request failed with status {status}")
+    )
 
 
-def get_stops_concurrently(
-    api_key: str,
-    origin: str,
-    destination: str,
-    interval_miles: int,
-    place_type: str,
-    departure_time: datetime = None,
-) -> List[Dict]:
-    steps = get_route_steps(api_key, origin, destination)
-    waypoints = collect_stops_by_interval(steps, interval_miles)
-
-    if departure_time is None:
-        departure_time = datetime.now()
-
-    stops_by_waypoint = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_waypoint = {
-            executor.submit(query_places, api_key, waypoint, place_type): waypoint
-            for waypoint in waypoints
-        }
-        for future in as_completed(future_to_waypoint):
-            waypoint = future_to_waypoint[future]
-            try:
-                raw_stops = future.result()
-            except Exception as exc:
-                raw_stops = []
-                print(f"Waypoint {waypoint} generated an exception: {exc}")
+def store_fetched_places(fetched: Dict, failures: Dict):
+    """
+    Cache the lookups that succeeded, then fail the plan if any did not, so a
+    retry re-queries only the missing cells instead of planning without stops.
+    """
+    places_cache.set_many(fetched)
+    if failures:
+        (cell, place_type), error = next(iter(failures.items()))
+        raise RouteServiceError(
+            f"{len(failures)} places lookup(s) failed, "
+            f"first {place_type} in cell {cell}: {error}"
+        )
+
+
+class RoutePlan:
+    """Directions for one origin/destination, fetched once and shared by every stop type."""
+
+    def __init__(self, api_key: str, origin: str, destination: str, route=None):
+        self.api_key = api_key
+        self.origin = origin
+        self.destination = destination
+        self.route = route or get_route(
+            origin, destination, detailed=True, api_key=api_key
+        )
+        self.steps = self.route.steps
+        self.places_stats = PlacesLookupStats()
+        self._waypoints = {}
+
+    @cached_property
+    def geometry(self):
+        if not self.route.polyline:
+            return None
+        return RouteGeometry.from_route(self.route)
+
+    def waypoints(self, interval_miles: int) -> List[Dict]:
+        if interval_miles not in self._waypoints:
+            if self.geometry is not None:
+                waypoints = self.geometry.waypoints_every(interval_miles)
+            else:
+                waypoints = collect_stops_by_interval(self.steps, interval_miles)
+            self._waypoints[interval_miles] = waypoints
+        return self._waypoints[interval_miles]
+
+    def find_stops(
+        self,
+        intervals: Dict[str, int],
+        departure_time: datetime = None,
+        max_workers: int = 10,
+    ) -> Dict[str, List[Dict]]:
+        """Query places for every ``place_type: interval_miles`` pair in one batch."""
+        jobs = self.place_jobs(intervals)
+        places = places_cache.get_many({(cell, pt) for cell, pt, _ in jobs})
+        cold = {(cell, pt) for cell, pt, _ in jobs} - places.keys()
+
+        fetched, failures = {}, {}
+        if cold:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(cold))
+            ) as executor:
+                future_to_key = {
+                    executor.submit(
+                        copy_context().run,
+                        query_places,
+                        self.api_key,
+                        geohash_center(cell),
+                        place_type,
+                    ): (cell, place_type)
+                    for cell, place_type in cold
+                }
+                for future in as_completed(future_to_key):
+                    key = future_to_key[future]
+                    try:
+                        fetched[key] = future.result()
+                    except Exception as exc:
+                        failures[key] = exc
+            store_fetched_places(fetched, failures)
+
+        return self.assemble_stops(intervals, jobs, places, fetched, departure_time)
 
+    def place_jobs(self, intervals: Dict[str, int]) -> List[tuple]:
+        return [
+            (geohash_encode(waypoint["lat"], waypoint["lng"]), place_type, waypoint)
+            for place_type, interval_miles in intervals.items()
+            for waypoint in self.waypoints(interval_miles)
+        ]
+
+    def assemble_stops(
+        self,
+        intervals: Dict[str, int],
+        jobs: List[tuple],
+        cached: Dict,
+        fetched: Dict,
+        departure_time: datetime = None,
+    ) -> Dict[str, List[Dict]]:
+        if departure_time is None:
+            departure_time = datetime.now()
+
+        keys = {(cell, place_type) for cell, place_type, _ in jobs}
+        self.places_stats = PlacesLookupStats()
+        self.places_stats.hits = len(keys & cached.keys())
+        self.places_stats.misses = len(keys) - self.places_stats.hits
+        if keys:
+            places_cache.record(self.places_stats)
+
+        stops_by_type = {place_type: [] for place_type in intervals}
+        for cell, place_type, waypoint in jobs:
+            key = (cell, place_type)
             estimated_time = departure_time + timedelta(
                 hours=waypoint["estimated_time_hours"]
             )
-
-            stops_by_waypoint.append(
+            stops_by_type[place_type].append(
                 {
                     "waypoint": waypoint,
-                    "stations": raw_stops,
+                    "stations": cached.get(key, fetched.get(key, [])),
                     "scheduled_time": estimated_time.strftime("%Y-%m-%d %H:%M:%S"),
                 }
             )
-    return stops_by_waypoint
+        return stops_by_type
+
+
+def get_stops_concurrently(
+    api_key: str,
+    origin: str,
+    destination: str,
+    interval_miles: int,
+    place_type: str,
+    departure_time: datetime = None,
+) -> List[Dict]:
+    plan = RoutePlan(api_key, origin, destination)
+    return plan.find_stops({place_type: interval_miles}, departure_time)[place_type]
 
 
 def get_fueling_stations(
@@ -134,7 +242,7 @@ def get_rest_stops(
 
 
 def map_stop_data(
-    raw_station: dict, estimated_time: float, duration: str, stop_type: str
+    raw_station: dict, estimated_time: float, duration: timedelta, stop_type: str
 ) -> dict:
     return {
         "location_name": raw_station.get("name"),
@@ -146,7 +254,9 @@ def map_stop_data(
     }
 
 
-def flatten_and_map(raw_data: List[Dict], duration: str, stop_type: str) -> List[Dict]:
+def flatten_and_map(
+    raw_data: List[Dict], duration: timedelta, stop_type: str
+) -> List[Dict]:
     mapped_stops = []
     seen_times = []
     threshold_seconds = 60
@@ -179,3 +289,26 @@ def flatten_and_map(raw_data: List[Dict], duration: str, stop_type: str) -> List
         seen_times.append(scheduled_time)
 
     return mapped_stops
+
+
+def plan_trip_stops(
+    api_key: str,
+    origin: str,
+    destination: str,
+    fuel_interval: int = 1000,
+    rest_interval: int = 1000,
+    departure_time: datetime = None,
+) -> List[Dict]:
+    plan = RoutePlan(api_key, origin, destination)
+    raw_data = plan.find_stops(
+        {"gas_station": fuel_interval, "rest_stop": rest_interval}, departure_time
+    )
+    return map_trip_stops(raw_data)
+
+
+def map_trip_stops(raw_data: Dict[str, List[Dict]]) -> List[Dict]:
+    return flatten_and_map(
+        raw_data["gas_station"], duration=timedelta(minutes=30), stop_type="FUEL"
+    ) + flatten_and_map(
+        raw_data["rest_stop"], duration=timedelta(minutes=45), stop_type="REST"
+    )
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+
+def duty_timeline(driver, start: datetime, end: datetime) -> dict:
+    """
+    The driver's duty statuses overlapping ``[start, end)`` as parallel
+    arrays, read as tuples on the (driver, start_time) index with no model
+    instances or per-row dicts.
+    """
+    from trucker.models import DutyStatus
+
+    rows = list(
+        DutyStatus.objects.filter(
+            driver_id=driver.pk, start_time__lt=end, end_time__gt=start
+        )
+        .order_by("start_time")
+        .values_list("start_time", "end_time", "status", "location_lat", "location_lon")
+    )
+    starts, ends, statuses, lats, lons = (
+        map(list, zip(*rows)) if rows else ([], [], [], [], [])
+    )
+    return {
+        "driver": driver.pk,
+        "start": start,
+        "end": end,
+        "status_labels": dict(DutyStatus.STATUS_CHOICES),
+        "start_time": starts,
+        "end_time": ends,
+        "status": statuses,
+        "lat": lats,
+        "lon": lons,
+    }
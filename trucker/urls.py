@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CurrentUserAPIView,
     CustomTokenObtainPairView,
+    CustomTokenRefreshView,
     DutyStatusViewSet,
     LatestStationsViewSet,
     LogEntryViewSet,
@@ -11,11 +12,8 @@ from .views import (
     VehicleViewSet,
     CarrierViewSet,
     SingleDriverAPIView,
+    trip_stops_async,
 )
-from rest_framework_simplejwt.views import (
-    TokenRefreshView,
-)
-
 
 router = DefaultRouter()
 router.register(r"logs", LogEntryViewSet, basename="log")
@@ -26,10 +24,15 @@ router.register(r"duty-status", DutyStatusViewSet)
 router.register(r"trips", TripViewSet)
 
 urlpatterns = [
+    path(
+        "api/trips/<int:pk>/stops/async/",
+        trip_stops_async,
+        name="trip-stops-async",
+    ),
     path("api/", include(router.urls)),
     path("api-auth/", include("rest_framework.urls")),
     path("api/token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/token/refresh/", CustomTokenRefreshView.as_view(), name="token_refresh"),
     path("api/current-user/", CurrentUserAPIView.as_view(), name="current-user"),
     path(
         "api/latest-stations/<int:driver_id>/",
@@ -2,62 +2,79 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import datetime, timedelta
 
+ON_DUTY_STATUSES = ("D", "ON")
+OFF_DUTY_STATUSES = ("OFF", "SB")
+ALL_RULES = frozenset({"overlap", "window", "driving", "break"})
+
+
+def validate_duty_statuses(
+    statuses, adverse_conditions=False, rules=ALL_RULES, target=None
+):
+    """
+    Check a log's statuses, sorted by start time, in one pass with no database
+    access: overlaps, the 14-hour duty window, the 11-hour driving limit and
+    the 30-minute break. With ``target``, overlap is only reported for that
+    status. Returns the end times of any 34-hour restarts (contiguous off-duty
+    or sleeper time of at least 34 hours) found along the way.
+    """
+    latest_end = None
+    first_on_duty = last_on_duty = None
+    total_driving = since_break = 0.0
+    off_run_start = off_run_end = None
+    restarts = []
+
+    for status in statuses:
+        start, end = status.start_time, status.end_time
+        hours = (end - start).total_seconds() / 3600
+
+        if "overlap" in rules:
+            if target is None:
+                overlaps = latest_end is not None and start < latest_end
+            else:
+                overlaps = (
+                    status is not target
+                    and start < target.end_time
+                    and end > target.start_time
+                )
+            if overlaps:
+                raise ValidationError("Duty status periods cannot overlap")
+        latest_end = end if latest_end is None else max(latest_end, end)
+
+        if status.status in ON_DUTY_STATUSES:
+            first_on_duty = first_on_duty or start
+            last_on_duty = end if last_on_duty is None else max(last_on_duty, end)
+            off_run_start = None
+
+        if status.status == "D":
+            total_driving += hours
+            since_break += round(hours, 2)
+        elif status.status in OFF_DUTY_STATUSES:
+            if round(hours, 2) >= 0.5:
+                since_break = 0.0
+            if off_run_start is None or start != off_run_end:
+                off_run_start = start
+            off_run_end = end
+            if (end - off_run_start).total_seconds() >= 34 * 3600:
+                if restarts and restarts[-1][0] == off_run_start:
+                    restarts[-1] = (off_run_start, end)
+                else:
+                    restarts.append((off_run_start, end))
+
+        if "break" in rules and since_break > 8:
+            raise ValidationError("30-minute break required after 8 hours of driving")
 
-def validate_overlapping_statuses(statuses, current_status):
-    overlaps = current_status.__class__.objects.filter(
-        log_entry=current_status.log_entry,
-        start_time__lt=current_status.end_time,
-        end_time__gt=current_status.start_time,
-    ).exclude(pk=current_status.pk)
-    if overlaps.exists():
-        raise ValidationError("Duty status periods cannot overlap")
-
-
-def validate_14_hour_duty_window(statuses, adverse_conditions):
-    on_duty_statuses = [s for s in statuses if s.status in ["D", "ON"]]
-    if on_duty_statuses:
-        earliest_start = min(s.start_time for s in on_duty_statuses)
-        latest_end = max(s.end_time for s in on_duty_statuses)
-        window_duration = (latest_end - earliest_start).total_seconds() / 3600
-        if window_duration > 14 and not adverse_conditions:
+    if "window" in rules and first_on_duty is not None and not adverse_conditions:
+        if (last_on_duty - first_on_duty).total_seconds() / 3600 > 14:
             raise ValidationError(
                 "14-hour duty window exceeded without adverse conditions exception"
             )
 
-
-def validate_11_hour_driving_limit(statuses):
-    driving_statuses = [s for s in statuses if s.status == "D"]
-    total_driving = sum(s.duration for s in driving_statuses)
-    if total_driving > 11:
+    if "driving" in rules and total_driving > 11:
         raise ValidationError(
             "Driving time exceeds 11-hour limit within 14-hour window"
         )
 
-
-def validate_30_minute_break(statuses):
-    cumulative_driving = 0.0
-    for s in statuses:
-        if s.status == "D":
-            cumulative_driving += round(s.duration, 2)
-        elif s.status in ["OFF", "SB"]:
-            if round(s.duration, 2) >= 0.5:
-                cumulative_driving = 0.0
-        if cumulative_driving > 8:
-            raise ValidationError("30-minute break required after 8 hours of driving")
-
-
-def check_34_hour_restart(current_status):
-    if current_status.status in ["OFF", "SB"] and current_status.duration >= 34:
-        thirty_four_hours_ago = current_status.end_time - timezone.timedelta(hours=34)
-        overlapping_statuses = current_status.__class__.objects.filter(
-            log_entry__driver=current_status.log_entry.driver,
-            start_time__lt=current_status.end_time,
-            end_time__gt=thirty_four_hours_ago,
-        ).exclude(status__in=["OFF", "SB"])
-        if not overlapping_statuses.exists():
-            driver = current_status.log_entry.driver
-            driver.last_34hr_restart = current_status.end_time
-            driver.save()
+    return [end for _, end in restarts]
 
 
 def validate_sleeper_berth(statuses):
@@ -1,40 +1,55 @@
 from rest_framework import viewsets, views
 from rest_framework.throttling import UserRateThrottle
-from rest_framework.exceptions import ValidationError
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.core.exceptions import PermissionDenied
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
 from django.db import transaction
-from datetime import timedelta
-from django.conf import settings
 import logging
 
-from spotter.settings.serializers import CustomTokenObtainPairSerializer
-from trucker.exceptions import TripValidationError
+from spotter.settings.serializers import (
+    CustomTokenObtainPairSerializer,
+    CustomTokenRefreshSerializer,
+)
+from trucker.exceptions import RouteServiceError, TripValidationError
+from trucker.pagination import LogEntryCursorPagination
+from trucker.renderers import ORJSONRenderer
 from trucker.permissions import IsDriverOwner
-from .models import DutyStatus, LogEntry, Driver, Trip, Vehicle, Carrier, Stop
+from trucker.services.async_stop_services import plan_trip_stops_async
+from trucker.services.cycle_services import driver_recap
+from trucker.services.driver_context import driver_context
+from trucker.services.fleet_feasibility import rank_drivers
+from trucker.services.hos_services import cached_hos_logs
+from trucker.services.log_ingestion import ingest_logs
+from trucker.services.timeline import duty_timeline
+from .models import DutyStatus, LogEntry, Driver, Trip, Vehicle, Carrier
 from .serializers import (
     DutyStatusSerializer,
+    FeasibilityRequestSerializer,
     LogEntryCreateSerializer,
     LogEntrySerializer,
     DriverSerializer,
+    StopSerializer,
     TripSerializer,
     UserSerializer,
     VehicleSerializer,
     CarrierSerializer,
 )
 
-from trucker.services.stop_services import (
-    flatten_and_map,
-    get_fueling_stations,
-    get_rest_stops,
-)
 from django.utils import timezone
-
+from django.utils.dateparse import parse_datetime
+from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -43,12 +58,23 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = CustomTokenRefreshSerializer
+
+
 class LogEntryViewSet(viewsets.ModelViewSet):
     serializer_class = LogEntrySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = LogEntryCursorPagination
 
     def get_queryset(self):
-        return LogEntry.objects.all().order_by("-date")
+        return (
+            LogEntry.objects.select_related(
+                "driver__user", "driver__carrier", "vehicle"
+            )
+            .prefetch_related("duty_statuses")
+            .order_by("-date", "-id")
+        )
 
     def create(self, request, *args, **kwargs):
         serializer = LogEntryCreateSerializer(data=request.data)
@@ -56,12 +82,91 @@ class LogEntryViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data, status=201)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        serializer = LogEntryCreateSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = ingest_logs(serializer.validated_data)
+        except DjangoValidationError as e:
+            return Response(e.message_dict, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "logs": [log_entry.pk for log_entry in result.logs],
+                "statuses": result.statuses,
+                "drivers": result.drivers,
+                "rows_per_second": round(result.rows_per_second, 1),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+def _query_datetime(request, name):
+    value = parse_datetime(request.query_params.get(name, ""))
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _driver_context(request):
+    """Set by DriverContextJWTAuthentication; resolved here for other auth."""
+    if getattr(request, "driver_context", None) is None:
+        request.driver_context = driver_context(request.user)
+    return request.driver_context
+
+
+def _request_driver(request):
+    """The requesting user's driver, looked up once and cached on the request."""
+    if not hasattr(request, "_driver"):
+        driver_id = _driver_context(request).driver_id
+        request._driver = (
+            Driver.objects.select_related("carrier").filter(pk=driver_id).first()
+            if driver_id
+            else None
+        )
+    return request._driver
+
 
 class DriverViewSet(viewsets.ModelViewSet):
     queryset = Driver.objects.all()
     serializer_class = DriverSerializer
     permission_classes = [IsAuthenticated]
 
+    @action(detail=False, methods=["post"])
+    def feasibility(self, request):
+        serializer = FeasibilityRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        earliest_start = serializer.validated_data.get("earliest_start", timezone.now())
+
+        drivers = Driver.objects.select_related("user", "carrier")
+        if not request.user.is_staff:
+            carrier_id = _driver_context(request).carrier_id
+            if carrier_id is None:
+                return Response([], status=status.HTTP_200_OK)
+            drivers = drivers.filter(carrier_id=carrier_id)
+
+        ranked = rank_drivers(
+            drivers, serializer.validated_data["duration_hours"], earliest_start
+        )
+        return Response(ranked, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"])
+    def recap(self, request, pk=None):
+        driver = get_object_or_404(Driver.objects.select_related("carrier"), pk=pk)
+        return Response(driver_recap(driver), status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["get"], renderer_classes=[ORJSONRenderer])
+    def timeline(self, request, pk=None):
+        driver = get_object_or_404(Driver, pk=pk)
+        end = _query_datetime(request, "end") or timezone.now()
+        start = _query_datetime(request, "start") or end - timedelta(days=31)
+        if start >= end:
+            return Response(
+                {"error": "start must be before end"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(duty_timeline(driver, start, end), status=status.HTTP_200_OK)
+
 
 class VehicleViewSet(viewsets.ModelViewSet):
     queryset = Vehicle.objects.all()
@@ -106,100 +211,15 @@ class LatestStationsViewSet(views.APIView):
         return Response(data, status=200)
 
 
-class TripViewSet(viewsets.ModelViewSet):
-    queryset = Trip.objects.all()
-    serializer_class = TripSerializer
-
-    @action(detail=True, methods=["get"])
-    def generate_logs(self, request, pk=None):
-        trip = self.get_object()
-        logs = self.calculate_trip_logs(trip)
-        return Response(logs)
-
-    def calculate_trip_logs(self, trip):
-        driver = trip.driver
-        cycle_hours = 70 if driver.carrier.hos_cycle_choice == "70" else 60
-        remaining_hours = max(cycle_hours - driver.current_cycle_used, 0)
-
-        logs = []
-        current_time = trip.start_time
-        total_driving = 0
-        duty_window_start = current_time
-        break_accumulator = 0
-
-        while total_driving < trip.estimated_duration.total_seconds() / 3600:
-            if remaining_hours <= 0:
-                raise ValidationError(
-                    "Driver exceeds cycle hours - requires 34hr restart"
-                )
-
-            if (current_time - duty_window_start).total_seconds() / 3600 >= 14:
-                current_time = duty_window_start + timedelta(hours=14)
-                logs.append(self.create_off_duty(current_time, 10))
-                duty_window_start = current_time + timedelta(hours=10)
-                current_time = duty_window_start
-                continue
-
-            max_drive_segment = min(
-                11 - (driver.current_cycle_used % 11),
-                remaining_hours,
-                trip.estimated_duration.total_seconds() / 3600 - total_driving,
-                14 - (current_time - duty_window_start).total_seconds() / 3600,
-            )
-
-            drive_end = current_time + timedelta(hours=max_drive_segment)
-            logs.append(
-                {
-                    "log_entry": trip.log_entry,
-                    "status": "D",
-                    "start_time": current_time,
-                    "end_time": drive_end,
-                    "location_name": "En route",
-                }
-            )
-
-            total_driving += max_drive_segment
-            driver.current_cycle_used += max_drive_segment
-            remaining_hours -= max_drive_segment
-            current_time = drive_end
-            break_accumulator += max_drive_segment
-
-            if break_accumulator >= 8:
-                break_time = current_time + timedelta(minutes=30)
-                logs.append(
-                    {
-                        "log_entry": trip.log_entry,
-                        "status": "OFF",
-                        "start_time": current_time,
-                        "end_time": break_time,
-                        "location_name": "Rest break",
-                    }
-                )
-                current_time = break_time
-                break_accumulator = 0
-
-        driver.save()
-        return logs
-
-    def create_off_duty(self, start_time, hours):
-        return {
-            "log_entry": self.log_entry,
-            "status": "OFF",
-            "start_time": start_time,
-            "end_time": start_time + timedelta(hours=hours),
-            "location_name": "Mandatory rest",
-        }
-
-
 class SingleDriverAPIView(views.APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        driver = Driver.objects.filter(user=request.user).first()
-        if not driver:
+        driver_id = _driver_context(request).driver_id
+        if not driver_id:
             return Response({"error": "No driver found for this user"}, status=404)
 
-        log_entry = LogEntry.objects.filter(driver=driver).first()
+        log_entry = LogEntry.objects.filter(driver_id=driver_id).first()
         if not log_entry:
             return Response({"error": "No log entry found for this driver"}, status=404)
 
@@ -211,20 +231,22 @@ class TripViewSet(viewsets.ModelViewSet):
     serializer_class = TripSerializer
     permission_classes = [IsAuthenticated, IsDriverOwner]
     queryset = (
-        Trip.objects.select_related("driver__user")
+        Trip.objects.select_related("driver__user", "driver__carrier")
         .prefetch_related("stops")
         .order_by("-start_time")
     )
 
     def get_queryset(self):
-        driver = Driver.objects.filter(user=self.request.user).first()
-        if driver is None:
+        driver_id = _driver_context(self.request).driver_id
+        if driver_id is None:
             return Trip.objects.none()
-        return self.queryset.filter(driver=driver)
+        return self.queryset.filter(driver_id=driver_id)
 
     @transaction.atomic
     def perform_create(self, serializer):
-        driver = self.request.user.driver
+        driver = _request_driver(self.request)
+        if driver is None:
+            raise TripValidationError("No driver found for this user")
 
         if Trip.objects.filter(driver=driver, completed=False).exists():
             raise TripValidationError(
@@ -352,36 +374,7 @@ class TripViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            with transaction.atomic():
-                fueling_interval = 1000
-                rest_interval = 1000
-
-                raw_fuel_data = get_fueling_stations(
-                    api_key=settings.MAPS_API_KEY,
-                    origin=trip.pickup_location,
-                    destination=trip.dropoff_location,
-                    interval_miles=fueling_interval,
-                )
-                mapped_fuel_stops = flatten_and_map(
-                    raw_fuel_data, duration="0:30:00", stop_type="FUEL"
-                )
-
-                Stop.objects.bulk_create(
-                    [Stop(trip=trip, **stop) for stop in mapped_fuel_stops]
-                )
-                raw_rest_data = get_rest_stops(
-                    api_key=settings.MAPS_API_KEY,
-                    origin=trip.pickup_location,
-                    destination=trip.dropoff_location,
-                    interval_miles=rest_interval,
-                )
-                mapped_rest_stops = flatten_and_map(
-                    raw_rest_data, duration="0:45:00", stop_type="REST"
-                )
-
-                Stop.objects.bulk_create(
-                    [Stop(trip=trip, **stop) for stop in mapped_rest_stops]
-                )
+            trip.generate_stops()
 
             serializer = TripSerializer(trip)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -417,12 +410,44 @@ class TripViewSet(viewsets.ModelViewSet):
 
         return Response(response_data, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["get"])
+    def planning(self, request, pk=None):
+        trip = self.get_object()
+        job = trip.planning_jobs.order_by("-created_at").first()
+
+        return Response(
+            {
+                "trip": trip.id,
+                "planning_status": trip.planning_status,
+                "planning_error": trip.planning_error,
+                "job": (
+                    {
+                        "id": job.id,
+                        "status": job.status,
+                        "attempts": job.attempts,
+                        "run_after": job.run_after,
+                        "started_at": job.started_at,
+                        "finished_at": job.finished_at,
+                    }
+                    if job
+                    else None
+                ),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["get"])
+    def generate_logs(self, request, pk=None):
+        trip = self.get_object()
+        return Response(cached_hos_logs(trip))
+
     @action(detail=False, methods=["get"])
     def active(self, request):
-        driver = request.user.driver
-        active_trip = Trip.objects.filter(
-            driver=driver, completed=False, start_time__lte=timezone.now()
-        ).first()
+        active_trip = (
+            self.get_queryset()
+            .filter(completed=False, start_time__lte=timezone.now())
+            .first()
+        )
 
         if not active_trip:
             return Response(
@@ -470,3 +495,64 @@ class TripViewSet(viewsets.ModelViewSet):
             )
 
         return super().destroy(request, *args, **kwargs)
+
+
+@csrf_exempt
+@require_POST
+async def trip_stops_async(request, pk):
+    """
+    Async counterpart of TripViewSet.stops. Runs on the ASGI event loop so a
+    single worker can plan stops for many trips at once; a client disconnect
+    cancels the outbound Maps requests.
+
+    The view is CSRF-exempt, so it only accepts JWT bearer tokens: session
+    cookies, which a cross-site form would send, are ignored.
+    """
+    try:
+        auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({"detail": str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+    if auth is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    user = request.user = auth[0]
+
+    throttle = UserRateThrottle()
+    if not await sync_to_async(throttle.allow_request)(request, None):
+        return JsonResponse(
+            {"detail": "Request was throttled."},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(int(throttle.wait() or 0))},
+        )
+
+    try:
+        trip = await Trip.objects.select_related("driver__user").aget(
+            pk=pk, driver__user=user
+        )
+    except Trip.DoesNotExist:
+        return JsonResponse({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    if trip.completed:
+        return JsonResponse(
+            {"detail": "Cannot generate stops for completed trips"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        mapped_stops = await plan_trip_stops_async(
+            trip.pickup_location, trip.dropoff_location
+        )
+    except RouteServiceError as e:
+        return JsonResponse({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.error(f"Error generating stops for trip {pk}: {str(e)}")
+        return JsonResponse(
+            {"detail": "Error generating stops"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    await sync_to_async(trip.replace_stops)(mapped_stops)
+    data = await sync_to_async(lambda: TripSerializer(trip).data)()
+    return JsonResponse(data, status=status.HTTP_200_OK)